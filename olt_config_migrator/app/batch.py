@@ -0,0 +1,253 @@
+from __future__ import annotations
+import os
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .detect import AUTO, sniff
+from .exchange import is_normalized_export, load_normalized
+from .models import NormalizedConfig
+from .perf import span
+from .remap import RemapIssue, apply_remap, remap_from_fast
+from .tcont import consolidate_tcont, consolidation_issues, policy_from_fast
+from .sources import iter_sources, source_names, split_member
+from .utils import script_stats
+from .vendors.registry import get_registry
+
+# Mesmos padrões do wizard (TargetPage/FastModePage)
+DEFAULT_OPTIONS: Dict[str, bool] = {"vlans": True, "ips_routes": True, "profiles": True, "onus": True}
+
+
+@dataclass
+class MigrationResult:
+    name: str
+    normalized: NormalizedConfig
+    target_data: Dict[str, List[Dict[str, Any]]]
+    script: str
+    src: str = ""
+    out_path: str = ""
+    stats: Dict[str, int] = field(default_factory=dict)
+    issues: List[RemapIssue] = field(default_factory=list)
+
+
+def apply_fast_defaults(target_data: Dict[str, List[Dict[str, Any]]], fast: Dict[str, Any]) -> None:
+    """Trunks typed in the fast-mode CSV replace the ones from the source."""
+    trunks_csv = str(fast.get("trunks_csv", "")).strip()
+    if trunks_csv and "trunks" in target_data:
+        ifnames = [x.strip() for x in trunks_csv.split(",") if x.strip()]
+        target_data["trunks"] = [{"ifname": n, "tagged": "ALL"} for n in ifnames]
+
+
+def apply_options(target_data: Dict[str, List[Dict[str, Any]]], options: Dict[str, bool]) -> None:
+    """Clear the sections the user chose not to migrate."""
+    sections = {"vlans": ("vlans",), "ips_routes": ("interfaces", "routes"),
+                "profiles": ("tcont_profiles",), "onus": ("onus", "services")}
+    for opt, keys in sections.items():
+        if not options.get(opt, True):
+            for k in keys:
+                if k in target_data:
+                    target_data[k] = []
+
+
+def prepare_normalized(normalized: NormalizedConfig, fast: Dict[str, Any],
+                       issues: Optional[List[RemapIssue]] = None) -> NormalizedConfig:
+    """Remap (fast vlan_map/slot_map/pon_map) and TCONT consolidation (fast tcont_*), before any adapter."""
+    remap = remap_from_fast(fast)
+    if remap is not None:
+        normalized, found = apply_remap(normalized, remap)
+        if issues is not None:
+            issues.extend(found)
+    policy = policy_from_fast(fast)
+    if policy is not None:
+        res = consolidate_tcont(normalized, policy)
+        normalized = res.normalized
+        if issues is not None:
+            issues.extend(consolidation_issues(res))
+    return normalized
+
+
+def build_target_data(dst: str, normalized: NormalizedConfig, fast: Dict[str, Any],
+                      options: Optional[Dict[str, bool]] = None,
+                      issues: Optional[List[RemapIssue]] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """prepare_normalized (remap, TCONT consolidation), from_normalized, fast defaults, options, typed rows.
+
+    Remap collisions, TCONT drift and adapter.check_target() problems (e.g. ONUs that collide
+    on the target) are appended to `issues` when a list is given.
+    """
+    normalized = prepare_normalized(normalized, fast, issues)
+    adapter = get_registry()[dst]
+    target_data = adapter.from_normalized(normalized)
+    apply_fast_defaults(target_data, fast)
+    apply_options(target_data, options or DEFAULT_OPTIONS)
+    records = adapter.records(target_data)
+    if issues is not None:
+        issues.extend(adapter.check_target(records, fast))
+    return records
+
+
+def migrate_lines(name: str, lines: Iterable[str], src: str, dst: str, fast: Optional[Dict[str, Any]] = None,
+                  options: Optional[Dict[str, bool]] = None) -> MigrationResult:
+    """Parse a line stream with the `src` adapter ("auto" = detect) and render it for `dst`."""
+    fast = fast or {}
+    reg = get_registry()
+    with span("batch.migrate", source=name):
+        if src == AUTO:
+            ranking, lines = sniff(lines)
+            if not ranking:
+                raise ValueError(f"{name}: fabricante de origem não identificado (use --from)")
+            src = ranking[0][0]
+        normalized = reg[src].parse_lines(lines)
+        issues: List[RemapIssue] = []
+        target_data = build_target_data(dst, normalized, fast, options, issues)
+        script = reg[dst].render(target_data, fast)
+    return MigrationResult(name, normalized, target_data, script, src=src, stats=script_stats(script), issues=issues)
+
+
+def migrate_normalized(name: str, normalized: NormalizedConfig, dst: str, fast: Optional[Dict[str, Any]] = None,
+                       options: Optional[Dict[str, bool]] = None) -> MigrationResult:
+    fast = fast or {}
+    with span("batch.migrate", source=name):
+        issues: List[RemapIssue] = []
+        target_data = build_target_data(dst, normalized, fast, options, issues)
+        script = get_registry()[dst].render(target_data, fast)
+    return MigrationResult(name, normalized, target_data, script, src="normalized", stats=script_stats(script),
+                           issues=issues)
+
+
+def source_stem(name: str) -> str:
+    """'olt1/backup.txt.gz' -> 'backup'."""
+    base = os.path.basename(os.path.normpath(name))
+    for ext in (".gz", ".bz2", ".xz"):
+        if base.lower().endswith(ext):
+            base = base[: -len(ext)]
+    return os.path.splitext(base)[0] or "config"
+
+
+def output_stem(name: str, path: str = "") -> str:
+    """Stem for the outputs of config `name` read from `path`.
+
+    Zip members carry the zip name ('coleta.zip' + 'olt7/backup.txt' -> 'coleta_olt7_backup'),
+    so the same member name in two zips doesn't become the same file.
+    """
+    if path:
+        base, _, member = source_id(path, name).partition("!")
+        if member:
+            dirs = [d for d in os.path.dirname(member.strip("/")).split("/") if d]
+            return "_".join([source_stem(base), *dirs, source_stem(member)])
+    return source_stem(name)
+
+
+def output_name(name: str, dst: str, path: str = "") -> str:
+    """'olt1/backup.txt.gz' -> 'backup_zte.txt': file name for the rendered script (see output_stem)."""
+    return f"{output_stem(name, path)}_{dst}.{get_registry()[dst].default_extension.lstrip('.')}"
+
+
+def source_id(path: str, name: str) -> str:
+    """'a.zip!m.txt' for zip members (also when `path` already names the member), else `path`."""
+    base, member = split_member(path)
+    member = member or (name if name != os.path.basename(path) else "")
+    return f"{base}!{member}" if member else base
+
+
+def claim_outputs(claimed: Dict[str, str], outputs: Dict[str, str]) -> None:
+    """Register output -> source in `claimed`; ValueError (nothing registered) if another source has it.
+
+    Ex.: 'a.txt' e 'a.txt.gz', ou 'a.txt' e 'a.cfg', gerariam o mesmo a_zte.txt.
+    """
+    for out, source in outputs.items():
+        owner = claimed.get(out)
+        if owner is not None and owner != source:
+            raise ValueError(f"a saída {out} já é gerada a partir de {owner} (renomeie um dos arquivos)")
+    claimed.update(outputs)
+
+
+def migrate_path(path: str, src: str, dst: str, out_dir: str, fast: Optional[Dict[str, Any]] = None,
+                 options: Optional[Dict[str, bool]] = None,
+                 claimed: Optional[Dict[str, str]] = None) -> Iterator[MigrationResult]:
+    """Migrate every config in `path` (plain, compressed or each zip member) into out_dir.
+
+    Um inventário exportado (NDJSON ou pasta Parquet/Arrow, ver app/exchange.py)
+    entra direto como NormalizedConfig, sem parser de fabricante. Com `claimed`
+    (saída -> origem, compartilhado entre chamadas) um nome de saída repetido é
+    ValueError antes de gravar qualquer coisa, em vez de sobrescrever o anterior.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    if is_normalized_export(path):
+        name = os.path.basename(os.path.normpath(path))
+        sources: Iterable = [(name, None)]
+        outputs = {name: os.path.join(out_dir, output_name(name, dst))}
+    else:
+        sources = iter_sources(path)
+        outputs = {n: os.path.join(out_dir, output_name(n, dst, path)) for n in source_names(path)}
+    if claimed is not None:
+        claim_outputs(claimed, {out: source_id(path, n) for n, out in outputs.items()})
+    for name, lines in sources:
+        if lines is None:
+            res = migrate_normalized(name, load_normalized(path), dst, fast, options)
+        else:
+            res = migrate_lines(name, lines, src, dst, fast, options)
+        res.out_path = outputs[name]
+        with open(res.out_path, "w", encoding="utf-8") as f:
+            f.write(res.script)
+        yield res
+
+
+@dataclass
+class TargetRender:
+    vendor: str
+    label: str
+    script: str = ""
+    stats: Dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+    error: str = ""
+
+
+def render_target(dst: str, normalized: NormalizedConfig, fast: Optional[Dict[str, Any]] = None,
+                  options: Optional[Dict[str, bool]] = None) -> TargetRender:
+    """from_normalized + render for one vendor; module-level so worker processes can run it."""
+    adapter = get_registry()[dst]
+    res = TargetRender(dst, adapter.label)
+    t0 = time.perf_counter()
+    try:
+        res.script = adapter.render(build_target_data(dst, normalized, fast or {}, options), fast or {})
+        res.stats = script_stats(res.script)
+    except Exception as e:
+        res.error = f"{type(e).__name__}: {e}"
+    res.seconds = time.perf_counter() - t0
+    return res
+
+
+def submit_render_all(executor: Executor, normalized: NormalizedConfig, fast: Optional[Dict[str, Any]] = None,
+                      options: Optional[Dict[str, bool]] = None, vendors: Optional[List[str]] = None) -> Dict[str, Future]:
+    """Schedule render_target for every vendor (default: all registered) on `executor`."""
+    vendors = vendors or list(get_registry())
+    return {vid: executor.submit(render_target, vid, normalized, fast, options) for vid in vendors}
+
+
+def render_all_targets(normalized: NormalizedConfig, fast: Optional[Dict[str, Any]] = None,
+                       options: Optional[Dict[str, bool]] = None, vendors: Optional[List[str]] = None,
+                       workers: Optional[int] = None) -> List[TargetRender]:
+    """Render the same NormalizedConfig for several vendors in parallel worker processes.
+
+    workers=1 roda tudo no processo atual (útil para depurar/perfilar).
+    """
+    vendors = vendors or list(get_registry())
+    with span("batch.render_all", vendors=len(vendors)):
+        if workers == 1:
+            return [render_target(vid, normalized, fast, options) for vid in vendors]
+        with ProcessPoolExecutor(max_workers=workers or min(len(vendors), os.cpu_count() or 1)) as ex:
+            futures = submit_render_all(ex, normalized, fast, options, vendors)
+            return [futures[vid].result() for vid in vendors]
+
+
+def format_render_table(results: List[TargetRender]) -> List[str]:
+    """Side-by-side lines/commands/bytes/time per vendor."""
+    out = [f"{'destino':<28} {'linhas':>9} {'comandos':>9} {'bytes':>11} {'tempo ms':>9}"]
+    for r in results:
+        if r.error:
+            out.append(f"{r.label:<28} ERRO {r.error}")
+            continue
+        out.append(f"{r.label:<28} {r.stats['lines']:>9} {r.stats['commands']:>9} {r.stats['bytes']:>11} {r.seconds * 1000:>9.1f}")
+    return out
+
@@ -0,0 +1,79 @@
+from __future__ import annotations
+import itertools
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Pattern, Tuple
+
+from .sources import iter_lines
+from .vendors.base import VendorAdapter
+from .vendors.registry import get_registry
+
+# Só o começo do backup é lido: comandos característicos aparecem logo nas
+# primeiras centenas de linhas, e a detecção fica em milissegundos em qualquer tamanho.
+DETECT_BYTES = 64 * 1024
+DETECT_LINES = 2000
+# Uma assinatura repetida milhares de vezes não deve engolir as outras
+MAX_HITS = 25
+
+AUTO = "auto"
+
+_compiled: Dict[str, List[Tuple[Pattern[str], float]]] = {}
+
+
+def _signatures(adapter: VendorAdapter) -> List[Tuple[Pattern[str], float]]:
+    rx = _compiled.get(adapter.vendor_id)
+    if rx is None:
+        rx = _compiled[adapter.vendor_id] = [(re.compile(p), w) for p, w in adapter.signatures]
+    return rx
+
+
+def score_lines(lines: Iterable[str], registry: Optional[Dict[str, VendorAdapter]] = None) -> List[Tuple[str, float]]:
+    """Rank vendors by signature hits over `lines`; scores sum to 1 (empty list = nothing matched)."""
+    registry = registry or get_registry()
+    sigs = {vid: _signatures(ad) for vid, ad in registry.items() if ad.signatures}
+    hits: Dict[Tuple[str, int], int] = {}
+    for raw in lines:
+        line = raw.strip().lower()
+        if not line:
+            continue
+        for vid, lst in sigs.items():
+            for i, (rx, _) in enumerate(lst):
+                if rx.match(line):
+                    hits[(vid, i)] = hits.get((vid, i), 0) + 1
+    scores: Dict[str, float] = {}
+    for (vid, i), n in hits.items():
+        scores[vid] = scores.get(vid, 0.0) + sigs[vid][i][1] * min(n, MAX_HITS)
+    total = sum(scores.values())
+    if not total:
+        return []
+    return sorted(((vid, s / total) for vid, s in scores.items()), key=lambda x: -x[1])
+
+
+def _head(lines: Iterator[str], max_bytes: int, max_lines: int) -> List[str]:
+    head: List[str] = []
+    size = 0
+    for line in lines:
+        head.append(line)
+        size += len(line) + 1
+        if size >= max_bytes or len(head) >= max_lines:
+            break
+    return head
+
+
+def sniff(lines: Iterable[str], max_bytes: int = DETECT_BYTES) -> Tuple[List[Tuple[str, float]], Iterator[str]]:
+    """Detect the vendor from the head of a line stream.
+
+    Returns (ranking, lines) where `lines` replays the consumed head followed by
+    the rest, so the same stream can go straight to parse_lines().
+    """
+    it = iter(lines)
+    head = _head(it, max_bytes, DETECT_LINES)
+    return score_lines(head), itertools.chain(head, it)
+
+
+def detect_vendor(path: str, max_bytes: int = DETECT_BYTES) -> List[Tuple[str, float]]:
+    """Ranked (vendor_id, score) guesses for a backup file (plain, compressed or 'a.zip!m')."""
+    lines = iter_lines(path)
+    try:
+        return score_lines(_head(lines, max_bytes, DETECT_LINES))
+    finally:
+        lines.close()  # type: ignore[attr-defined]
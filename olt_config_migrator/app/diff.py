@@ -0,0 +1,67 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+from .models import NormalizedConfig
+
+# Chave de identidade de cada entidade: duas entidades com a mesma chave são
+# "a mesma coisa" na OLT; se os demais campos diferem, ela mudou.
+SECTION_KEYS: Dict[str, Callable[[Any], Hashable]] = {
+    "vlans": lambda v: v.vid,
+    "trunks": lambda t: t.ifname,
+    "interfaces": lambda i: i.ifname,
+    "routes": lambda r: (r.prefix, r.next_hop),
+    "tcont_profiles": lambda p: p.name,
+    "onus": lambda o: (o.slot, o.pon, o.onu_id),
+    "services": lambda s: (s.slot, s.pon, s.onu_id, s.svc_local_id),
+}
+
+
+@dataclass
+class SectionDiff:
+    added: List[Any] = field(default_factory=list)
+    removed: List[Any] = field(default_factory=list)
+    changed: List[Tuple[Any, Any]] = field(default_factory=list)  # (antigo, novo)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+@dataclass
+class ConfigDiff:
+    sections: Dict[str, SectionDiff] = field(default_factory=dict)
+
+    def __getitem__(self, key: str) -> SectionDiff:
+        return self.sections.get(key) or SectionDiff()
+
+    def is_empty(self) -> bool:
+        return not any(self.sections.values())
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        return {k: {"added": len(d.added), "removed": len(d.removed), "changed": len(d.changed)}
+                for k, d in self.sections.items()}
+
+
+def diff_section(old: List[Any], new: List[Any], key: Callable[[Any], Hashable]) -> SectionDiff:
+    """Added/removed/changed between two entity lists, in O(len(old) + len(new)).
+
+    Entidades repetidas com a mesma chave: vale a última (igual ao que a OLT faria).
+    Listas de resultado seguem a ordem de entrada.
+    """
+    before = {key(x): x for x in old}
+    after = {key(x): x for x in new}
+    d = SectionDiff()
+    for k, x in after.items():
+        prev = before.get(k)
+        if prev is None:
+            d.added.append(x)
+        elif prev != x:
+            d.changed.append((prev, x))
+    d.removed = [x for k, x in before.items() if k not in after]
+    return d
+
+
+def diff_normalized(old: NormalizedConfig, new: NormalizedConfig) -> ConfigDiff:
+    """Structural diff of two NormalizedConfigs keyed by SECTION_KEYS (extras are ignored)."""
+    return ConfigDiff({name: diff_section(getattr(old, name), getattr(new, name), key)
+                       for name, key in SECTION_KEYS.items()})
@@ -0,0 +1,182 @@
+from __future__ import annotations
+import json
+import os
+from dataclasses import fields
+from typing import IO, Any, Dict, Iterable, Iterator, List, Tuple
+
+from .models import NormalizedConfig
+from .project import NORMALIZED_TABLES
+
+# Troca do inventário normalizado com outros sistemas (provisionamento, billing):
+#   NDJSON    um registro por linha, {"table": "onus", ...campos}; 1ª linha = cabeçalho
+#   Parquet / Arrow IPC   um arquivo por tabela numa pasta (<tabela>.parquet|.arrow) + _meta.json
+# Exportação e importação andam em lotes de linhas, sem montar o documento inteiro.
+# Parquet/Arrow precisam do pacote opcional pyarrow.
+
+FORMAT = "olt-normalized"
+VERSION = 1
+BATCH_ROWS = 10_000
+COLUMNAR = ("parquet", "arrow")
+META_FILE = "_meta.json"
+NDJSON_EXTS = (".ndjson", ".jsonl")
+
+
+def _rows(n: NormalizedConfig, table: str) -> Iterator[Dict[str, Any]]:
+    for x in getattr(n, table):
+        yield dict(vars(x))
+
+
+# -- NDJSON --------------------------------------------------------------------
+
+def write_ndjson(n: NormalizedConfig, out: IO[str]) -> int:
+    """Stream `n` as NDJSON to a text file; returns the number of records."""
+    out.write(json.dumps({"format": FORMAT, "version": VERSION, "extras": n.extras}, ensure_ascii=False) + "\n")
+    count = 0
+    dumps = json.JSONEncoder(ensure_ascii=False).encode
+    for table in NORMALIZED_TABLES:
+        buf: List[str] = []
+        for row in _rows(n, table):
+            row["table"] = table
+            buf.append(dumps(row))
+            if len(buf) >= BATCH_ROWS:
+                out.write("\n".join(buf) + "\n")
+                count += len(buf)
+                buf = []
+        if buf:
+            out.write("\n".join(buf) + "\n")
+            count += len(buf)
+    return count
+
+
+def read_ndjson(lines: Iterable[str]) -> NormalizedConfig:
+    """Rebuild a NormalizedConfig from NDJSON lines (any table order; unknown tables are skipped)."""
+    n = NormalizedConfig()
+    names = {t: {f.name for f in fields(cls)} for t, cls in NORMALIZED_TABLES.items()}
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        rec = json.loads(line)
+        if "format" in rec and "table" not in rec:
+            if rec.get("format") != FORMAT:
+                raise ValueError(f"formato desconhecido: {rec.get('format')}")
+            n.extras = rec.get("extras") or {}
+            continue
+        table = rec.pop("table", None)
+        cls = NORMALIZED_TABLES.get(table or "")
+        if cls is None:
+            continue
+        getattr(n, table).append(cls(**{k: v for k, v in rec.items() if k in names[table]}))
+    return n
+
+
+# -- Parquet / Arrow -------------------------------------------------------------
+
+def _pyarrow():
+    try:
+        import pyarrow as pa  # type: ignore
+    except ImportError as e:
+        raise RuntimeError("exportação Parquet/Arrow requer o pacote 'pyarrow' (pip install pyarrow)") from e
+    return pa
+
+
+def _arrow_schema(pa, cls: type):
+    types = {"int": pa.int64(), "Optional[int]": pa.int64(), "str": pa.string(), "List[int]": pa.list_(pa.int64())}
+    return pa.schema([pa.field(f.name, types.get(str(f.type), pa.string())) for f in fields(cls)])
+
+
+def _batches(n: NormalizedConfig, table: str) -> Iterator[Dict[str, List[Any]]]:
+    cols = [f.name for f in fields(NORMALIZED_TABLES[table])]
+    items = getattr(n, table)
+    for i in range(0, len(items), BATCH_ROWS):
+        chunk = items[i:i + BATCH_ROWS]
+        yield {c: [getattr(x, c) for x in chunk] for c in cols}
+
+
+def write_columnar(n: NormalizedConfig, out_dir: str, fmt: str = "parquet") -> Dict[str, int]:
+    """One <table>.<fmt> per NormalizedConfig list, written batch by batch; returns rows per table."""
+    if fmt not in COLUMNAR:
+        raise ValueError(f"formato colunar inválido: {fmt}")
+    pa = _pyarrow()
+    os.makedirs(out_dir, exist_ok=True)
+    counts: Dict[str, int] = {}
+    for table, cls in NORMALIZED_TABLES.items():
+        schema = _arrow_schema(pa, cls)
+        path = os.path.join(out_dir, f"{table}.{fmt}")
+        if fmt == "parquet":
+            import pyarrow.parquet as pq  # type: ignore
+            writer = pq.ParquetWriter(path, schema)
+        else:
+            writer = pa.ipc.new_file(path, schema)
+        try:
+            for cols in _batches(n, table):
+                if fmt == "parquet":
+                    writer.write_table(pa.Table.from_pydict(cols, schema=schema))
+                else:
+                    writer.write_batch(pa.RecordBatch.from_pydict(cols, schema=schema))
+        finally:
+            writer.close()
+        counts[table] = len(getattr(n, table))
+    with open(os.path.join(out_dir, META_FILE), "w", encoding="utf-8") as f:
+        json.dump({"format": FORMAT, "version": VERSION, "storage": fmt, "extras": n.extras, "rows": counts}, f, ensure_ascii=False)
+    return counts
+
+
+def _iter_columnar(path: str, fmt: str) -> Iterator[Dict[str, List[Any]]]:
+    pa = _pyarrow()
+    if fmt == "parquet":
+        import pyarrow.parquet as pq  # type: ignore
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=BATCH_ROWS):
+            yield batch.to_pydict()
+    else:
+        with pa.memory_map(path) as src:
+            reader = pa.ipc.open_file(src)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i).to_pydict()
+
+
+def read_columnar(in_dir: str) -> NormalizedConfig:
+    with open(os.path.join(in_dir, META_FILE), "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    fmt = meta.get("storage", "parquet")
+    n = NormalizedConfig(extras=meta.get("extras") or {})
+    for table, cls in NORMALIZED_TABLES.items():
+        path = os.path.join(in_dir, f"{table}.{fmt}")
+        if not os.path.exists(path):
+            continue
+        names = [f.name for f in fields(cls)]
+        out = getattr(n, table)
+        for cols in _iter_columnar(path, fmt):
+            keys = [k for k in names if k in cols]
+            for values in zip(*(cols[k] for k in keys)):
+                out.append(cls(**dict(zip(keys, values))))
+    return n
+
+
+# -- entrada/saída por caminho -----------------------------------------------------
+
+def export_normalized(n: NormalizedConfig, path: str, fmt: str = "") -> Tuple[str, int]:
+    """Export to `path` ('x.ndjson' file, or a folder for parquet/arrow); returns (fmt, records)."""
+    fmt = fmt or ("ndjson" if path.lower().endswith(NDJSON_EXTS) else "parquet")
+    if fmt == "ndjson":
+        with open(path, "w", encoding="utf-8") as f:
+            return fmt, write_ndjson(n, f)
+    return fmt, sum(write_columnar(n, path, fmt).values())
+
+
+def is_normalized_export(path: str) -> bool:
+    if os.path.isdir(path):
+        return os.path.exists(os.path.join(path, META_FILE))
+    p = path.lower()
+    for ext in (".gz", ".bz2", ".xz"):
+        if p.endswith(ext):
+            p = p[: -len(ext)]
+    return p.endswith(NDJSON_EXTS)
+
+
+def load_normalized(path: str) -> NormalizedConfig:
+    """Read an export written by export_normalized (NDJSON may also be compressed)."""
+    if os.path.isdir(path):
+        return read_columnar(path)
+    from .sources import iter_lines
+    return read_ndjson(iter_lines(path))
@@ -0,0 +1,176 @@
+from __future__ import annotations
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Set, Tuple
+
+from .models import InterfaceIP, NormalizedConfig, Onu, OnuService, Route, TcontProfile, Trunk, Vlan
+from .perf import span
+
+# Consolidação de várias OLTs de origem num único chassi de destino.
+# Cada origem tem seu mapeamento (slot de destino, deslocamento de PON e de VLAN);
+# o resultado é um NormalizedConfig comum, pronto para from_normalized()/render().
+# Todas as checagens usam dicionários/conjuntos: uma passada por origem, O(total).
+
+# Tipos de ocorrência
+SN_DUPLICATE = "sn_duplicado"
+ONU_COLLISION = "colisao_onu"
+VLAN_OVERLAP = "vlan_compartilhada"
+TCONT_RENAMED = "tcont_renomeado"
+IFACE_CONFLICT = "interface_conflito"
+ROUTE_CONFLICT = "rota_conflito"
+# ONUs descartadas (e seus serviços): o merge não é seguro sem revisão
+BLOCKING = (SN_DUPLICATE, ONU_COLLISION)
+
+
+@dataclass
+class MergeSource:
+    name: str
+    normalized: NormalizedConfig
+    slot: Optional[int] = None  # slot no chassi de destino (None = mantém o da origem)
+    pon_offset: int = 0
+    vlan_offset: int = 0
+
+
+@dataclass
+class MergeIssue:
+    kind: str
+    source: str
+    detail: str
+
+
+@dataclass
+class MergeResult:
+    normalized: NormalizedConfig
+    issues: List[MergeIssue] = field(default_factory=list)
+
+    @property
+    def blocking(self) -> List[MergeIssue]:
+        return [i for i in self.issues if i.kind in BLOCKING]
+
+    def summary(self) -> Dict[str, int]:
+        out: Dict[str, int] = {}
+        for i in self.issues:
+            out[i.kind] = out.get(i.kind, 0) + 1
+        return out
+
+
+def _onu_key(slot: int, pon: int, onu_id: int, fixed_slot: bool) -> Tuple[int, ...]:
+    return (pon, onu_id) if fixed_slot else (slot, pon, onu_id)
+
+
+def merge_configs(sources: List[MergeSource], fixed_slot: bool = False) -> MergeResult:
+    """Combine several parsed configs into one.
+
+    fixed_slot=True means the target render puts every ONU in the same slot
+    (fast["slot"] set), so collisions are checked on (pon, onu_id) only.
+    The first source wins on conflicts; the loser is reported in `issues`.
+    """
+    out = NormalizedConfig(extras={"merged_from": [s.name for s in sources]})
+    issues: List[MergeIssue] = []
+
+    vlans: Dict[int, Vlan] = {}
+    vlan_owner: Dict[int, str] = {}
+    overlapped: Set[int] = set()
+    trunks: Dict[str, Trunk] = {}
+    ifaces: Dict[str, InterfaceIP] = {}
+    routes: Dict[str, Route] = {}
+    tconts: Dict[Tuple[int, int, int], TcontProfile] = {}
+    tcont_names: Dict[str, Tuple[int, int, int]] = {}
+    onus: Dict[Tuple[int, ...], str] = {}
+    sns: Dict[str, str] = {}
+
+    with span("merge.configs", sources=len(sources)):
+        for src in sources:
+            n, tag, vo = src.normalized, src.name, src.vlan_offset
+
+            def slot_of(s: int) -> int:
+                return src.slot if src.slot is not None else s
+
+            # VLANs declaradas ou usadas por serviço: a mesma VID em duas OLTs passa a
+            # dividir o domínio de broadcast no chassi novo
+            seen_here: Set[int] = set()
+            for vid in [v.vid for v in n.vlans] + [s.vlan for s in n.services]:
+                vid += vo
+                if vid in seen_here:
+                    continue
+                seen_here.add(vid)
+                owner = vlan_owner.setdefault(vid, tag)
+                if owner != tag and vid not in overlapped:
+                    overlapped.add(vid)
+                    issues.append(MergeIssue(VLAN_OVERLAP, tag, f"VLAN {vid} também existe em {owner}"))
+            for v in n.vlans:
+                vid = v.vid + vo
+                if vid not in vlans:
+                    vlans[vid] = replace(v, vid=vid)
+
+            for t in n.trunks:
+                cur = trunks.get(t.ifname)
+                tagged = [x + vo for x in t.tagged_vlans]
+                if cur is None:
+                    trunks[t.ifname] = Trunk(t.ifname, tagged)
+                else:
+                    have = set(cur.tagged_vlans)
+                    cur.tagged_vlans.extend(x for x in tagged if x not in have)
+
+            for i in n.interfaces:
+                cur_i = ifaces.get(i.ifname)
+                if cur_i is None:
+                    ifaces[i.ifname] = replace(i, vlan=None if i.vlan is None else i.vlan + vo)
+                elif (cur_i.ip, cur_i.prefix_or_mask) != (i.ip, i.prefix_or_mask):
+                    issues.append(MergeIssue(IFACE_CONFLICT, tag,
+                                             f"{i.ifname} {i.ip}/{i.prefix_or_mask} ignorada (já é {cur_i.ip}/{cur_i.prefix_or_mask})"))
+
+            for r in n.routes:
+                cur_r = routes.get(r.prefix)
+                if cur_r is None:
+                    routes[r.prefix] = r
+                elif cur_r.next_hop != r.next_hop:
+                    issues.append(MergeIssue(ROUTE_CONFLICT, tag,
+                                             f"rota {r.prefix} via {r.next_hop} ignorada (já via {cur_r.next_hop})"))
+
+            # TCONT: o destino escolhe o profile pela banda (max/assured), então profiles com
+            # os mesmos parâmetros viram um só; nomes repetidos com banda diferente são renomeados
+            for p in n.tcont_profiles:
+                sig = (p.dba_type, p.assured_kbps, p.max_kbps)
+                if sig in tconts:
+                    continue
+                name = p.name
+                if tcont_names.get(name, sig) != sig:
+                    k = 2
+                    while f"{p.name}_{k}" in tcont_names:
+                        k += 1
+                    name = f"{p.name}_{k}"
+                    issues.append(MergeIssue(TCONT_RENAMED, tag, f"profile {p.name} renomeado para {name} (banda diferente)"))
+                tcont_names[name] = sig
+                tconts[sig] = replace(p, name=name)
+
+            kept: Set[Tuple[int, int, int]] = set()
+            for o in n.onus:
+                slot, pon = slot_of(o.slot), o.pon + src.pon_offset
+                key = _onu_key(slot, pon, o.onu_id, fixed_slot)
+                where = f"{slot}/{pon}:{o.onu_id}"
+                owner = onus.get(key)
+                if owner is not None:
+                    issues.append(MergeIssue(ONU_COLLISION, tag, f"ONU {where} ({o.sn or 'sem SN'}) já ocupada por {owner}"))
+                    continue
+                sn = o.sn.strip().upper()
+                if sn and sn in sns:
+                    issues.append(MergeIssue(SN_DUPLICATE, tag, f"SN {o.sn} em {where} já existe em {sns[sn]}"))
+                    continue
+                onus[key] = f"{tag} {o.slot}/{o.pon}:{o.onu_id}"
+                if sn:
+                    sns[sn] = f"{tag} {o.slot}/{o.pon}:{o.onu_id}"
+                kept.add((o.slot, o.pon, o.onu_id))
+                out.onus.append(Onu(**{**vars(o), "slot": slot, "pon": pon}))
+
+            for s in n.services:
+                if (s.slot, s.pon, s.onu_id) not in kept:
+                    continue
+                out.services.append(OnuService(**{**vars(s), "slot": slot_of(s.slot),
+                                                  "pon": s.pon + src.pon_offset, "vlan": s.vlan + vo}))
+
+    out.vlans = sorted(vlans.values(), key=lambda v: v.vid)
+    out.trunks = list(trunks.values())
+    out.interfaces = list(ifaces.values())
+    out.routes = list(routes.values())
+    out.tcont_profiles = list(tconts.values())
+    return MergeResult(out, issues)
@@ -0,0 +1,76 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Iterable, List
+
+from .utils import compress_vlan_list
+
+
+@dataclass
+class PackRule:
+    """How one vendor command accepts a list of VLANs.
+
+    prefix/cont_prefix: text before the list on the first/following lines
+    (e.g. 'switchport trunk allowed vlan ' then '... allowed vlan add ').
+    max_line: longest line the CLI accepts (prefix + list + suffix).
+    max_items: most list items per command (Huawei 'vlan batch' takes 10), 0 = no limit.
+    ranges: vendor accepts 'a<range_sep>b' items; otherwise one item per VLAN.
+    """
+    prefix: str
+    cont_prefix: str = ""
+    suffix: str = ""
+    sep: str = ","
+    range_sep: str = "-"
+    max_line: int = 220
+    max_items: int = 0
+    ranges: bool = True
+
+
+def vlan_tokens(vlans: Iterable[int], rule: PackRule) -> List[str]:
+    """VLAN list items in the vendor's notation (ranges compressed when allowed)."""
+    ranges = compress_vlan_list(list(vlans))
+    if not rule.ranges:
+        return [str(v) for a, b in ranges for v in range(a, b + 1)]
+    out: List[str] = []
+    for a, b in ranges:
+        if a == b:
+            out.append(str(a))
+        elif b == a + 1 and not rule.max_items and len(rule.sep) <= len(rule.range_sep):
+            # '10,11' nunca é maior que '10-11' (só vale quando não há limite de itens)
+            out.append(str(a))
+            out.append(str(b))
+        else:
+            out.append(f"{a}{rule.range_sep}{b}")
+    return out
+
+
+def pack_tokens(tokens: List[str], rule: PackRule) -> List[str]:
+    """Greedily fill each line up to max_line/max_items.
+
+    Tokens keep their order, so filling every line as much as possible is
+    already the minimum number of lines.
+    """
+    out: List[str] = []
+    cont = rule.cont_prefix or rule.prefix
+    prefix = rule.prefix
+    cur: List[str] = []
+    cur_len = 0
+    for tok in tokens:
+        base = len(prefix) + len(rule.suffix)
+        extra = len(tok) + (len(rule.sep) if cur else 0)
+        full = rule.max_items and len(cur) >= rule.max_items
+        if cur and (full or base + cur_len + extra > rule.max_line):
+            out.append(prefix + rule.sep.join(cur) + rule.suffix)
+            prefix = cont
+            cur = []
+            cur_len = 0
+            extra = len(tok)
+        cur.append(tok)
+        cur_len += extra
+    if cur:
+        out.append(prefix + rule.sep.join(cur) + rule.suffix)
+    return out
+
+
+def pack_vlans(vlans: Iterable[int], rule: PackRule) -> List[str]:
+    """Fewest valid command lines that cover all VLANs under the vendor rule."""
+    return pack_tokens(vlan_tokens(vlans, rule), rule)
@@ -0,0 +1,159 @@
+from __future__ import annotations
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from functools import wraps
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+# OLT_MIGRATOR_PROFILE=cprofile | tracemalloc | cprofile,tracemalloc
+PROFILE_ENV = "OLT_MIGRATOR_PROFILE"
+# OLT_MIGRATOR_PERF_REPORT=/caminho/relatorio.json (gravado ao sair)
+REPORT_ENV = "OLT_MIGRATOR_PERF_REPORT"
+
+PROFILE_TOP = 25
+MAX_SPANS = 5000
+
+
+@dataclass
+class Span:
+    name: str
+    start: float
+    seconds: float = 0.0
+    depth: int = 0
+    meta: Dict[str, Any] = field(default_factory=dict)
+    peak_kib: Optional[float] = None
+    profile: Optional[str] = None
+
+
+class PerfRecorder:
+    """Collects timing spans; optional cProfile/tracemalloc capture for top-level spans.
+
+    Spans are cheap (two perf_counter calls) so they stay on all the time; only
+    the last MAX_SPANS are kept so long-running processes don't grow.
+    """
+
+    def __init__(self, modes: str = ""):
+        self.spans: Deque[Span] = deque(maxlen=MAX_SPANS)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.configure(modes)
+
+    def configure(self, modes: str) -> None:
+        parts = {m.strip().lower() for m in (modes or "").split(",") if m.strip()}
+        if "all" in parts:
+            parts = {"cprofile", "tracemalloc"}
+        self.cprofile = "cprofile" in parts
+        self.tracemalloc = "tracemalloc" in parts
+
+    def _stack(self) -> List[Span]:
+        st = getattr(self._local, "stack", None)
+        if st is None:
+            st = self._local.stack = []
+        return st
+
+    @contextmanager
+    def span(self, name: str, **meta: Any) -> Iterator[Span]:
+        stack = self._stack()
+        sp = Span(name=name, start=time.time(), depth=len(stack), meta=meta)
+        top = not stack
+        prof = None
+        started_tm = False
+        if self.tracemalloc:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tm = True
+            if stack:
+                # guarda o pico do pai antes de zerar para o filho
+                parent = stack[-1]
+                parent_peak = tracemalloc.get_traced_memory()[1] / 1024
+                parent.peak_kib = max(parent.peak_kib or 0.0, parent_peak)
+            tracemalloc.reset_peak()
+        if self.cprofile and top:
+            prof = cProfile.Profile()
+            try:
+                prof.enable()
+            except ValueError:
+                # outro profiler já ativo (ex.: depurador)
+                prof = None
+        stack.append(sp)
+        t0 = time.perf_counter()
+        try:
+            yield sp
+        finally:
+            sp.seconds = time.perf_counter() - t0
+            stack.pop()
+            if prof is not None:
+                prof.disable()
+                buf = io.StringIO()
+                pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(PROFILE_TOP)
+                sp.profile = buf.getvalue()
+            if self.tracemalloc and tracemalloc.is_tracing():
+                sp.peak_kib = round(max(sp.peak_kib or 0.0, tracemalloc.get_traced_memory()[1] / 1024), 1)
+                if stack:
+                    stack[-1].peak_kib = max(stack[-1].peak_kib or 0.0, sp.peak_kib)
+                if started_tm:
+                    tracemalloc.stop()
+            with self._lock:
+                self.spans.append(sp)
+
+    def timed(self, name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        def deco(fn: Callable[..., Any]) -> Callable[..., Any]:
+            @wraps(fn)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return deco
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = list(self.spans)
+        totals: Dict[str, Dict[str, float]] = {}
+        for sp in spans:
+            t = totals.setdefault(sp.name, {"calls": 0, "seconds": 0.0, "max_seconds": 0.0})
+            t["calls"] += 1
+            t["seconds"] += sp.seconds
+            t["max_seconds"] = max(t["max_seconds"], sp.seconds)
+        return {
+            "modes": {"cprofile": self.cprofile, "tracemalloc": self.tracemalloc},
+            "totals": totals,
+            "spans": [asdict(sp) for sp in spans],
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+
+    def summary_lines(self, last: int = 30) -> List[str]:
+        """Human-readable lines for the most recent spans (indented by depth)."""
+        with self._lock:
+            spans = list(self.spans)[-last:]
+        # spans fecham do filho para o pai; mostra em ordem de início
+        out: List[str] = []
+        for sp in sorted(spans, key=lambda s: (s.start, s.depth)):
+            mem = f"  pico {sp.peak_kib / 1024:.1f} MiB" if sp.peak_kib is not None else ""
+            out.append(f"{'  ' * sp.depth}{sp.name:<40} {sp.seconds * 1000:10.1f} ms{mem}")
+        return out
+
+
+recorder = PerfRecorder(os.environ.get(PROFILE_ENV, ""))
+
+
+def span(name: str, **meta: Any):
+    return recorder.span(name, **meta)
+
+
+def timed(name: str):
+    return recorder.timed(name)
@@ -0,0 +1,259 @@
+from __future__ import annotations
+import json
+import sqlite3
+from dataclasses import fields
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .models import InterfaceIP, NormalizedConfig, Onu, OnuService, Route, SectionSchema, TcontProfile, Trunk, Vlan
+
+# Projeto (.oltproj) = um arquivo SQLite com:
+#   meta           chave -> JSON (vendors, opções, fast, schema de cada seção)
+#   n_<campo>      listas do NormalizedConfig (vlans, onus, services, ...)
+#   t_<seção>      linhas editadas de cada SectionSchema do destino
+# Toda tabela tem "_id INTEGER PRIMARY KEY" (o rowid implícito pode ser renumerado por um
+# VACUUM); a ordem das linhas é a de _id. As tabelas de edição são lidas por página
+# (PagedSectionTableModel, "_id > ? ORDER BY _id LIMIT ?") e cada edição é uma transação
+# pequena, então um inventário de 200k serviços abre sem carregar tudo.
+
+PROJECT_SUFFIX = ".oltproj"
+PROJECT_FILTER = f"Projeto OLT (*{PROJECT_SUFFIX})"
+
+NORMALIZED_TABLES: Dict[str, type] = {
+    "vlans": Vlan,
+    "trunks": Trunk,
+    "interfaces": InterfaceIP,
+    "routes": Route,
+    "tcont_profiles": TcontProfile,
+    "onus": Onu,
+    "services": OnuService,
+}
+# colunas indexadas quando existem na tabela (buscas por ONU/PON/VLAN)
+INDEXED = ("slot", "pon", "onu_id", "vlan", "vid")
+EXTRA_COL = "_extra"
+ROW_ID = "_id"
+
+
+def _q(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class ProjectStore:
+    """SQLite-backed project: normalized source + edited target sections."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._columns: Dict[str, List[Tuple[str, str]]] = {}
+        self._add_row_ids()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    # -- meta ---------------------------------------------------------------
+    def set_meta(self, **values: Any) -> None:
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)",
+                                  [(k, json.dumps(v, ensure_ascii=False)) for k, v in values.items()])
+
+    def get_meta(self, key: str, default: Any = None) -> Any:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _create(self, table: str, cols: Sequence[Tuple[str, str]]) -> None:
+        c = self.conn
+        c.execute(f"DROP TABLE IF EXISTS {_q(table)}")
+        defs = ", ".join(f"{_q(k)} {'INTEGER' if t == 'int' else 'TEXT'}" for k, t in cols)
+        c.execute(f"CREATE TABLE {_q(table)} ({_q(ROW_ID)} INTEGER PRIMARY KEY, {defs}, {_q(EXTRA_COL)} TEXT)")
+        keys = [k for k, _ in cols]
+        if all(k in keys for k in ("slot", "pon", "onu_id")):
+            c.execute(f"CREATE INDEX {_q('ix_' + table + '_onu')} ON {_q(table)} (slot, pon, onu_id)")
+        for k in INDEXED:
+            if k in keys and k not in ("slot", "pon", "onu_id"):
+                c.execute(f"CREATE INDEX {_q('ix_' + table + '_' + k)} ON {_q(table)} ({_q(k)})")
+
+    @staticmethod
+    def _names(cols: Sequence[Tuple[str, str]]) -> str:
+        """Data columns in table order (without _id), quoted for SQL."""
+        return ", ".join(_q(k) for k in [k for k, _ in cols] + [EXTRA_COL])
+
+    def _insert_sql(self, table: str, cols: Sequence[Tuple[str, str]], with_id: bool = False) -> str:
+        marks = ", ".join("?" * (len(cols) + 1 + with_id))
+        return f"INSERT INTO {_q(table)} ({_q(ROW_ID) + ', ' if with_id else ''}{self._names(cols)}) VALUES ({marks})"
+
+    def _add_row_ids(self) -> None:
+        """Projects saved before _id existed: rebuild each table keeping the rowid order."""
+        tables = [("n_" + name, self._dc_columns(cls)) for name, cls in NORMALIZED_TABLES.items()]
+        tables += [("t_" + key, self.columns(key)) for key in self.section_keys()]
+        for table, cols in tables:
+            names = [r[1] for r in self.conn.execute(f"PRAGMA table_info({_q(table)})")]
+            if not names or ROW_ID in names:
+                continue
+            with self.conn:
+                for (ix,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ?",
+                                               (table,)).fetchall():
+                    self.conn.execute(f"DROP INDEX {_q(ix)}")
+                old = table + "_old"
+                self.conn.execute(f"ALTER TABLE {_q(table)} RENAME TO {_q(old)}")
+                self._create(table, cols)
+                names = self._names(cols)
+                self.conn.execute(f"INSERT INTO {_q(table)} ({_q(ROW_ID)}, {names}) "
+                                  f"SELECT rowid, {names} FROM {_q(old)} ORDER BY rowid")
+                self.conn.execute(f"DROP TABLE {_q(old)}")
+
+    @staticmethod
+    def _encoder(cols: Sequence[Tuple[str, str]]):
+        """row dict -> values tuple (schema columns + JSON of any other keys)."""
+        known = {k for k, _ in cols}
+        spec = [(k, 0 if t == "int" else "", t == "json") for k, t in cols]
+
+        def encode(row: Dict[str, Any]) -> List[Any]:
+            vals = [json.dumps(row.get(k, d)) if js else row.get(k, d) for k, d, js in spec]
+            extra = None if known.issuperset(row) else {k: v for k, v in row.items() if k not in known}
+            vals.append(json.dumps(extra, ensure_ascii=False) if extra else None)
+            return vals
+        return encode
+
+    @staticmethod
+    def _decode(vals: Sequence[Any], cols: Sequence[Tuple[str, str]]) -> Dict[str, Any]:
+        row: Dict[str, Any] = {}
+        for (k, t), v in zip(cols, vals):
+            row[k] = json.loads(v) if t == "json" and v is not None else v
+        extra = vals[len(cols)]
+        if extra:
+            row.update(json.loads(extra))
+        return row
+
+    # -- NormalizedConfig ----------------------------------------------------
+    @staticmethod
+    def _dc_columns(cls: type) -> List[Tuple[str, str]]:
+        out = []
+        for f in fields(cls):
+            t = str(f.type)
+            out.append((f.name, "int" if t in ("int", "Optional[int]") else "json" if t.startswith("List") else "str"))
+        return out
+
+    def write_normalized(self, n: NormalizedConfig) -> None:
+        with self.conn:
+            for name, cls in NORMALIZED_TABLES.items():
+                cols = self._dc_columns(cls)
+                self._create("n_" + name, cols)
+                enc = self._encoder(cols)
+                self.conn.executemany(self._insert_sql("n_" + name, cols),
+                                      (enc(vars(x)) for x in getattr(n, name)))
+        self.set_meta(extras=n.extras)
+
+    def read_normalized(self) -> NormalizedConfig:
+        n = NormalizedConfig(extras=self.get_meta("extras", {}) or {})
+        for name, cls in NORMALIZED_TABLES.items():
+            cols = self._dc_columns(cls)
+            try:
+                cur = self.conn.execute(f"SELECT {self._names(cols)} FROM {_q('n_' + name)} ORDER BY {_q(ROW_ID)}")
+            except sqlite3.OperationalError:
+                continue
+            setattr(n, name, [cls(**self._decode(r, cols)) for r in cur])
+        return n
+
+    # -- seções editáveis (t_<key>) -------------------------------------------
+    def columns(self, key: str) -> List[Tuple[str, str]]:
+        cols = self._columns.get(key)
+        if cols is None:
+            cols = self._columns[key] = [tuple(c) for c in self.get_meta(f"schema:{key}", [])]  # type: ignore[misc]
+        return cols
+
+    def section_keys(self) -> List[str]:
+        return list(self.get_meta("sections", []))
+
+    def write_sections(self, schemas: Sequence[SectionSchema], target_data: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Replace every target section (one transaction)."""
+        self._columns.clear()
+        with self.conn:
+            for sec in schemas:
+                cols = [(c.key, c.col_type) for c in sec.columns]
+                self._create("t_" + sec.key, cols)
+                enc = self._encoder(cols)
+                self.conn.executemany(self._insert_sql("t_" + sec.key, cols),
+                                      (enc(r) for r in target_data.get(sec.key, [])))
+                self.conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)",
+                                  (f"schema:{sec.key}", json.dumps(cols)))
+            self.conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES (?, ?)",
+                              ("sections", json.dumps([s.key for s in schemas])))
+
+    def row_ids(self, key: str) -> List[int]:
+        return [r[0] for r in self.conn.execute(f"SELECT {_q(ROW_ID)} FROM {_q('t_' + key)} ORDER BY {_q(ROW_ID)}")]
+
+    def count(self, key: str) -> int:
+        return self.conn.execute(f"SELECT COUNT(*) FROM {_q('t_' + key)}").fetchone()[0]
+
+    def fetch(self, key: str, after_id: int, limit: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """Up to `limit` rows with _id > after_id, in _id order (one page; ids need not be dense)."""
+        cols = self.columns(key)
+        cur = self.conn.execute(f"SELECT {_q(ROW_ID)}, {self._names(cols)} FROM {_q('t_' + key)} "
+                                f"WHERE {_q(ROW_ID)} > ? ORDER BY {_q(ROW_ID)} LIMIT ?", (after_id, limit))
+        return [(r[0], self._decode(r[1:], cols)) for r in cur]
+
+    def iter_section(self, key: str, batch: int = 5000) -> Iterator[Dict[str, Any]]:
+        cols = self.columns(key)
+        cur = self.conn.execute(f"SELECT {self._names(cols)} FROM {_q('t_' + key)} ORDER BY {_q(ROW_ID)}")
+        while True:
+            rows = cur.fetchmany(batch)
+            if not rows:
+                return
+            for r in rows:
+                yield self._decode(r, cols)
+
+    def read_sections(self) -> Dict[str, List[Dict[str, Any]]]:
+        return {k: list(self.iter_section(k)) for k in self.section_keys()}
+
+    def query(self, key: str, **where: Any) -> List[Tuple[int, Dict[str, Any]]]:
+        """Rows matching column=value filters (slot/pon/onu_id/vlan use the indexes)."""
+        cols = self.columns(key)
+        known = {k for k, _ in cols}
+        bad = [k for k in where if k not in known]
+        if bad:
+            raise KeyError(f"colunas desconhecidas em {key}: {', '.join(bad)}")
+        cond = " AND ".join(f"{_q(k)} = ?" for k in where) or "1"
+        cur = self.conn.execute(f"SELECT {_q(ROW_ID)}, {self._names(cols)} FROM {_q('t_' + key)} "
+                                f"WHERE {cond} ORDER BY {_q(ROW_ID)}", tuple(where.values()))
+        return [(r[0], self._decode(r[1:], cols)) for r in cur]
+
+    def update_cell(self, key: str, row_id: int, col: str, value: Any) -> None:
+        if col not in {k for k, _ in self.columns(key)}:
+            raise KeyError(col)
+        with self.conn:
+            self.conn.execute(f"UPDATE {_q('t_' + key)} SET {_q(col)} = ? WHERE {_q(ROW_ID)} = ?", (value, row_id))
+
+    def update_cells(self, key: str, col: str, values: Iterable[Tuple[int, Any]]) -> None:
+        """(row_id, value) pairs for one column, in a single transaction."""
+        if col not in {k for k, _ in self.columns(key)}:
+            raise KeyError(col)
+        with self.conn:
+            self.conn.executemany(f"UPDATE {_q('t_' + key)} SET {_q(col)} = ? WHERE {_q(ROW_ID)} = ?",
+                                  [(v, i) for i, v in values])
+
+    def insert_row(self, key: str, row: Dict[str, Any]) -> int:
+        cols = self.columns(key)
+        with self.conn:
+            cur = self.conn.execute(self._insert_sql("t_" + key, cols), self._encoder(cols)(row))
+        return int(cur.lastrowid)
+
+    def restore_rows(self, key: str, rows: Iterable[Tuple[int, Dict[str, Any]]]) -> None:
+        """Insert rows back under their previous ids (undo of a removal keeps the order)."""
+        cols = self.columns(key)
+        encode = self._encoder(cols)
+        with self.conn:
+            self.conn.executemany(self._insert_sql("t_" + key, cols, with_id=True),
+                                  [[i] + encode(r) for i, r in rows])
+
+    def delete_rows(self, key: str, row_ids: Iterable[int]) -> None:
+        with self.conn:
+            self.conn.executemany(f"DELETE FROM {_q('t_' + key)} WHERE {_q(ROW_ID)} = ?", [(i,) for i in row_ids])
+
+
+def open_project(path: str) -> ProjectStore:
+    if not path.endswith(PROJECT_SUFFIX):
+        path += PROJECT_SUFFIX
+    return ProjectStore(path)
@@ -0,0 +1,67 @@
+from __future__ import annotations
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from .models import SectionSchema
+
+# Linhas de seção já convertidas para os tipos do SectionSchema:
+#   colunas "int" -> int (vazio/inválido = 0), demais -> str sem espaços nas pontas.
+# A conversão acontece uma vez (from_normalized, edição na tabela, leitura do projeto)
+# e os renders leem row["pon"] direto, sem int(... or 0)/str(...).strip() por campo.
+# Chaves fora do schema são mantidas como vieram.
+
+Row = Dict[str, Any]
+
+
+class Records(List[Row]):
+    """Rows of one section whose schema columns are already typed."""
+
+
+def to_int(v: Any) -> int:
+    if type(v) is int:
+        return v
+    if v is None:
+        return 0
+    try:
+        return int(str(v).strip() or 0)
+    except ValueError:
+        return 0
+
+
+def to_str(v: Any) -> str:
+    return "" if v is None else str(v).strip()
+
+
+def coercer(columns: Sequence[Tuple[str, str]]) -> Callable[[Row], Row]:
+    """(key, col_type) pairs -> function returning a typed copy of a row."""
+    ints = [k for k, t in columns if t == "int"]
+    strs = [k for k, t in columns if t != "int"]
+
+    def coerce(row: Row) -> Row:
+        r = dict(row)
+        get = row.get
+        for k in ints:
+            v = get(k)
+            r[k] = v if type(v) is int else to_int(v)
+        for k in strs:
+            v = get(k)
+            r[k] = v if type(v) is str and (not v or not (v[0].isspace() or v[-1].isspace())) else to_str(v)
+        return r
+    return coerce
+
+
+def section_records(schema: SectionSchema, rows: Iterable[Row]) -> Records:
+    """Typed rows for `schema` (returned as is when they already are Records)."""
+    if isinstance(rows, Records):
+        return rows
+    coerce = coercer([(c.key, c.col_type) for c in schema.columns])
+    return Records(coerce(r) for r in rows)
+
+
+def typed_sections(schemas: Sequence[SectionSchema], target_data: Dict[str, List[Row]]) -> Dict[str, List[Row]]:
+    """target_data with every section known to `schemas` converted to Records (others untouched)."""
+    out = dict(target_data)
+    for sec in schemas:
+        rows = target_data.get(sec.key)
+        if rows is not None:
+            out[sec.key] = section_records(sec, rows)
+    return out
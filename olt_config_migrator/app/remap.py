@@ -0,0 +1,197 @@
+from __future__ import annotations
+import copy
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import NormalizedConfig
+from .perf import span
+from .utils import shallow_clone as _clone
+
+# Remapeamento de VLAN / slot / PON por tabela, aplicado no NormalizedConfig antes do
+# from_normalized() (vale para qualquer destino; os offsets do modo rápido continuam
+# sendo somados depois, no render).
+#
+# Regras, separadas por vírgula, ';' ou quebra de linha; a última que cobre um valor vence:
+#   100-199:2100     faixa -> faixa (100->2100 ... 199->2199)
+#   150:999          valor único (exceção dentro da faixa acima)
+#   300-399:+1000    deslocamento só nessa faixa
+#   2/5:1            (só PON) PON 5 do slot 2 -> PON 1; sem 'slot/' vale para todos os slots
+#
+# As regras viram tabelas densas (4096 VLANs, 256 slots, 256 PONs por slot) e cada coluna
+# (vid, slot, pon) é convertida numa passada só, por índice na tabela.
+
+VLAN_TABLE = 4096
+SLOT_TABLE = 256
+PON_TABLE = 256
+
+VLAN_COLLISION = "vlan_colisao"
+PON_COLLISION = "pon_colisao"
+ONU_COLLISION = "colisao_onu"
+
+_RULE = re.compile(r"^(?:(\d+)/)?(\d+)(?:\s*-\s*(\d+))?\s*:\s*([+-]?)(\d+)$")
+
+
+@dataclass
+class RemapIssue:
+    kind: str
+    detail: str
+
+
+@dataclass
+class Remap:
+    vlan: Optional[List[int]] = None                          # None = identidade
+    slot: Optional[List[int]] = None
+    pon: Dict[Optional[int], List[int]] = field(default_factory=dict)  # chave None = todos os slots
+
+    def pon_table(self, slot: int) -> Optional[List[int]]:
+        return self.pon.get(slot) or self.pon.get(None)
+
+
+def parse_rules(text: str, allow_scope: bool = False) -> List[Tuple[Optional[int], int, int, str, int]]:
+    """'100-199:2100, 150:999' -> [(scope, lo, hi, sign, target), ...]; ValueError on bad syntax."""
+    rules = []
+    for part in re.split(r"[,;\n]+", text or ""):
+        part = part.strip()
+        if not part:
+            continue
+        m = _RULE.match(part)
+        if not m or (m.group(1) and not allow_scope):
+            raise ValueError(f"regra inválida: '{part}' (use a-b:c, a:c ou a-b:+n)")
+        scope = int(m.group(1)) if m.group(1) else None
+        lo = int(m.group(2))
+        hi = int(m.group(3)) if m.group(3) else lo
+        if hi < lo:
+            raise ValueError(f"regra inválida: '{part}' (faixa invertida)")
+        rules.append((scope, lo, hi, m.group(4), int(m.group(5))))
+    return rules
+
+
+def _table(rules: List[Tuple[Optional[int], int, int, str, int]], size: int, lo_ok: int, hi_ok: int, what: str) -> List[int]:
+    table = list(range(size))
+    for _, lo, hi, sign, tgt in rules:
+        if hi >= size:
+            raise ValueError(f"{what} {hi} fora da tabela (máx. {size - 1})")
+        for v in range(lo, hi + 1):
+            new = v + tgt if sign == "+" else v - tgt if sign == "-" else tgt + (v - lo)
+            if not lo_ok <= new <= hi_ok:
+                raise ValueError(f"{what} {v} -> {new} fora da faixa {lo_ok}-{hi_ok}")
+            table[v] = new
+    return table
+
+
+def compile_remap(vlan_rules: str = "", slot_rules: str = "", pon_rules: str = "") -> Optional[Remap]:
+    """Compile rule texts into lookup tables; None when there is nothing to remap."""
+    vr, sr, pr = parse_rules(vlan_rules), parse_rules(slot_rules), parse_rules(pon_rules, allow_scope=True)
+    if not (vr or sr or pr):
+        return None
+    r = Remap()
+    if vr:
+        r.vlan = _table(vr, VLAN_TABLE, 1, 4094, "VLAN")
+    if sr:
+        r.slot = _table(sr, SLOT_TABLE, 0, SLOT_TABLE - 1, "slot")
+    if pr:
+        scopes = {s for s, *_ in pr}
+        common = [x for x in pr if x[0] is None]
+        for scope in scopes:
+            # regras do slot valem por cima das globais
+            rules = common if scope is None else common + [x for x in pr if x[0] == scope]
+            r.pon[scope] = _table(rules, PON_TABLE, 1, PON_TABLE - 1, "PON")
+    return r
+
+
+def remap_from_fast(fast: Dict[str, Any]) -> Optional[Remap]:
+    return compile_remap(str(fast.get("vlan_map", "") or ""), str(fast.get("slot_map", "") or ""),
+                         str(fast.get("pon_map", "") or ""))
+
+
+def _lookup(table: List[int], values: List[int]) -> List[int]:
+    size = len(table)
+    return [table[v] if 0 <= v < size else v for v in values]
+
+
+def apply_remap(n: NormalizedConfig, remap: Remap) -> Tuple[NormalizedConfig, List[RemapIssue]]:
+    """Remapped copy of `n` plus the collisions found (VLANs/PONs merged, ONU ids clashing).
+
+    `n` is not modified; rows whose values do not change are shared with it.
+    """
+    issues: List[RemapIssue] = []
+    out = copy.copy(n)
+    with span("remap.apply", onus=len(n.onus), services=len(n.services)):
+        vt = remap.vlan
+        if vt is not None:
+            # VLANs de origem diferentes que caem na mesma VLAN de destino
+            used = sorted({v.vid for v in n.vlans} | {s.vlan for s in n.services})
+            seen: Dict[int, int] = {}
+            for src, dst in zip(used, _lookup(vt, used)):
+                if dst in seen:
+                    issues.append(RemapIssue(VLAN_COLLISION, f"VLANs {seen[dst]} e {src} viram a mesma VLAN {dst}"))
+                else:
+                    seen[dst] = src
+            vlans, vids = [], set()
+            for v, vid in zip(n.vlans, _lookup(vt, [v.vid for v in n.vlans])):
+                if vid not in vids:
+                    vids.add(vid)
+                    vlans.append(_clone(v))
+                    vlans[-1].vid = vid
+            out.vlans = vlans
+            out.trunks = [_clone(t) for t in n.trunks]
+            for t in out.trunks:
+                t.tagged_vlans = list(dict.fromkeys(_lookup(vt, t.tagged_vlans)))
+            out.interfaces = [_clone(i) for i in n.interfaces]
+            for i in out.interfaces:
+                if i.vlan is not None:
+                    i.vlan = _lookup(vt, [i.vlan])[0]
+
+        def where(rows) -> Tuple[List[int], List[int]]:
+            slots = [x.slot for x in rows]
+            pons = [x.pon for x in rows]
+            new_slots = _lookup(remap.slot, slots) if remap.slot is not None else slots
+            if remap.pon:
+                ident = list(range(PON_TABLE))
+                tabs = {s: remap.pon_table(s) or ident for s in set(slots)}
+                new_pons = [tabs[s][p] if 0 <= p < PON_TABLE else p for s, p in zip(slots, pons)]
+            else:
+                new_pons = pons
+            return new_slots, new_pons
+
+        o_slots, o_pons = where(n.onus)
+        # PONs de origem diferentes que caem na mesma PON de destino
+        pon_src: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        reported = set()
+        for o, s2, p2 in zip(n.onus, o_slots, o_pons):
+            first = pon_src.setdefault((s2, p2), (o.slot, o.pon))
+            pair = (first, (o.slot, o.pon))
+            if first != pair[1] and pair not in reported:
+                reported.add(pair)
+                issues.append(RemapIssue(PON_COLLISION, f"PONs {first[0]}/{first[1]} e {o.slot}/{o.pon} viram {s2}/{p2}"))
+
+        onus, kept, taken = [], set(), set()
+        for o, s2, p2 in zip(n.onus, o_slots, o_pons):
+            key = (s2, p2, o.onu_id)
+            if key in taken:
+                issues.append(RemapIssue(ONU_COLLISION, f"ONU {o.slot}/{o.pon}:{o.onu_id} ({o.sn or 'sem SN'}) "
+                                                       f"cai em {s2}/{p2}:{o.onu_id}, já ocupada"))
+                continue
+            taken.add(key)
+            kept.add((o.slot, o.pon, o.onu_id))
+            if s2 != o.slot or p2 != o.pon:
+                o = _clone(o)
+                o.slot, o.pon = s2, p2
+            onus.append(o)
+        out.onus = onus
+
+        s_slots, s_pons = where(n.services)
+        s_vlans = [s.vlan for s in n.services]
+        if vt is not None:
+            s_vlans = _lookup(vt, s_vlans)
+        services = []
+        for s, s2, p2, v2 in zip(n.services, s_slots, s_pons, s_vlans):
+            if (s.slot, s.pon, s.onu_id) not in kept:
+                continue
+            if s2 != s.slot or p2 != s.pon or v2 != s.vlan:
+                s = _clone(s)
+                s.slot, s.pon, s.vlan = s2, p2, v2
+            services.append(s)
+        out.services = services
+    return out, issues
@@ -0,0 +1,299 @@
+from __future__ import annotations
+import base64
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from .batch import DEFAULT_OPTIONS, migrate_lines
+from .detect import AUTO
+from .perf import span
+from .remap import remap_from_fast
+from .sources import iter_upload
+from .tcont import policy_from_fast
+from .vendors.registry import get_registry
+
+# Serviço HTTP/JSON local (NOC, scripts de provisionamento) em cima do registry de adapters.
+#
+#   GET  /health     {"ok": true, "workers": ..., "pending": ..., "cache": ...}
+#   GET  /vendors    [{"id": "zte", "label": "..."}, ...]
+#   POST /migrate    JSON {"to": "zte", "from": "auto", "name": "olt.txt", "backup": "<texto>"
+#                    ou "backup_b64": "<gz/zip em base64>", "fast": {...}, "options": {...}}
+#                    ou o backup cru no corpo com ?to=zte&from=auto&name=olt.txt
+#
+# Parse/render rodam num pool de processos. A fila é limitada (workers + queue): cheia -> 503.
+# Cada pedido espera no máximo `timeout` segundos (504; o processo termina o trabalho e o
+# resultado ainda entra no cache). Resultados ficam num LRU pela sha256 de backup + parâmetros;
+# pedidos iguais em andamento esperam o mesmo processamento. Se um processo do pool morre
+# (falta de memória, kill), o pool é recriado e só os pedidos que estavam nele recebem 500.
+
+DEFAULT_PORT = 8765
+MAX_BODY = 256 * 1024 * 1024
+CACHE_ENTRIES = 64
+
+
+class ServiceError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def migrate_upload(data: bytes, name: str, src: str, dst: str, fast: Dict[str, Any],
+                   options: Dict[str, bool]) -> Dict[str, Any]:
+    """Migrate an in-memory backup (every zip member); runs in the worker processes."""
+    t0 = time.perf_counter()
+    results = []
+    for member, lines in iter_upload(name, data):
+        res = migrate_lines(member, lines, src, dst, fast, options)
+        n = res.normalized
+        results.append({
+            "name": member, "src": res.src,
+            "summary": {"vlans": len(n.vlans), "trunks": len(n.trunks), "interfaces": len(n.interfaces),
+                        "routes": len(n.routes), "tcont_profiles": len(n.tcont_profiles),
+                        "onus": len(n.onus), "services": len(n.services)},
+            "issues": [{"kind": i.kind, "detail": i.detail} for i in res.issues],
+            "stats": res.stats, "script": res.script,
+        })
+    return {"dst": dst, "results": results, "worker_ms": (time.perf_counter() - t0) * 1000}
+
+
+class MigrationService:
+    """Process pool + bounded admission + result cache; independent of the HTTP layer."""
+
+    def __init__(self, workers: int = 2, queue: int = 8, timeout: float = 120.0, cache_entries: int = CACHE_ENTRIES):
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+        self.slots = threading.BoundedSemaphore(self.workers + max(0, queue))
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.cache_entries = cache_entries
+        self.inflight: Dict[str, Tuple[Future, ProcessPoolExecutor]] = {}
+        self.lock = threading.RLock()  # o callback pode rodar na hora, dentro do lock
+        self.counters = {"requests": 0, "cache_hits": 0, "rejected": 0, "timeouts": 0, "errors": 0, "pool_restarts": 0}
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def health(self) -> Dict[str, Any]:
+        with self.lock:
+            return {"ok": True, "workers": self.workers, "pending": len(self.inflight),
+                    "cache": len(self.cache), **self.counters}
+
+    @staticmethod
+    def request_key(data: bytes, src: str, dst: str, fast: Dict[str, Any], options: Dict[str, bool]) -> str:
+        h = hashlib.sha256(data)
+        h.update(json.dumps([src, dst, fast, options], sort_keys=True, default=str).encode("utf-8"))
+        return h.hexdigest()
+
+    def _restart_pool(self, broken: ProcessPoolExecutor) -> None:
+        """Replace `broken` (a worker died) with a fresh pool, once, whoever notices first."""
+        with self.lock:
+            if self.pool is not broken:
+                return
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            self.counters["pool_restarts"] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, *args: Any) -> Tuple[Future, ProcessPoolExecutor]:
+        pool = self.pool
+        try:
+            return pool.submit(migrate_upload, *args), pool
+        except BrokenProcessPool:
+            self._restart_pool(pool)
+            pool = self.pool
+            return pool.submit(migrate_upload, *args), pool
+
+    def _finished(self, key: str, fut: Future) -> None:
+        self.slots.release()
+        with self.lock:
+            self.inflight.pop(key, None)
+            if not fut.cancelled() and fut.exception() is None:
+                self.cache[key] = fut.result()
+                while len(self.cache) > self.cache_entries:
+                    self.cache.popitem(last=False)
+
+    def migrate(self, data: bytes, name: str, src: str, dst: str, fast: Dict[str, Any],
+                options: Dict[str, bool]) -> Dict[str, Any]:
+        key = self.request_key(data, src, dst, fast, options)
+        with self.lock:
+            self.counters["requests"] += 1
+            hit = self.cache.get(key)
+            if hit is not None:
+                self.cache.move_to_end(key)
+                self.counters["cache_hits"] += 1
+                return {**hit, "cached": True}
+            running = self.inflight.get(key)
+            if running is None:
+                if not self.slots.acquire(blocking=False):
+                    self.counters["rejected"] += 1
+                    raise ServiceError(HTTPStatus.SERVICE_UNAVAILABLE, "fila cheia, tente de novo em instantes")
+                try:
+                    running = self._submit(data, name, src, dst, fast, options)
+                except BaseException:
+                    self.slots.release()
+                    raise
+                self.inflight[key] = running
+                running[0].add_done_callback(lambda f, k=key: self._finished(k, f))
+        fut, pool = running
+        try:
+            out = fut.result(timeout=self.timeout)
+        except FutureTimeout:
+            with self.lock:
+                self.counters["timeouts"] += 1
+            raise ServiceError(HTTPStatus.GATEWAY_TIMEOUT, f"migração passou de {self.timeout:g}s")
+        except BrokenProcessPool:
+            self._restart_pool(pool)
+            with self.lock:
+                self.counters["errors"] += 1
+            raise ServiceError(HTTPStatus.INTERNAL_SERVER_ERROR,
+                               "o processo de migração caiu (memória?); o pool foi reiniciado, tente de novo")
+        except ValueError as e:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, str(e))
+        except Exception as e:
+            with self.lock:
+                self.counters["errors"] += 1
+            raise ServiceError(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(e).__name__}: {e}")
+        return {**out, "cached": False}
+
+
+def parse_request(body: bytes, content_type: str, query: Dict[str, List[str]]) -> Tuple[bytes, str, str, str, Dict[str, Any], Dict[str, bool]]:
+    """(backup, name, src, dst, fast, options) from a JSON body or a raw upload + query string."""
+    if content_type.startswith("application/json"):
+        try:
+            req = json.loads(body or b"{}")
+        except ValueError as e:
+            raise ServiceError(HTTPStatus.BAD_REQUEST, f"JSON inválido: {e}")
+        if not isinstance(req, dict):
+            raise ServiceError(HTTPStatus.BAD_REQUEST, "o corpo JSON deve ser um objeto")
+        if "backup_b64" in req:
+            try:
+                data = base64.b64decode(req["backup_b64"], validate=True)
+            except ValueError:
+                raise ServiceError(HTTPStatus.BAD_REQUEST, "backup_b64 inválido")
+        else:
+            data = str(req.get("backup", "")).encode("utf-8")
+    else:
+        data = body
+        req = {k: v[-1] for k, v in query.items()}
+        for k in ("fast", "options"):
+            if k in req:
+                try:
+                    req[k] = json.loads(req[k])
+                except ValueError:
+                    raise ServiceError(HTTPStatus.BAD_REQUEST, f"'{k}' deve ser JSON")
+    reg = get_registry()
+    dst = str(req.get("to", "")).lower()
+    src = str(req.get("from", AUTO) or AUTO).lower()
+    if dst not in reg:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, f"destino inválido '{dst}' (use {', '.join(sorted(reg))})")
+    if src != AUTO and src not in reg:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, f"origem inválida '{src}'")
+    if not data:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, "backup vazio")
+    fast = req.get("fast") or {}
+    options = req.get("options") or {}
+    for k, v in (("fast", fast), ("options", options)):
+        if not isinstance(v, dict):
+            raise ServiceError(HTTPStatus.BAD_REQUEST, f"'{k}' deve ser um objeto")
+    options = {**DEFAULT_OPTIONS, **{str(k): bool(v) for k, v in options.items()}}
+    try:
+        remap_from_fast(fast)
+        policy_from_fast(fast)
+    except ValueError as e:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, str(e))
+    return data, str(req.get("name", "") or "backup.txt"), src, dst, fast, options
+
+
+class _Server(ThreadingHTTPServer):
+    # backlog do listen(): o padrão (5) derruba conexões em rajadas de clientes;
+    # quem controla a carga é a fila do MigrationService (503)
+    request_queue_size = 128
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "OltMigrator/1"
+    service: MigrationService  # definido em make_server()
+    quiet = False
+
+    def _send(self, status: HTTPStatus, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if status == HTTPStatus.SERVICE_UNAVAILABLE:
+            self.send_header("Retry-After", "2")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        if path == "/health":
+            self._send(HTTPStatus.OK, self.service.health())
+        elif path == "/vendors":
+            self._send(HTTPStatus.OK, [{"id": vid, "label": ad.label} for vid, ad in get_registry().items()])
+        else:
+            self._send(HTTPStatus.NOT_FOUND, {"error": "não encontrado"})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/migrate":
+            self._send(HTTPStatus.NOT_FOUND, {"error": "não encontrado"})
+            return
+        t0 = time.perf_counter()
+        try:
+            try:
+                size = int(self.headers.get("Content-Length") or 0)
+            except ValueError:
+                raise ServiceError(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+            if size < 0:
+                raise ServiceError(HTTPStatus.BAD_REQUEST, "Content-Length inválido")
+            if size > MAX_BODY:
+                raise ServiceError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"backup maior que {MAX_BODY // 2 ** 20} MB")
+            body = self.rfile.read(size)
+            args = parse_request(body, self.headers.get("Content-Type", ""), parse_qs(url.query))
+            with span("service.migrate", dst=args[3], bytes=len(args[0])):
+                out = self.service.migrate(*args)
+        except ServiceError as e:
+            self._send(e.status, {"error": str(e)})
+            return
+        except Exception as e:  # nunca derruba a conexão sem resposta
+            with self.service.lock:
+                self.service.counters["errors"] += 1
+            self._send(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(e).__name__}: {e}"})
+            return
+        out["ms"] = (time.perf_counter() - t0) * 1000
+        self._send(HTTPStatus.OK, out)
+
+
+def make_server(service: MigrationService, host: str = "127.0.0.1", port: int = DEFAULT_PORT,
+                quiet: bool = False) -> ThreadingHTTPServer:
+    """HTTP server bound to `service` (port 0 = any free port; see server.server_address)."""
+    handler = type("Handler", (_Handler,), {"service": service, "quiet": quiet})
+    server = _Server((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(host: str = "127.0.0.1", port: int = DEFAULT_PORT, workers: int = 2, queue: int = 8,
+          timeout: float = 120.0) -> None:
+    service = MigrationService(workers, queue, timeout)
+    server = make_server(service, host, port)
+    print(f"ouvindo em http://{host}:{server.server_address[1]} ({workers} processos, fila {queue}, timeout {timeout:g}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
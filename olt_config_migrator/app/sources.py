@@ -0,0 +1,131 @@
+from __future__ import annotations
+import bz2
+import gzip
+import io
+import lzma
+import os
+import zipfile
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, List, Tuple
+
+# Backups chegam como texto puro ou compactados (.gz/.bz2/.xz/.zip, às vezes vários
+# configs num zip). Tudo é lido como um stream de linhas descompactado sob demanda:
+# nada vai para arquivo temporário e o texto inteiro nunca fica em memória.
+
+# 'arquivo.zip!membro.txt' seleciona um membro do zip
+MEMBER_SEP = "!"
+ARCHIVE_EXTS = (".gz", ".bz2", ".xz", ".zip")
+FILE_FILTER = "Config (*.txt *.cfg *.conf *.bak *.gz *.bz2 *.xz *.zip);;Todos (*.*)"
+
+_MAGIC = (
+    (b"\x1f\x8b", lambda f: gzip.GzipFile(fileobj=f)),
+    (b"BZh", bz2.BZ2File),
+    (b"\xfd7zXZ\x00", lzma.LZMAFile),
+)
+_ZIP_MAGIC = b"PK\x03\x04"
+
+
+def split_member(path: str) -> Tuple[str, str]:
+    """'a.zip!dir/b.txt' -> ('a.zip', 'dir/b.txt'); plain paths -> (path, '')."""
+    if MEMBER_SEP in path and not os.path.exists(path):
+        base, member = path.split(MEMBER_SEP, 1)
+        return base, member
+    return path, ""
+
+
+def _decompressing(raw: BinaryIO) -> BinaryIO:
+    """Wrap `raw` in the matching decompressor (by magic bytes), or return it as is."""
+    buf = raw if hasattr(raw, "peek") else io.BufferedReader(raw)  # type: ignore[arg-type]
+    head = buf.peek(6)[:6]
+    for magic, opener in _MAGIC:
+        if head.startswith(magic):
+            return opener(buf)  # type: ignore[return-value]
+    return buf
+
+
+def is_zip(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(4) == _ZIP_MAGIC
+
+
+def list_members(path: str) -> List[str]:
+    """Config members of a zip (directories skipped); [] for anything else."""
+    if not is_zip(path):
+        return []
+    with zipfile.ZipFile(path) as zf:
+        return [i.filename for i in zf.infolist() if not i.is_dir()]
+
+
+@contextmanager
+def open_binary(path: str) -> Iterator[BinaryIO]:
+    """Binary stream of a backup, decompressed on the fly (zip member via 'a.zip!m')."""
+    base, member = split_member(path)
+    if is_zip(base):
+        with zipfile.ZipFile(base) as zf:
+            if not member:
+                names = [i.filename for i in zf.infolist() if not i.is_dir()]
+                if len(names) != 1:
+                    raise ValueError(f"{base}: zip com {len(names)} arquivos, indique o membro ({base}{MEMBER_SEP}<nome>)")
+                member = names[0]
+            with zf.open(member) as raw:
+                yield _decompressing(raw)
+        return
+    with open(base, "rb") as raw:
+        yield _decompressing(raw)
+
+
+def _decode(raw: bytes) -> str:
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("latin-1")
+
+
+def iter_lines(path: str) -> Iterator[str]:
+    """Decoded lines (no line terminator) of a plain or compressed backup.
+
+    Decodifica linha a linha (utf-8, senão latin-1), o mesmo critério de
+    read_text_smart sem precisar do arquivo inteiro.
+    """
+    with open_binary(path) as f:
+        yield from _decoded_lines(f)
+
+
+def _decoded_lines(f: BinaryIO) -> Iterator[str]:
+    first = True
+    for raw in f:
+        if first:
+            raw = raw[3:] if raw.startswith(b"\xef\xbb\xbf") else raw
+            first = False
+        yield _decode(raw).rstrip("\r\n")
+
+
+def iter_sources(path: str) -> Iterator[Tuple[str, Iterator[str]]]:
+    """(name, lines) for every config in `path`: each zip member, or the file itself."""
+    base, member = split_member(path)
+    members = [] if member else list_members(base)
+    if not members:
+        yield os.path.basename(path), iter_lines(path)
+        return
+    for m in members:
+        yield m, iter_lines(f"{base}{MEMBER_SEP}{m}")
+
+
+def source_names(path: str) -> List[str]:
+    """Names iter_sources() yields for `path`, without reading the configs."""
+    base, member = split_member(path)
+    members = [] if member else list_members(base)
+    return members or [os.path.basename(path)]
+
+
+def iter_upload(name: str, data: bytes) -> Iterator[Tuple[str, Iterator[str]]]:
+    """Same as iter_sources() for a backup received in memory (HTTP upload)."""
+    if not data.startswith(_ZIP_MAGIC):
+        yield name, _decoded_lines(_decompressing(io.BytesIO(data)))
+        return
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            with zf.open(info) as raw:
+                yield info.filename, _decoded_lines(_decompressing(raw))
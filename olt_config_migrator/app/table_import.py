@@ -0,0 +1,238 @@
+from __future__ import annotations
+import csv
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .models import SectionSchema
+from .perf import span
+from .records import Row, to_str
+from .remap import RemapIssue
+from .sources import iter_lines
+
+# Importação de planilhas (CSV/TSV) para as tabelas de seção do editor.
+#   1. cabeçalho -> colunas do schema (pela chave ou pelo rótulo, sem acento/caixa/pontuação,
+#      mais alguns apelidos usuais: serial, login, senha, ...); colunas desconhecidas são ignoradas
+#   2. o arquivo é lido em stream e cada valor convertido pelo col_type; célula vazia = "não mexe"
+#   3. upsert pela chave natural da seção (slot, pon, onu_id[, svc_local_id], vid, name, ...):
+#      as linhas importadas ficam num dict pela chave e as da tabela passam uma vez por ele,
+#      então o custo é O(tabela + arquivo) e só as células que mudaram entram no plano
+# O plano (ImportPlan) é aplicado pelo modelo de uma vez, num único reset, e vira uma ação
+# só na pilha de desfazer.
+
+FILE_FILTER = "Planilha (*.csv *.tsv *.txt *.gz);;Todos (*.*)"
+MAX_ISSUES = 200
+
+# chaves naturais, da mais específica para a mais genérica: vale a primeira que o schema tem
+NATURAL_KEYS: Tuple[Tuple[str, ...], ...] = (
+    ("slot", "pon", "onu_id", "svc_local_id"),
+    ("slot", "pon", "onu_id"),
+    ("vid",),
+    ("prefix", "next_hop"),
+    ("ifname",),
+    ("name",),
+)
+
+ALIASES = {
+    "serial": "sn", "serialnumber": "sn", "gponsn": "sn",
+    "tipo": "onu_type", "modelo": "onu_type", "type": "onu_type",
+    "descricao": "name", "description": "name", "nome": "name",
+    "login": "pppoe_user", "usuario": "pppoe_user", "user": "pppoe_user",
+    "senha": "pppoe_pass", "password": "pppoe_pass",
+    "onu": "onu_id", "onuid": "onu_id", "servico": "svc_local_id", "svc": "svc_local_id",
+    "vlanid": "vlan", "porta": "uni_port", "uni": "uni_port",
+}
+
+BAD_VALUE = "valor_invalido"
+NO_KEY = "sem_chave"
+DUPLICATE = "duplicada_no_arquivo"
+
+_DELIMS = ("\t", ";", ",")
+
+
+def _norm(s: str) -> str:
+    s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode("ascii")
+    return re.sub(r"[^a-z0-9]", "", s.lower())
+
+
+def natural_key(schema: SectionSchema) -> Tuple[str, ...]:
+    keys = {c.key for c in schema.columns}
+    for cand in NATURAL_KEYS:
+        if keys.issuperset(cand):
+            return cand
+    return (schema.columns[0].key,) if schema.columns else ()
+
+
+def map_headers(schema: SectionSchema, headers: Sequence[str], mapping: Optional[Dict[str, str]] = None) -> Dict[int, str]:
+    """Header position -> schema column key (explicit `mapping` by header text wins)."""
+    keys = {c.key for c in schema.columns}
+    by_name: Dict[str, str] = {}
+    for c in schema.columns:
+        by_name.setdefault(_norm(c.label), c.key)
+    for c in schema.columns:
+        by_name[_norm(c.key)] = c.key  # a chave vence o rótulo
+    out: Dict[int, str] = {}
+    for i, h in enumerate(headers):
+        if mapping and h in mapping:
+            if mapping[h] in keys:
+                out[i] = mapping[h]
+            continue
+        n = _norm(h)
+        key = by_name.get(n) or ALIASES.get(n)
+        if key in keys and key not in out.values():
+            out[i] = key
+    return out
+
+
+def sniff_delimiter(line: str) -> str:
+    counts = [(line.count(d), d) for d in _DELIMS]
+    best = max(counts)
+    return best[1] if best[0] else ","
+
+
+@dataclass
+class ImportPlan:
+    section: str
+    key_cols: Tuple[str, ...]
+    columns: List[str]                                        # colunas do schema presentes no arquivo
+    updates: Dict[str, Tuple[List[int], List[Any], List[Any]]] = field(default_factory=dict)  # col -> (linhas, antigos, novos)
+    inserts: List[Row] = field(default_factory=list)
+    read: int = 0
+    matched: int = 0
+    unchanged: int = 0
+    issues: List[RemapIssue] = field(default_factory=list)
+    issue_count: int = 0
+    ignored_headers: List[str] = field(default_factory=list)
+
+    @property
+    def updated_rows(self) -> int:
+        return self.matched - self.unchanged
+
+    @property
+    def changed_cells(self) -> int:
+        return sum(len(v[0]) for v in self.updates.values())
+
+    @property
+    def empty(self) -> bool:
+        return not self.updates and not self.inserts
+
+    def summary(self) -> str:
+        s = (f"{self.read} linhas lidas: {self.updated_rows} atualizadas ({self.changed_cells} células), "
+             f"{self.unchanged} iguais, {len(self.inserts)} novas")
+        if self.issue_count:
+            s += f", {self.issue_count} com problema"
+        if self.ignored_headers:
+            s += f"; colunas ignoradas: {', '.join(self.ignored_headers)}"
+        return s
+
+    def _issue(self, kind: str, detail: str) -> None:
+        self.issue_count += 1
+        if len(self.issues) < MAX_ISSUES:
+            self.issues.append(RemapIssue(kind, detail))
+
+
+def _typed_rows(schema: SectionSchema, header: Sequence[str], body: Iterable[Sequence[str]], cols: Dict[int, str],
+                plan: ImportPlan) -> Iterator[Tuple[int, Row]]:
+    """(file line, partial typed row) per data line; empty cells are left out."""
+    types = {c.key: c.col_type for c in schema.columns}
+    spec = [(i, k, types[k] == "int") for i, k in sorted(cols.items())]
+    for no, rec in enumerate(body, 2):
+        if not any(rec):
+            continue
+        plan.read += 1
+        row: Row = {}
+        for i, k, is_int in spec:
+            if i >= len(rec):
+                continue
+            v = rec[i].strip()
+            if not v:
+                continue
+            if is_int:
+                try:
+                    row[k] = int(v)
+                except ValueError:
+                    plan._issue(BAD_VALUE, f"linha {no}: {k}='{v}' não é número")
+                    continue
+            else:
+                row[k] = v
+        yield no, row
+
+
+def plan_import(schema: SectionSchema, existing: Iterable[Row], header: Sequence[str], body: Iterable[Sequence[str]],
+                mapping: Optional[Dict[str, str]] = None, key_cols: Optional[Sequence[str]] = None) -> ImportPlan:
+    """Upsert plan of `body` (rows of cells under `header`) against the current section rows.
+
+    `existing` is read once, in table order (positions in the plan are indexes in it).
+    """
+    key_cols = tuple(key_cols or natural_key(schema))
+    cols = map_headers(schema, header, mapping)
+    plan = ImportPlan(schema.key, key_cols, [cols[i] for i in sorted(cols)],
+                      ignored_headers=[h for i, h in enumerate(header) if i not in cols and h.strip()])
+    missing = [k for k in key_cols if k not in cols.values()]
+    if missing:
+        raise ValueError(f"a planilha não tem a coluna da chave: {', '.join(missing)} "
+                         f"(colunas reconhecidas: {', '.join(plan.columns) or 'nenhuma'})")
+
+    with span("import.plan", section=schema.key):
+        # 1) planilha -> dict pela chave (a última linha com a mesma chave vence)
+        incoming: Dict[Tuple[Any, ...], Row] = {}
+        for no, row in _typed_rows(schema, header, body, cols, plan):
+            try:
+                key = tuple(row[k] for k in key_cols)
+            except KeyError:
+                plan._issue(NO_KEY, f"linha {no}: chave ({', '.join(key_cols)}) incompleta")
+                continue
+            if key in incoming:
+                plan._issue(DUPLICATE, f"linha {no}: chave {key} repetida, vale a última")
+                incoming[key].update(row)
+            else:
+                incoming[key] = row
+
+        # 2) tabela atual: uma passada, só compara as linhas que estão na planilha
+        updates: Dict[str, Tuple[List[int], List[Any], List[Any]]] = {}
+        for pos, cur in enumerate(existing):
+            if not incoming:
+                break
+            new = incoming.pop(tuple(cur.get(k) for k in key_cols), None)
+            if new is None:
+                continue
+            plan.matched += 1
+            changed = False
+            for k, v in new.items():
+                old = cur.get(k)
+                if old != v:
+                    u = updates.get(k)
+                    if u is None:
+                        u = updates[k] = ([], [], [])
+                    u[0].append(pos)
+                    u[1].append(old)
+                    u[2].append(v)
+                    changed = True
+            plan.unchanged += not changed
+        plan.updates = updates
+
+        # 3) o que sobrou vira linha nova (colunas ausentes com o padrão do tipo)
+        defaults = {c.key: (0 if c.col_type == "int" else "") for c in schema.columns}
+        plan.inserts = [{**defaults, **row} for row in incoming.values()]
+    return plan
+
+
+def read_table(path: str) -> Tuple[List[str], Iterator[List[str]]]:
+    """(header, data rows) of a CSV/TSV file, streamed (delimiter from the header line)."""
+    lines = iter_lines(path)
+    first = next(lines, "")
+    if not first.strip():
+        raise ValueError(f"{path}: arquivo vazio")
+    delim = "\t" if path.lower().endswith((".tsv", ".tsv.gz")) else sniff_delimiter(first)
+    header = [to_str(h) for h in next(csv.reader([first], delimiter=delim))]
+    return header, csv.reader(lines, delimiter=delim)
+
+
+def plan_import_file(schema: SectionSchema, existing: Iterable[Row], path: str,
+                     mapping: Optional[Dict[str, str]] = None) -> ImportPlan:
+    header, body = read_table(path)
+    try:
+        return plan_import(schema, existing, header, body, mapping)
+    except csv.Error as e:
+        raise ValueError(f"{path}: {e}") from None
@@ -1,15 +1,97 @@
 from __future__ import annotations
-from typing import Any, Dict, List
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Sequence
 from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
 from .models import SectionSchema
+from .records import section_records, to_int, to_str
+from .table_import import ImportPlan
+from .undo import CellEdit, RowsInserted, RowsRemoved, UndoStack, cell_runs, insert_positions, remove_positions
 
-class SectionTableModel(QAbstractTableModel):
+if TYPE_CHECKING:
+    from .project import ProjectStore
+
+# acima disso um dataChanged cobre da primeira à última linha alterada
+MAX_CHANGED_RUNS = 64
+
+
+class _UndoMixin:
+    """Undo/redo (app/undo.py) and bulk import (app/table_import.py) shared by both table models.
+
+    Os modelos implementam _set_cells/_append_rows (sem sinais) e apply_insert/apply_remove;
+    nada disso grava na pilha de desfazer.
+    """
+
+    def _init_undo(self) -> None:
+        self.undo = UndoStack()
+        self._cols = {c.key: i for i, c in enumerate(self.schema.columns)}
+
+    def undo_last(self) -> str:
+        label = self.undo.undo(self)
+        if label:
+            self.dataChangedSignal.emit()
+        return label
+
+    def redo_last(self) -> str:
+        label = self.undo.redo(self)
+        if label:
+            self.dataChangedSignal.emit()
+        return label
+
+    def apply_cells(self, key: str, rows: Sequence[int], values: Sequence[Any]) -> None:
+        self._set_cells(key, rows, values)
+        self._emit_cells(key, rows)
+
+    def apply_import(self, plan: ImportPlan) -> None:
+        """Apply an ImportPlan in a single model reset, as one undoable action."""
+        if plan.empty:
+            return
+        n = self.rowCount()
+        self.beginResetModel()
+        try:
+            with self.undo.group(f"importar planilha ({plan.updated_rows} atualizadas, {len(plan.inserts)} novas)"):
+                for key, (rows, old, new) in plan.updates.items():
+                    self._set_cells(key, rows, new)
+                    self.undo.push(CellEdit(key, rows, old, new))
+                if plan.inserts:
+                    ids = self._append_rows(plan.inserts)
+                    self.undo.push(RowsInserted(list(range(n, n + len(plan.inserts))), plan.inserts, ids))
+        finally:
+            self.endResetModel()
+        self.dataChangedSignal.emit()
+
+    def _emit_cells(self, key: str, rows: Sequence[int]) -> None:
+        col = self._cols.get(key)
+        if col is None or not rows:
+            return
+        roles = [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole]
+        runs = cell_runs(rows)
+        if len(runs) > MAX_CHANGED_RUNS:
+            runs = [(runs[0][0], runs[-1][1])]
+        for lo, hi in runs:
+            self.dataChanged.emit(self.index(lo, col), self.index(hi, col), roles)
+
+    def _splice(self, positions: Sequence[int], insert: bool, mutate: Callable[[], None]) -> None:
+        # uma linha: sinais de inserção/remoção; várias: reset (a view só relê as visíveis)
+        if len(positions) == 1:
+            p = positions[0]
+            (self.beginInsertRows if insert else self.beginRemoveRows)(QModelIndex(), p, p)
+            mutate()
+            (self.endInsertRows if insert else self.endRemoveRows)()
+        else:
+            self.beginResetModel()
+            mutate()
+            self.endResetModel()
+
+
+class SectionTableModel(_UndoMixin, QAbstractTableModel):
     dataChangedSignal = pyqtSignal()
 
     def __init__(self, schema: SectionSchema, rows: List[Dict[str, Any]] | None = None):
         super().__init__()
         self.schema = schema
-        self.rows: List[Dict[str, Any]] = rows or []
+        # linhas já tipadas pelo schema; setData mantém os tipos (app/records.py)
+        self.rows: List[Dict[str, Any]] = section_records(schema, rows or [])
+        self._init_undo()
 
     def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
         return len(self.rows)
@@ -49,32 +131,184 @@ class SectionTableModel(QAbstractTableModel):
         col = self.schema.columns[index.column()]
         if not col.editable:
             return False
+        value = to_int(value) if col.col_type == "int" else to_str(value)
         row = self.rows[index.row()]
-        if col.col_type == "int":
-            try:
-                row[col.key] = int(str(value).strip())
-            except Exception:
-                row[col.key] = 0
+        old = row.get(col.key)
+        if old == value:
+            return True
+        row[col.key] = value
+        self.undo.push(CellEdit(col.key, [index.row()], [old], [value]))
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
+        self.dataChangedSignal.emit()
+        return True
+
+    def add_row(self):
+        n = len(self.rows)
+        row = {c.key: (0 if c.col_type == "int" else "") for c in self.schema.columns}
+        self._splice([n], True, lambda: self.rows.append(row))
+        self.undo.push(RowsInserted([n], [row]))
+        self.dataChangedSignal.emit()
+
+    def remove_rows(self, indexes: List[int]):
+        rows = sorted({r for r in indexes if 0 <= r < len(self.rows)})
+        if not rows:
+            return
+        removed: List[Dict[str, Any]] = []
+        self._splice(rows, False, lambda: removed.extend(remove_positions(self.rows, rows)))
+        self.undo.push(RowsRemoved(rows, removed))
+        self.dataChangedSignal.emit()
+
+    def existing_rows(self) -> Iterable[Dict[str, Any]]:
+        return self.rows
+
+    # -- UndoTarget ---------------------------------------------------------------
+
+    def _set_cells(self, key: str, rows: Sequence[int], values: Sequence[Any]) -> None:
+        data = self.rows
+        for r, v in zip(rows, values):
+            data[r][key] = v
+
+    def _append_rows(self, rows: Sequence[Dict[str, Any]]) -> List[int]:
+        self.rows.extend(rows)
+        return []
+
+    def apply_insert(self, positions: Sequence[int], rows: Sequence[Dict[str, Any]], ids: Sequence[int]) -> None:
+        self._splice(positions, True, lambda: insert_positions(self.rows, positions, rows))
+
+    def apply_remove(self, positions: Sequence[int]) -> None:
+        self._splice(positions, False, lambda: remove_positions(self.rows, positions))
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        return self.rows
+
+
+class PagedSectionTableModel(_UndoMixin, QAbstractTableModel):
+    """SectionTableModel over a ProjectStore table: rows are read a page at a time
+    and every edit is written straight to the project file."""
+    dataChangedSignal = pyqtSignal()
+
+    PAGE = 500
+    MAX_PAGES = 40
+
+    def __init__(self, schema: SectionSchema, store: "ProjectStore"):
+        super().__init__()
+        self.schema = schema
+        self.store = store
+        self.ids: List[int] = store.row_ids(schema.key)
+        self._pages: "OrderedDict[int, List[Dict[str, Any]]]" = OrderedDict()
+        self._init_undo()
+
+    def _row(self, r: int) -> Dict[str, Any]:
+        p = r // self.PAGE
+        page = self._pages.get(p)
+        if page is None:
+            # keyset: a página começa depois do id da última linha da página anterior
+            lo = p * self.PAGE
+            page = [row for _, row in self.store.fetch(self.schema.key, self.ids[lo - 1] if lo else -1, self.PAGE)]
+            self._pages[p] = page
+            if len(self._pages) > self.MAX_PAGES:
+                self._pages.popitem(last=False)
         else:
-            row[col.key] = str(value)
+            self._pages.move_to_end(p)
+        return page[r - p * self.PAGE]
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return len(self.ids)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        return len(self.schema.columns)
+
+    headerData = SectionTableModel.headerData
+    flags = SectionTableModel.flags
+
+    def data(self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            val = self._row(index.row()).get(self.schema.columns[index.column()].key, "")
+            return "" if val is None else str(val)
+        return None
+
+    def setData(self, index: QModelIndex, value: Any, role: int = Qt.ItemDataRole.EditRole) -> bool:
+        if role != Qt.ItemDataRole.EditRole or not index.isValid():
+            return False
+        col = self.schema.columns[index.column()]
+        if not col.editable:
+            return False
+        value = to_int(value) if col.col_type == "int" else to_str(value)
+        row = self._row(index.row())
+        old = row.get(col.key)
+        if old == value:
+            return True
+        self.store.update_cell(self.schema.key, self.ids[index.row()], col.key, value)
+        row[col.key] = value
+        self.undo.push(CellEdit(col.key, [index.row()], [old], [value]))
         self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole])
         self.dataChangedSignal.emit()
         return True
 
     def add_row(self):
-        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows))
         row = {c.key: (0 if c.col_type == "int" else "") for c in self.schema.columns}
-        self.rows.append(row)
+        rid = self.store.insert_row(self.schema.key, row)
+        n = len(self.ids)
+        self.beginInsertRows(QModelIndex(), n, n)
+        self.ids.append(rid)
+        self._pages.pop(n // self.PAGE, None)
         self.endInsertRows()
+        self.undo.push(RowsInserted([n], [row], [rid]))
         self.dataChangedSignal.emit()
 
     def remove_rows(self, indexes: List[int]):
-        for r in sorted(set(indexes), reverse=True):
-            if 0 <= r < len(self.rows):
-                self.beginRemoveRows(QModelIndex(), r, r)
-                self.rows.pop(r)
-                self.endRemoveRows()
+        rows = sorted({r for r in indexes if 0 <= r < len(self.ids)})
+        if not rows:
+            return
+        # conteúdo guardado para desfazer (só as linhas removidas, página a página)
+        removed = [dict(self._row(r)) for r in rows]
+        ids = [self.ids[r] for r in rows]
+        self.store.delete_rows(self.schema.key, ids)
+        self.beginResetModel()
+        remove_positions(self.ids, rows)
+        self._pages.clear()
+        self.endResetModel()
+        self.undo.push(RowsRemoved(rows, removed, ids))
         self.dataChangedSignal.emit()
 
+    def existing_rows(self) -> Iterable[Dict[str, Any]]:
+        return self.store.iter_section(self.schema.key)
+
+    # -- UndoTarget ---------------------------------------------------------------
+
+    def _set_cells(self, key: str, rows: Sequence[int], values: Sequence[Any]) -> None:
+        self.store.update_cells(self.schema.key, key, [(self.ids[r], v) for r, v in zip(rows, values)])
+        for r, v in zip(rows, values):
+            page = self._pages.get(r // self.PAGE)
+            if page is not None:
+                page[r - (r // self.PAGE) * self.PAGE][key] = v
+
+    def _append_rows(self, rows: Sequence[Dict[str, Any]]) -> List[int]:
+        # ids explícitos (os próximos livres), numa transação só
+        first = (self.ids[-1] if self.ids else 0) + 1
+        ids = list(range(first, first + len(rows)))
+        self.store.restore_rows(self.schema.key, zip(ids, rows))
+        self.ids.extend(ids)
+        self._pages.clear()
+        return ids
+
+    def apply_insert(self, positions: Sequence[int], rows: Sequence[Dict[str, Any]], ids: Sequence[int]) -> None:
+        self.store.restore_rows(self.schema.key, zip(ids, rows))
+
+        def mutate() -> None:
+            insert_positions(self.ids, positions, ids)
+            self._pages.clear()
+        self._splice(positions, True, mutate)
+
+    def apply_remove(self, positions: Sequence[int]) -> None:
+        self.store.delete_rows(self.schema.key, [self.ids[p] for p in positions])
+
+        def mutate() -> None:
+            remove_positions(self.ids, positions)
+            self._pages.clear()
+        self._splice(positions, False, mutate)
+
     def to_rows(self) -> List[Dict[str, Any]]:
-        return self.rows
+        return section_records(self.schema, self.store.iter_section(self.schema.key))
@@ -0,0 +1,208 @@
+from __future__ import annotations
+import copy
+import csv
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from .models import NormalizedConfig, TcontProfile
+from .perf import span
+from .remap import RemapIssue
+from .utils import shallow_clone
+
+# Consolidação dos profiles TCONT por banda.
+# Origens que criam um profile por par (upstream, assured) distinto (Fiberhome: U{up}K_A{assured})
+# chegam a centenas de profiles; aqui os pares viram no máximo N grupos e cada ONU passa a usar
+# a banda do representante do seu grupo (os renders escolhem o profile por banda).
+#
+#   1. pares distintos ordenados por upstream; um grupo novo começa quando o upstream passa
+#      da tolerância (%) sobre o menor upstream do grupo
+#   2. se sobrarem mais de N grupos, os vizinhos com menor distância relativa são unidos
+#      (ordena as distâncias e mantém só as N-1 maiores como fronteira)
+#   3. representante: "up" = maior banda do grupo (nenhuma ONU perde banda) ou
+#      "nearest" = mediana ponderada pelo número de ONUs; opcionalmente arredondado a um passo
+#
+# Custo: O(ONUs) para contar os pares + O(k log k) nos k pares distintos.
+
+ROUND_UP = "up"
+ROUND_NEAREST = "nearest"
+ROUNDINGS = (ROUND_UP, ROUND_NEAREST)
+
+TCONT_MERGED = "tcont_consolidado"
+TCONT_DRIFT = "tcont_desvio"
+
+Band = Tuple[int, int]  # (upstream_kbps, upstream_assured)
+
+
+@dataclass
+class TcontPolicy:
+    max_profiles: int
+    tolerance_pct: float = 10.0
+    rounding: str = ROUND_UP
+    step_kbps: int = 0
+
+
+@dataclass
+class OnuDrift(RemapIssue):
+    slot: int
+    pon: int
+    onu_id: int
+    old: Band
+    new: Band
+
+    @property
+    def drift_pct(self) -> float:
+        return (self.new[0] - self.old[0]) * 100.0 / self.old[0] if self.old[0] else 0.0
+
+
+def _drift(slot: int, pon: int, onu_id: int, old: Band, new: Band) -> OnuDrift:
+    pct = (new[0] - old[0]) * 100.0 / old[0] if old[0] else 0.0
+    detail = f"ONU {slot}/{pon}:{onu_id} {old[0]}/{old[1]} -> {new[0]}/{new[1]} kbps ({pct:+.1f}%)"
+    return OnuDrift(TCONT_DRIFT, detail, slot, pon, onu_id, old, new)
+
+
+@dataclass
+class TcontConsolidation:
+    normalized: NormalizedConfig
+    before: int
+    after: int
+    drift: List[OnuDrift] = field(default_factory=list)
+
+    @property
+    def max_drift_pct(self) -> float:
+        return max((abs(d.drift_pct) for d in self.drift), default=0.0)
+
+    def summary(self) -> str:
+        return (f"{self.before} profiles TCONT -> {self.after}; {len(self.drift)} ONUs mudaram de banda "
+                f"(desvio máx. {self.max_drift_pct:.1f}%)")
+
+
+def policy_from_fast(fast: Dict[str, Any]) -> Optional[TcontPolicy]:
+    """fast tcont_* keys -> policy; None when consolidation is off. ValueError on bad values."""
+    n = int(fast.get("tcont_max_profiles", 0) or 0)
+    if n <= 0:
+        return None
+    rounding = str(fast.get("tcont_rounding", ROUND_UP) or ROUND_UP)
+    if rounding not in ROUNDINGS:
+        raise ValueError(f"arredondamento TCONT inválido: '{rounding}' (use {' ou '.join(ROUNDINGS)})")
+    tol = float(fast.get("tcont_tolerance", 10.0) or 0.0)
+    step = int(fast.get("tcont_step_kbps", 0) or 0)
+    if tol < 0 or step < 0:
+        raise ValueError("tolerância e passo TCONT não podem ser negativos")
+    return TcontPolicy(n, tol, rounding, step)
+
+
+def _weighted_median(values: List[Tuple[int, int]]) -> int:
+    """[(value, weight), ...] -> value at half of the total weight."""
+    values = sorted(values)
+    half = sum(w for _, w in values) / 2.0
+    acc = 0
+    for v, w in values:
+        acc += w
+        if acc >= half:
+            return v
+    return values[-1][0]
+
+
+def _snap(v: int, step: int, up: bool) -> int:
+    if step <= 0:
+        return v
+    return -(-v // step) * step if up else max(step, int(round(v / step)) * step)
+
+
+def plan_clusters(counts: Dict[Band, int], policy: TcontPolicy) -> Dict[Band, Band]:
+    """Map every distinct band to the representative of its cluster (at most policy.max_profiles)."""
+    pairs = sorted(counts)
+    if not pairs:
+        return {}
+    tol = 1.0 + policy.tolerance_pct / 100.0
+    groups: List[List[Band]] = []
+    for p in pairs:
+        if groups and p[0] <= groups[-1][0][0] * tol:
+            groups[-1].append(p)
+        else:
+            groups.append([p])
+
+    if len(groups) > policy.max_profiles:
+        def gap(i: int) -> float:
+            lo = groups[i][-1][0]
+            return (groups[i + 1][0][0] - lo) / max(lo, 1)
+        by_gap = sorted(range(len(groups) - 1), key=gap)
+        keep = set(by_gap[len(groups) - policy.max_profiles:])  # fronteiras que sobrevivem
+        merged: List[List[Band]] = [[]]
+        for i, g in enumerate(groups):
+            merged[-1].extend(g)
+            if i in keep:
+                merged.append([])
+        groups = merged
+
+    up = policy.rounding == ROUND_UP
+    plan: Dict[Band, Band] = {}
+    for g in groups:
+        if up:
+            rep_up = max(p[0] for p in g)
+            rep_as = max(p[1] for p in g)
+        else:
+            rep_up = _weighted_median([(p[0], counts[p]) for p in g])
+            rep_as = _weighted_median([(p[1], counts[p]) for p in g])
+        rep_up = _snap(rep_up, policy.step_kbps, up)
+        rep_as = min(_snap(rep_as, policy.step_kbps, up), rep_up)
+        for p in g:
+            plan[p] = (rep_up, rep_as)
+    return plan
+
+
+def consolidate_tcont(n: NormalizedConfig, policy: TcontPolicy) -> TcontConsolidation:
+    """Copy of `n` with at most policy.max_profiles TCONT profiles and the ONUs moved onto them.
+
+    ONUs without upstream bandwidth are left alone; `n` is not modified and unchanged
+    ONUs are shared with it.
+    """
+    before = len(n.tcont_profiles)
+    counts: Dict[Band, int] = {}
+    for o in n.onus:
+        if o.upstream_kbps > 0:
+            b = (o.upstream_kbps, o.upstream_assured)
+            counts[b] = counts.get(b, 0) + 1
+    if not counts:
+        return TcontConsolidation(n, before, before)
+
+    out = copy.copy(n)
+    with span("tcont.consolidate", onus=len(n.onus), bands=len(counts)):
+        plan = plan_clusters(counts, policy)
+        drift: List[OnuDrift] = []
+        onus = []
+        for o in n.onus:
+            if o.upstream_kbps > 0:
+                old = (o.upstream_kbps, o.upstream_assured)
+                new = plan[old]
+                if new != old:
+                    drift.append(_drift(o.slot, o.pon, o.onu_id, old, new))
+                    o = shallow_clone(o)
+                    o.upstream_kbps, o.upstream_assured = new
+            onus.append(o)
+        out.onus = onus
+
+        dba = {(p.max_kbps, p.assured_kbps): p.dba_type for p in n.tcont_profiles}
+        reps = sorted(set(plan.values()))
+        out.tcont_profiles = [TcontProfile(name=f"U{u}K_A{a}", dba_type=dba.get((u, a), 3), assured_kbps=a, max_kbps=u)
+                              for u, a in reps]
+    return TcontConsolidation(out, before, len(reps), drift)
+
+
+def consolidation_issues(res: TcontConsolidation) -> List[RemapIssue]:
+    """Summary line plus one OnuDrift per ONU that changed."""
+    if not res.drift and res.before == res.after:
+        return []
+    return [RemapIssue(TCONT_MERGED, res.summary())] + list(res.drift)
+
+
+def write_drift_csv(issues: List[RemapIssue], path: str) -> int:
+    """Per-ONU drift (OnuDrift entries of `issues`) as CSV; returns the number of rows."""
+    rows = [d for d in issues if isinstance(d, OnuDrift)]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["slot", "pon", "onu_id", "upstream_kbps", "upstream_assured",
+                    "novo_upstream_kbps", "novo_upstream_assured", "desvio_pct"])
+        for d in rows:
+            w.writerow([d.slot, d.pon, d.onu_id, d.old[0], d.old[1], d.new[0], d.new[1], f"{d.drift_pct:.2f}"])
+    return len(rows)
@@ -0,0 +1,252 @@
+from __future__ import annotations
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional, Protocol, Sequence, Tuple, Union
+
+# Desfazer/refazer dos editores de seção guardando só o que mudou (nunca cópia da tabela):
+#   CellEdit      uma coluna, N linhas: posições + valores antigos/novos (1 célula ou um range)
+#   RowsInserted  linhas novas nas posições finais (ADD, importação)
+#   RowsRemoved   linhas removidas com o conteúdo e as posições originais
+# Cada entrada da pilha é uma lista de deltas (group() junta vários numa só ação). Desfazer
+# aplica os inversos em ordem reversa, então o custo é proporcional ao tamanho da mudança.
+# Edições seguidas da mesma célula em até COALESCE_SECONDS viram uma entrada só. A pilha é
+# limitada por número de ações e por células guardadas; as mais antigas saem primeiro.
+
+MAX_ENTRIES = 500
+MAX_CELLS = 1_000_000
+COALESCE_SECONDS = 2.0
+# acima disso insere/remove reconstruindo a lista numa passada (pop/insert um a um é O(n) cada)
+_SPLICE_LIMIT = 32
+
+Row = Dict[str, Any]
+
+
+@dataclass
+class CellEdit:
+    key: str
+    rows: List[int]
+    old: List[Any]
+    new: List[Any]
+
+    @property
+    def cells(self) -> int:
+        return len(self.rows)
+
+    def inverse(self) -> "CellEdit":
+        return CellEdit(self.key, self.rows, self.new, self.old)
+
+
+@dataclass
+class RowsInserted:
+    positions: List[int]           # crescentes, posições depois da inserção
+    rows: List[Row]
+    ids: List[int] = field(default_factory=list)  # _id no projeto (PagedSectionTableModel)
+
+    @property
+    def cells(self) -> int:
+        return len(self.rows) * max(1, len(self.rows[0]) if self.rows else 1)
+
+    def inverse(self) -> "RowsRemoved":
+        return RowsRemoved(self.positions, self.rows, self.ids)
+
+
+@dataclass
+class RowsRemoved:
+    positions: List[int]           # crescentes, posições antes da remoção
+    rows: List[Row]
+    ids: List[int] = field(default_factory=list)
+
+    @property
+    def cells(self) -> int:
+        return len(self.rows) * max(1, len(self.rows[0]) if self.rows else 1)
+
+    def inverse(self) -> RowsInserted:
+        return RowsInserted(self.positions, self.rows, self.ids)
+
+
+Delta = Union[CellEdit, RowsInserted, RowsRemoved]
+
+
+class UndoTarget(Protocol):
+    """What a table model exposes so the stack can replay deltas (without recording them)."""
+
+    def apply_cells(self, key: str, rows: Sequence[int], values: Sequence[Any]) -> None: ...
+    def apply_insert(self, positions: Sequence[int], rows: Sequence[Row], ids: Sequence[int]) -> None: ...
+    def apply_remove(self, positions: Sequence[int]) -> None: ...
+
+
+@dataclass
+class UndoEntry:
+    label: str
+    deltas: List[Delta]
+    stamp: float = 0.0
+
+    @property
+    def cells(self) -> int:
+        return sum(d.cells for d in self.deltas)
+
+
+def apply_delta(target: UndoTarget, d: Delta) -> None:
+    if isinstance(d, CellEdit):
+        target.apply_cells(d.key, d.rows, d.new)
+    elif isinstance(d, RowsInserted):
+        target.apply_insert(d.positions, d.rows, d.ids)
+    else:
+        target.apply_remove(d.positions)
+
+
+def remove_positions(items: List[Any], positions: Sequence[int]) -> List[Any]:
+    """Remove `positions` (ascending) from `items` in place; returns the removed items in order."""
+    if len(positions) <= _SPLICE_LIMIT:
+        removed = [items[p] for p in positions]
+        for p in reversed(positions):
+            del items[p]
+        return removed
+    drop = set(positions)
+    removed = [items[p] for p in positions]
+    items[:] = [x for i, x in enumerate(items) if i not in drop]
+    return removed
+
+
+def insert_positions(items: List[Any], positions: Sequence[int], new: Sequence[Any]) -> None:
+    """Insert `new[i]` so that it ends up at `positions[i]` (ascending final positions)."""
+    if len(positions) <= _SPLICE_LIMIT:
+        for p, x in zip(positions, new):
+            items.insert(p, x)
+        return
+    out: List[Any] = []
+    src = iter(items)
+    j = 0
+    total = len(items) + len(positions)
+    for i in range(total):
+        if j < len(positions) and positions[j] == i:
+            out.append(new[j])
+            j += 1
+        else:
+            out.append(next(src))
+    items[:] = out
+
+
+class UndoStack:
+    """Undo/redo of section edits as compact deltas, capped by entries and stored cells."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_cells: int = MAX_CELLS,
+                 coalesce_seconds: float = COALESCE_SECONDS):
+        self.max_entries = max_entries
+        self.max_cells = max_cells
+        self.coalesce_seconds = coalesce_seconds
+        self.undo_stack: Deque[UndoEntry] = deque()
+        self.redo_stack: List[UndoEntry] = []
+        self.cells = 0                      # células guardadas nas duas pilhas
+        self._group: Optional[UndoEntry] = None
+        self._depth = 0
+
+    # -- gravação ------------------------------------------------------------------
+
+    def push(self, delta: Delta, label: str = "") -> None:
+        if self._group is not None:
+            self._group.deltas.append(delta)
+            return
+        now = time.monotonic()
+        top = self.undo_stack[-1] if self.undo_stack else None
+        if (isinstance(delta, CellEdit) and delta.cells == 1 and top is not None and len(top.deltas) == 1
+                and not self.redo_stack and now - top.stamp <= self.coalesce_seconds):
+            prev = top.deltas[0]
+            if isinstance(prev, CellEdit) and prev.cells == 1 and prev.key == delta.key and prev.rows == delta.rows:
+                # mesma célula editada de novo: guarda o valor original e o último
+                prev.new = delta.new
+                top.stamp = now
+                if prev.old == prev.new:
+                    self.undo_stack.pop()
+                    self.cells -= 1
+                return
+        self._push_entry(UndoEntry(label or _label(delta), [delta], now))
+
+    @contextmanager
+    def group(self, label: str) -> Iterator[None]:
+        """Record every delta pushed inside the block as one undoable action."""
+        if self._group is None:
+            self._group = UndoEntry(label, [])
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                entry, self._group = self._group, None
+                if entry.deltas:
+                    entry.stamp = time.monotonic()
+                    self._push_entry(entry)
+
+    def _push_entry(self, entry: UndoEntry) -> None:
+        for e in self.redo_stack:
+            self.cells -= e.cells
+        self.redo_stack.clear()
+        self.undo_stack.append(entry)
+        self.cells += entry.cells
+        self._trim()
+
+    def _trim(self) -> None:
+        # a ação mais recente fica sempre, mesmo que sozinha passe do limite
+        while len(self.undo_stack) > 1 and (len(self.undo_stack) > self.max_entries or self.cells > self.max_cells):
+            self.cells -= self.undo_stack.popleft().cells
+
+    def clear(self) -> None:
+        self.undo_stack.clear()
+        self.redo_stack.clear()
+        self.cells = 0
+
+    # -- desfazer / refazer ------------------------------------------------------
+
+    def can_undo(self) -> bool:
+        return bool(self.undo_stack)
+
+    def can_redo(self) -> bool:
+        return bool(self.redo_stack)
+
+    def undo_label(self) -> str:
+        return self.undo_stack[-1].label if self.undo_stack else ""
+
+    def redo_label(self) -> str:
+        return self.redo_stack[-1].label if self.redo_stack else ""
+
+    def undo(self, target: UndoTarget) -> str:
+        """Revert the last action on `target`; returns its label ('' when there is none)."""
+        if not self.undo_stack:
+            return ""
+        entry = self.undo_stack.pop()
+        for d in reversed(entry.deltas):
+            apply_delta(target, d.inverse())
+        entry.stamp = 0.0  # não funde com edições depois de refazer
+        self.redo_stack.append(entry)
+        return entry.label
+
+    def redo(self, target: UndoTarget) -> str:
+        if not self.redo_stack:
+            return ""
+        entry = self.redo_stack.pop()
+        for d in entry.deltas:
+            apply_delta(target, d)
+        self.undo_stack.append(entry)
+        return entry.label
+
+
+def _label(d: Delta) -> str:
+    if isinstance(d, CellEdit):
+        return f"editar {d.key}" if d.cells == 1 else f"editar {d.key} em {d.cells} linhas"
+    n = len(d.rows)
+    what = "linha" if n == 1 else f"{n} linhas"
+    return f"adicionar {what}" if isinstance(d, RowsInserted) else f"remover {what}"
+
+
+def cell_runs(rows: Sequence[int]) -> List[Tuple[int, int]]:
+    """Sorted row positions -> (first, last) runs, to emit one dataChanged per run."""
+    out: List[Tuple[int, int]] = []
+    for r in sorted(rows):
+        if out and r == out[-1][1] + 1:
+            out[-1] = (out[-1][0], r)
+        else:
+            out.append((r, r))
+    return out
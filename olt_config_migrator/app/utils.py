@@ -1,9 +1,13 @@
 from __future__ import annotations
 import re
-from typing import List, Tuple
+from typing import Any, Dict, List, Tuple
 
 
 def read_text_smart(path: str) -> str:
+    from .sources import ARCHIVE_EXTS, iter_lines, split_member
+    if split_member(path)[1] or path.lower().endswith(ARCHIVE_EXTS):
+        # compactado: prefira iter_lines() e parse_lines() para não montar o texto inteiro
+        return "\n".join(iter_lines(path))
     for enc in ("utf-8", "utf-8-sig", "latin-1"):
         try:
             with open(path, "r", encoding=enc) as f:
@@ -14,6 +18,13 @@ def read_text_smart(path: str) -> str:
         return f.read()
 
 
+def shallow_clone(x: Any) -> Any:
+    """Shallow copy of a model dataclass (copy.copy is several times slower on 10^5 rows)."""
+    y = object.__new__(type(x))
+    y.__dict__.update(x.__dict__)
+    return y
+
+
 def parse_vlan_list(token: str) -> List[int]:
     out: List[int] = []
     for part in re.split(r"[\s,]+", token.strip()):
@@ -24,6 +35,22 @@ def parse_vlan_list(token: str) -> List[int]:
     return sorted(set(out))
 
 
+def parse_vlan_spec(spec: str) -> List[int]:
+    """Parse '800-808,1554' / '10 to 20 30' style VLAN specs into sorted unique IDs (1..4094)."""
+    out: set = set()
+    norm = re.sub(r"\s*(?:-|\bto\b)\s*", "-", spec.strip(), flags=re.I)
+    for part in re.split(r"[\s,;]+", norm):
+        if not part:
+            continue
+        if "-" in part:
+            a, _, b = part.partition("-")
+            if a.isdigit() and b.isdigit():
+                out.update(expand_vlan_range(int(a), int(b)))
+        elif part.isdigit():
+            out.add(int(part))
+    return sorted(v for v in out if 0 < v <= 4094)
+
+
 def expand_vlan_range(a: int, b: int) -> List[int]:
     if a > b:
         a, b = b, a
@@ -61,6 +88,27 @@ def format_vlan_ranges(vlans: List[int], *, sep: str = ",", range_sep: str = "-"
     return sep.join(parts)
 
 
+def script_stats(script: str, *, comment_prefixes: Tuple[str, ...] = ("!", "#")) -> Dict[str, int]:
+    """Count lines, commands (non-empty, non-comment lines) and UTF-8 bytes of a rendered script."""
+    lines = script.splitlines()
+    commands = 0
+    for line in lines:
+        s = line.strip()
+        if s and not s.startswith(comment_prefixes):
+            commands += 1
+    return {"lines": len(lines), "commands": commands, "bytes": len(script.encode("utf-8"))}
+
+
+def mask_to_prefix(mask: str) -> int:
+    """'255.255.255.0' -> 24 (falls back to 24 on garbage)."""
+    try:
+        parts = [int(x) for x in mask.split(".")]
+        b = "".join(f"{p:08b}" for p in parts)
+        return b.count("1")
+    except Exception:
+        return 24
+
+
 def maybe_prefix_or_mask(ip_line: str) -> Tuple[str, str]:
     m = re.search(r"ip\s+address\s+(\S+?)(?:\s+(\S+))?$", ip_line.strip(), re.I)
     if not m:
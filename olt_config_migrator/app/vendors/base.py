@@ -1,17 +1,63 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any
+from functools import wraps
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 from ..models import NormalizedConfig, SectionSchema
+from ..perf import span
+from ..records import typed_sections
+from ..remap import RemapIssue
+from .grammar import Coverage, Grammar, ParseResult
+
+# Métodos de adapter cronometrados automaticamente (span "<vendor_id>.<método>")
+TIMED_METHODS = ("parse_to_normalized", "parse_lines", "from_normalized", "render", "render_delta")
+
+
+def _timed_method(fn, method: str):
+    @wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        with span(f"{self.vendor_id}.{method}"):
+            return fn(self, *args, **kwargs)
+    wrapper.__perf_wrapped__ = True
+    return wrapper
+
 
 class VendorAdapter(ABC):
     vendor_id: str
     label: str
     default_extension: str
+    # (regex, peso) de linhas típicas do fabricante, para detectar a origem (app/detect.py).
+    # A regex é aplicada com re.match na linha sem espaços à esquerda, em minúsculas.
+    signatures: Tuple[Tuple[str, float], ...] = ()
+    # Gramática de parse (vendors/grammar.py); com ela parse_lines_report() devolve a cobertura
+    grammar: Optional[Grammar] = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for method in TIMED_METHODS:
+            fn = cls.__dict__.get(method)
+            if fn is not None and not getattr(fn, "__perf_wrapped__", False):
+                setattr(cls, method, _timed_method(fn, method))
 
     @abstractmethod
     def parse_to_normalized(self, text: str) -> NormalizedConfig:
         raise NotImplementedError
 
+    def parse_lines(self, lines: Iterable[str]) -> NormalizedConfig:
+        """Parse from a line stream. Grammar-based adapters override this and never join the text."""
+        return self.parse_to_normalized("\n".join(lines))
+
+    def parse_lines_report(self, lines: Iterable[str]) -> Tuple[NormalizedConfig, Optional[Coverage]]:
+        """parse_lines() plus the coverage of the grammar run (None for adapters without a grammar)."""
+        if self.grammar is None:
+            return self.parse_lines(lines), None
+        with span(f"{self.vendor_id}.parse_lines"):
+            res = self.grammar.run(lines)
+            return self._assemble(res), res.coverage
+
+    def _assemble(self, res: ParseResult) -> NormalizedConfig:
+        """NormalizedConfig from the buckets of a `grammar` run."""
+        raise NotImplementedError
+
     @abstractmethod
     def schema(self) -> List[SectionSchema]:
         raise NotImplementedError
@@ -23,3 +69,18 @@ class VendorAdapter(ABC):
     @abstractmethod
     def render(self, target_data: Dict[str, List[Dict[str, Any]]], fast: Dict[str, Any] | None = None) -> str:
         raise NotImplementedError
+
+    def records(self, target_data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+        """target_data with rows typed by schema() (app/records.py); no copy of rows already typed.
+
+        Renders call this once and then read fields without converting them.
+        """
+        return typed_sections(self.schema(), target_data)
+
+    def check_target(self, target_data: Dict[str, List[Dict[str, Any]]], fast: Dict[str, Any] | None = None) -> List[RemapIssue]:
+        """Problems render() would run into with these rows (e.g. two ONUs on one target position)."""
+        return []
+
+    def render_delta(self, old: NormalizedConfig, new: NormalizedConfig, fast: Dict[str, Any] | None = None) -> str:
+        """Script that takes an OLT configured from `old` to `new` (only what changed)."""
+        raise NotImplementedError(f"{self.label}: script incremental não suportado")
@@ -1,20 +1,48 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List
 
 from .base import VendorAdapter
+from .grammar import Grammar, ParseResult, Rule, assemble_l2l3, to_ifname, to_ip, to_route, to_trunk_vlans, to_vlans
 from ..models import NormalizedConfig, SectionSchema, SectionColumn
-from ..utils import format_vlan_ranges
+from ..packing import PackRule, pack_vlans
+from ..utils import parse_vlan_spec
+
+
+# Gramática (origem Datacom): VLANs, uplinks, IPs e rotas
+GRAMMAR = Grammar([
+    Rule("vlan", target="vlans", convert=to_vlans),
+    Rule("interface", opens="interface", convert=to_ifname),
+    Rule("ip address", context="interface", target="interfaces", convert=to_ip),
+    Rule("switchport mode", context="interface"),
+    Rule("no shutdown", context="interface"),
+    Rule("shutdown", context="interface"),
+    Rule("description", context="interface"),
+    Rule("switchport trunk allowed vlan", context="interface", target="trunk_vlans", convert=to_trunk_vlans),
+    Rule("ip route", target="routes", convert=to_route),
+], block_end=("!", "exit"))
 
 
 class DatacomAdapter(VendorAdapter):
     vendor_id = "datacom"
     label = "Datacom (DM4xx)"
     default_extension = "txt"
+    signatures = (
+        (r"! ===== datacom ", 10), (r"dot1q$", 5), (r"(?:interface )?(?:ten-)?gigabit-ethernet[- ]\d", 4),
+        (r"interface l3-", 3), (r"switchport trunk allowed vlan ", 1),
+    )
+    grammar = GRAMMAR
+    # Limite de linha aceito pela CLI Datacom (margem para o prompt)
+    max_line_len = 240
 
     def parse_to_normalized(self, text: str) -> NormalizedConfig:
-        # TODO: Implementar parser Datacom como origem.
-        return NormalizedConfig()
+        return self.parse_lines(text.splitlines())
+
+    def parse_lines(self, lines: Iterable[str]) -> NormalizedConfig:
+        return self._assemble(GRAMMAR.run(lines))
+
+    def _assemble(self, res: ParseResult) -> NormalizedConfig:
+        return assemble_l2l3(res)
 
     def schema(self) -> List[SectionSchema]:
         return [
@@ -68,7 +96,8 @@ class DatacomAdapter(VendorAdapter):
     def render(self, target_data: Dict[str, List[Dict[str, Any]]], fast: Dict[str, Any] | None = None) -> str:
         # Datacom varia bastante por família/modelo. Geração aqui é "best-effort" para VLAN/trunk/IP/rotas.
         fast = fast or {}
-        vlans = [int(v.get("vid", 0) or 0) for v in target_data.get("vlans", []) if int(v.get("vid", 0) or 0) > 0]
+        target_data = self.records(target_data)
+        vlans = [v["vid"] for v in target_data.get("vlans", []) if v["vid"] > 0]
         trunks = target_data.get("trunks", []) or []
         ifaces = target_data.get("interface_ips", []) or []
         routes = target_data.get("routes", []) or []
@@ -80,35 +109,34 @@ class DatacomAdapter(VendorAdapter):
 
         if vlans:
             out.append("! VLANs (ajuste conforme seu modelo/CLI)")
-            out.append(f"! {format_vlan_ranges(vlans, sep=',', range_sep='-', space=False)}")
+            out.extend(pack_vlans(vlans, PackRule("! ", max_line=self.max_line_len)))
             out.append("!")
 
+        trunk_rule = PackRule(" switchport trunk allowed vlan ", cont_prefix=" switchport trunk allowed vlan add ", max_line=self.max_line_len)
         for t in trunks:
-            ifname = str(t.get("ifname","")).strip()
-            tagged = str(t.get("tagged","")).strip()
+            ifname = t["ifname"]
+            tagged = t["tagged"]
             if not ifname:
                 continue
             out.append(f"interface {ifname}")
             out.append(" switchport mode trunk")
             if tagged:
-                if tagged.upper() == "ALL":
-                    tagged = format_vlan_ranges(vlans, sep=',', range_sep='-', space=False) if vlans else ""
-                if tagged:
-                    out.append(f" switchport trunk allowed vlan {tagged}")
+                vids = vlans if tagged.upper() == "ALL" else parse_vlan_spec(tagged)
+                out.extend(pack_vlans(vids, trunk_rule))
             out.append(" no shutdown")
             out.append("!")
         for i in ifaces:
-            ifname = str(i.get("ifname","")).strip()
-            ip = str(i.get("ip","")).strip()
-            mask = str(i.get("prefix_or_mask","")).strip()
+            ifname = i["ifname"]
+            ip = i["ip"]
+            mask = i["prefix_or_mask"]
             if not ifname or not ip or not mask:
                 continue
             out.append(f"interface {ifname}")
             out.append(f" ip address {ip} {mask}")
             out.append("!")
         for r in routes:
-            pfx = str(r.get("prefix","")).strip()
-            nh = str(r.get("next_hop","")).strip()
+            pfx = r["prefix"]
+            nh = r["next_hop"]
             if pfx and nh:
                 out.append(f"ip route {pfx} {nh}")
 
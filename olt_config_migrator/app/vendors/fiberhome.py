@@ -1,9 +1,10 @@
 from __future__ import annotations
 import re
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from .base import VendorAdapter
+from .grammar import Grammar, Rule
 from ..models import NormalizedConfig, Vlan, InterfaceIP, Route, Onu, OnuService, TcontProfile, SectionSchema, SectionColumn
-from ..utils import expand_vlan_range
+from ..utils import expand_vlan_range, mask_to_prefix
 
 RX_MANAGE_VLAN = re.compile(r"^set\s+manage_vlan\s+(\d+)\s+(.+)$", re.I)
 RX_VLAN_RANGE = re.compile(r"^add\s+vlan\s+vlan_begin\s+(\d+)\s+vlan_end\s+(\d+)\b", re.I)
@@ -13,7 +14,7 @@ RX_DEBUGIP = re.compile(r"^set\s+debugip\s+(\S+)\s+mask\s+(\S+)", re.I)
 
 # ONU auth line:
 # set white phy addr FHTT04c6ba10 pas null ac add sl 1 p 5 o 26 ty 5506-04-F1
-RX_ONU_AUTH = re.compile(r"^set\s+white\s+phy\s+addr\s+(\S+)\s+.*?\badd\s+sl\s+(\d+)\s+p\s+(\d+)\s+o\s+(\d+)\s+ty\s+(\S+)", re.I)
+# Tokenizado (ver _match_onu_auth), sem regex.
 
 # Service VLAN mapping:
 # set ep sl 1 p 1 o 11 p 1 serv 1 vlan_m tra 255 33024 4002
@@ -25,138 +26,178 @@ RX_EP_BAND = re.compile(r"^set\s+ep\s+sl\s+(\d+)\s+pon\s+(\d+)\s+onu\s+(\d+)\s+b
 
 # PPPoE wan cfg:
 # set wancfg sl 1 1 1 ind 1 ... ty r 3906 ... dsp pppoe ... acz/user key:pass ...
-RX_WAN_PPPOE = re.compile(r"^set\s+wancfg\s+sl\s+(\d+)\s+(\d+)\s+(\d+)\s+ind\s+(\d+).+?\bty\s+r\s+(\d+)\b.+?\bdsp\s+pppoe\b.*?\bacz\/([^\s]+)\s+key:([^\s]+)", re.I)
+# Tokenizado (ver _match_wancfg): a antiga regex com '.+?' encadeados fazia
+# backtracking pesado em linhas longas/truncadas que nunca chegam ao 'dsp pppoe'.
 
 
-def _mask_to_prefix(mask: str) -> int:
-    try:
-        parts = [int(x) for x in mask.split(".")]
-        b = "".join(f"{p:08b}" for p in parts)
-        return b.count("1")
-    except Exception:
-        return 24
+def _match_onu_auth(line: str) -> Optional[Tuple[str, int, int, int, str]]:
+    """(sn, slot, pon, onu_id, type) from a 'set white phy addr' line, in one split."""
+    toks = line.split()
+    if len(toks) < 14:
+        return None
+    low = line.lower().split()
+    if low[:4] != ["set", "white", "phy", "addr"]:
+        return None
+    # primeiro 'add sl <n> p <n> o <n> ty <tipo>' depois do SN
+    for i in range(5, len(toks) - 8):
+        if (low[i] == "add" and low[i + 1] == "sl" and low[i + 3] == "p" and low[i + 5] == "o" and low[i + 7] == "ty"
+                and toks[i + 2].isdigit() and toks[i + 4].isdigit() and toks[i + 6].isdigit()):
+            return toks[4], int(toks[i + 2]), int(toks[i + 4]), int(toks[i + 6]), toks[i + 8]
+    return None
+
+
+def _match_wancfg(line: str) -> Optional[Tuple[int, int, int, int, int, str, str]]:
+    """(slot, pon, onu_id, ind, vlan, user, pass) from a PPPoE 'set wancfg' line.
+
+    Single left-to-right pass over the tokens: 'ty r <vlan>', then 'dsp pppoe',
+    then 'acz/<user>' immediately followed by 'key:<pass>'.
+    """
+    toks = line.split()
+    n = len(toks)
+    if n < 15:
+        return None
+    low = line.lower().split()
+    if low[0] != "set" or low[1] != "wancfg" or low[2] != "sl" or low[6] != "ind":
+        return None
+    head = toks[3:6] + [toks[7]]
+    if not all(t.isdigit() for t in head):
+        return None
+    i = 8
+    vlan = -1
+    while i < n - 2:
+        if low[i] == "ty" and low[i + 1] == "r" and toks[i + 2].isdigit():
+            vlan = int(toks[i + 2])
+            i += 3
+            break
+        i += 1
+    if vlan < 0:
+        return None
+    while i < n - 1:
+        if low[i] == "dsp" and low[i + 1] == "pppoe":
+            i += 2
+            break
+        i += 1
+    else:
+        return None
+    while i < n - 1:
+        if low[i].startswith("acz/") and len(toks[i]) > 4 and low[i + 1].startswith("key:") and len(toks[i + 1]) > 4:
+            sl, pon, onu_id, ind = (int(t) for t in head)
+            return sl, pon, onu_id, ind, vlan, toks[i][4:], toks[i + 1][4:]
+        i += 1
+    return None
+
+
+
+# Gramática: uma passada só; o pós-processamento (renumeração, PPPoE, profiles)
+# fica em FiberhomeAdapter._assemble.
+GRAMMAR = Grammar([
+    Rule("set manage_vlan", pattern=RX_MANAGE_VLAN.pattern, target="manage_vlan", once=True),
+    Rule("add vlan vlan_begin", pattern=RX_VLAN_RANGE.pattern, target="vlan_ranges"),
+    Rule("set manage vlan name", pattern=RX_MGMT_IP.pattern, target="mgmt_ip", once=True),
+    Rule("set debugip", pattern=RX_DEBUGIP.pattern, target="debug_ip", once=True),
+    Rule("add static route", pattern=RX_STATIC_ROUTE.pattern, target="route", once=True),
+    Rule("set white phy addr", extract=_match_onu_auth, target="onu_auth"),
+    Rule("set ep sl", pattern=RX_EP_BAND.pattern, target="band"),
+    Rule("set ep sl", pattern=RX_EP_VLAN.pattern, target="ep_vlan"),
+    Rule("set wancfg sl", extract=_match_wancfg, target="pppoe"),
+])
 
 
 class FiberhomeAdapter(VendorAdapter):
     vendor_id = "fiberhome"
     label = "Fiberhome (AN5516 / WOS)"
     default_extension = ".txt"
+    signatures = (
+        (r"!ver an5", 10), (r"set white phy addr ", 5), (r"set wancfg sl ", 5), (r"set ep sl ", 4),
+        (r"add vlan vlan_begin ", 4), (r"set manage_vlan ", 3), (r"set debugip ", 3),
+    )
+    grammar = GRAMMAR
 
     def parse_to_normalized(self, text: str) -> NormalizedConfig:
+        return self.parse_lines(text.splitlines())
+
+    def parse_lines(self, lines: Iterable[str]) -> NormalizedConfig:
+        return self._assemble(GRAMMAR.run(lines))
+
+    def _assemble(self, res) -> NormalizedConfig:
         n = NormalizedConfig()
-        lines = text.splitlines()
 
         # manage vlan
-        for line in lines:
-            m = RX_MANAGE_VLAN.match(line.strip())
-            if m:
-                vid = int(m.group(1))
-                name = m.group(2).strip()
-                n.vlans.append(Vlan(vid=vid, name=name, kind="mgmt"))
-                n.extras["manage_vlan"] = {"vid": vid, "name": name}
-                break
+        mv = res.first("manage_vlan")
+        if mv:
+            vid = int(mv[0])
+            name = mv[1].strip()
+            n.vlans.append(Vlan(vid=vid, name=name, kind="mgmt"))
+            n.extras["manage_vlan"] = {"vid": vid, "name": name}
 
         # vlan ranges
         vlan_set = set(v.vid for v in n.vlans)
-        for line in lines:
-            m = RX_VLAN_RANGE.match(line.strip())
-            if m:
-                a, b = int(m.group(1)), int(m.group(2))
-                for vid in expand_vlan_range(a, b):
-                    vlan_set.add(vid)
+        for a, b in res.get("vlan_ranges"):
+            for vid in expand_vlan_range(int(a), int(b)):
+                vlan_set.add(vid)
         n.vlans = [Vlan(vid=v, name="", kind=("mgmt" if n.extras.get("manage_vlan", {}).get("vid")==v else "")) for v in sorted(vlan_set)]
 
         # IPs
-        for line in lines:
-            m = RX_MGMT_IP.match(line.strip())
-            if m:
-                ip = m.group(1)
-                if "/" in ip:
-                    a, pfx = ip.split("/", 1)
-                    n.interfaces.append(InterfaceIP(ifname="mgmt", ip=a, prefix_or_mask="/" + pfx, vlan=n.extras.get("manage_vlan", {}).get("vid")))
-                else:
-                    n.interfaces.append(InterfaceIP(ifname="mgmt", ip=ip, prefix_or_mask="", vlan=n.extras.get("manage_vlan", {}).get("vid")))
-                break
-        for line in lines:
-            m = RX_DEBUGIP.match(line.strip())
-            if m:
-                ip, mask = m.group(1), m.group(2)
-                n.interfaces.append(InterfaceIP(ifname="debug", ip=ip, prefix_or_mask="/" + str(_mask_to_prefix(mask)), vlan=None))
-                break
+        mg = res.first("mgmt_ip")
+        if mg:
+            ip = mg[0]
+            if "/" in ip:
+                a, pfx = ip.split("/", 1)
+                n.interfaces.append(InterfaceIP(ifname="mgmt", ip=a, prefix_or_mask="/" + pfx, vlan=n.extras.get("manage_vlan", {}).get("vid")))
+            else:
+                n.interfaces.append(InterfaceIP(ifname="mgmt", ip=ip, prefix_or_mask="", vlan=n.extras.get("manage_vlan", {}).get("vid")))
+        dbg = res.first("debug_ip")
+        if dbg:
+            ip, mask = dbg
+            n.interfaces.append(InterfaceIP(ifname="debug", ip=ip, prefix_or_mask="/" + str(mask_to_prefix(mask)), vlan=None))
 
         # route
-        for line in lines:
-            m = RX_STATIC_ROUTE.match(line.strip())
-            if m:
-                dest, gw, mask = m.group(1), m.group(2), m.group(3)
-                if mask == "0.0.0.0":
-                    prefix = f"{dest}/0"
-                else:
-                    prefix = f"{dest}/{_mask_to_prefix(mask)}"
-                n.routes.append(Route(prefix=prefix, next_hop=gw))
-                break
+        rt = res.first("route")
+        if rt:
+            dest, gw, mask = rt
+            if mask == "0.0.0.0":
+                prefix = f"{dest}/0"
+            else:
+                prefix = f"{dest}/{mask_to_prefix(mask)}"
+            n.routes.append(Route(prefix=prefix, next_hop=gw))
 
         # ONUs auth
         onu_map: Dict[Tuple[int,int,int], Onu] = {}
-        for line in lines:
-            m = RX_ONU_AUTH.match(line.strip())
-            if m:
-                sn = m.group(1)
-                sl = int(m.group(2))
-                pon = int(m.group(3))
-                onu_id = int(m.group(4))
-                ty = m.group(5)
-                onu = Onu(slot=sl, pon=pon, onu_id=onu_id, sn=sn, onu_type=ty)
-                onu_map[(sl, pon, onu_id)] = onu
+        for sn, sl, pon, onu_id, ty in res.get("onu_auth"):
+            onu_map[(sl, pon, onu_id)] = Onu(slot=sl, pon=pon, onu_id=onu_id, sn=sn, onu_type=ty)
 
         # Bandwidth
-        for line in lines:
-            m = RX_EP_BAND.match(line.strip())
-            if m:
-                sl = int(m.group(1))
-                pon = int(m.group(2))
-                onu_id = int(m.group(3))
-                up = int(m.group(4))
-                down = int(m.group(5))
-                assured = int(m.group(6))
-                key = (sl, pon, onu_id)
-                if key in onu_map:
-                    onu_map[key].upstream_kbps = up
-                    onu_map[key].downstream_kbps = down
-                    onu_map[key].upstream_assured = assured
+        for g in res.get("band"):
+            sl, pon, onu_id, up, down, assured = (int(x) for x in g)
+            key = (sl, pon, onu_id)
+            if key in onu_map:
+                onu_map[key].upstream_kbps = up
+                onu_map[key].downstream_kbps = down
+                onu_map[key].upstream_assured = assured
 
         # Services via vlan_m
         services_tmp: List[OnuService] = []
-        for line in lines:
-            m = RX_EP_VLAN.match(line.strip())
-            if m:
-                sl = int(m.group(1))
-                pon = int(m.group(2))
-                onu_list = [int(x) for x in m.group(3).split(",") if x.strip().isdigit()]
-                uni = int(m.group(4))
-                _serv = int(m.group(5))  # original serv id (ignored later)
-                mode = m.group(6).lower()
-                vlan_list = [int(x) for x in m.group(7).split(",") if x.strip().isdigit()]
-                # align lengths: if one vlan, replicate
-                if len(vlan_list) == 1 and len(onu_list) > 1:
-                    vlan_list = vlan_list * len(onu_list)
-                for idx, onu_id in enumerate(onu_list):
-                    vlan = vlan_list[idx] if idx < len(vlan_list) else (vlan_list[-1] if vlan_list else 0)
-                    if vlan:
-                        services_tmp.append(OnuService(slot=sl, pon=pon, onu_id=onu_id, uni_port=uni, svc_local_id=1, vlan=vlan,
-                                                       mode=("tag" if mode == "tag" else "translate" if mode == "tra" else mode)))
+        for g in res.get("ep_vlan"):
+            sl = int(g[0])
+            pon = int(g[1])
+            onu_list = [int(x) for x in g[2].split(",") if x.strip().isdigit()]
+            uni = int(g[3])
+            _serv = int(g[4])  # original serv id (ignored later)
+            mode = g[5].lower()
+            vlan_list = [int(x) for x in g[6].split(",") if x.strip().isdigit()]
+            # align lengths: if one vlan, replicate
+            if len(vlan_list) == 1 and len(onu_list) > 1:
+                vlan_list = vlan_list * len(onu_list)
+            for idx, onu_id in enumerate(onu_list):
+                vlan = vlan_list[idx] if idx < len(vlan_list) else (vlan_list[-1] if vlan_list else 0)
+                if vlan:
+                    services_tmp.append(OnuService(slot=sl, pon=pon, onu_id=onu_id, uni_port=uni, svc_local_id=1, vlan=vlan,
+                                                   mode=("tag" if mode == "tag" else "translate" if mode == "tra" else mode)))
 
         # PPPoE attach
         pppoe_by_onu_vlan: Dict[Tuple[int,int,int,int], Tuple[str,str]] = {}
-        for line in lines:
-            m = RX_WAN_PPPOE.match(line.strip())
-            if m:
-                sl, pon, onu_id = int(m.group(1)), int(m.group(2)), int(m.group(3))
-                ind = int(m.group(4))
-                vlan = int(m.group(5))
-                user = m.group(6)
-                pw = m.group(7)
-                pppoe_by_onu_vlan[(sl, pon, onu_id, vlan)] = (user, pw)
+        for sl, pon, onu_id, ind, vlan, user, pw in res.get("pppoe"):
+            pppoe_by_onu_vlan[(sl, pon, onu_id, vlan)] = (user, pw)
 
         # Consolidate ONUs list
         n.onus = sorted(onu_map.values(), key=lambda o: (o.slot, o.pon, o.onu_id))
@@ -222,10 +263,10 @@ class FiberhomeAdapter(VendorAdapter):
 
     def render(self, target_data: Dict[str, List[Dict[str, Any]]], fast: Dict[str, Any] | None = None) -> str:
         # Not the main goal in this turbo build.
+        target_data = self.records(target_data)
         out=["! Fiberhome render (best-effort) - use as source mostly"]
         for v in target_data.get("vlans", []):
-            vid=int(v.get("vid",0) or 0)
-            nm=str(v.get("name","")).strip()
+            vid, nm = v["vid"], v["name"]
             if vid:
                 out.append(f"vlan {vid} {nm}".strip())
         return "\n".join(out)
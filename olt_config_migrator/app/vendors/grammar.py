@@ -0,0 +1,317 @@
+from __future__ import annotations
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Pattern, Tuple
+
+from ..models import InterfaceIP, NormalizedConfig, Route, Trunk, Vlan
+from ..utils import mask_to_prefix, maybe_prefix_or_mask, parse_vlan_spec
+
+# fields extraídos de uma linha: grupos da regex ou tupla devolvida por `extract`
+Fields = Tuple[Any, ...]
+
+
+@dataclass
+class Rule:
+    """One line rule of a vendor grammar.
+
+    prefix:  leading keywords (case-insensitive, whitespace-separated) used for dispatch.
+    pattern: regex matched against the stripped line; its groups become the fields.
+    extract: alternative to pattern, a function line -> tuple of fields (or None).
+    target:  bucket of the ParseResult that receives the converted item ("" = discard).
+    convert: (fields, ctx) -> item; default keeps the fields tuple.
+    context: block in which the rule is active ("" = top level).
+    opens:   block opened by this line; the converted item becomes the block ctx.
+    once:    only the first matching line counts (e.g. the management VLAN).
+    """
+    prefix: str
+    pattern: Optional[str] = None
+    extract: Optional[Callable[[str], Optional[Fields]]] = None
+    target: str = ""
+    convert: Optional[Callable[[Fields, Any], Any]] = None
+    context: str = ""
+    opens: str = ""
+    once: bool = False
+    name: str = ""
+
+    def __post_init__(self):
+        self.keywords: Tuple[str, ...] = tuple(self.prefix.lower().split())
+        self.rx: Optional[Pattern[str]] = re.compile(self.pattern, re.I) if self.pattern else None
+        if not self.name:
+            self.name = self.target or self.opens or self.prefix
+
+
+# Cobertura do parser: linhas reconhecidas por regra e não reconhecidas por assinatura
+# (duas primeiras palavras, sem dígitos: "interface gpon_onu-1/2/3:4" -> "interface gpon_onu-//:").
+# Só contadores e umas poucas amostras curtas por assinatura, nada do texto inteiro;
+# o tempo por regra é amostrado (1 linha a cada TIMING_EVERY) para não pesar em backups grandes.
+TIMING_EVERY = 16
+MAX_SIGNATURES = 1000
+SAMPLES_PER_SIGNATURE = 3
+SAMPLE_LEN = 160
+OTHER_SIGNATURE = ("(outras)", "")
+NO_RULE = "(sem regra)"
+_NO_DIGITS = str.maketrans("", "", "0123456789")
+
+
+@dataclass
+class Coverage:
+    """Matched/unmatched line counters of one grammar run."""
+    lines: int = 0       # linhas não vazias
+    matched: int = 0
+    structural: int = 0  # fim de bloco / comentário fora de bloco
+    hits: Dict[str, int] = field(default_factory=dict)
+    unknown: Dict[Tuple[str, str], int] = field(default_factory=dict)
+    samples: Dict[Tuple[str, str], List[str]] = field(default_factory=dict)
+    timed_ns: Dict[str, int] = field(default_factory=dict)
+    timed_lines: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def unmatched(self) -> int:
+        return self.lines - self.matched - self.structural
+
+    @property
+    def ratio(self) -> float:
+        return 1.0 - self.unmatched / self.lines if self.lines else 1.0
+
+    def rule_ms(self, name: str) -> float:
+        """Estimated total time spent on lines of rule `name` (from the timed sample)."""
+        n = self.timed_lines.get(name, 0)
+        count = self.unmatched if name == NO_RULE else self.hits.get(name, 0)
+        return self.timed_ns.get(name, 0) / n * count / 1e6 if n else 0.0
+
+    def top_unknown(self, limit: int = 10) -> List[Tuple[str, int, List[str]]]:
+        """(signature, lines, samples) of the most frequent unmatched signatures."""
+        top = sorted(self.unknown.items(), key=lambda kv: -kv[1])[:limit]
+        return [(" ".join(x for x in sig if x), count, self.samples.get(sig, [])) for sig, count in top]
+
+    def summary(self) -> str:
+        if not self.unmatched:
+            return f"{self.lines} linhas, todas reconhecidas"
+        return (f"{self.ratio:.1%} de {self.lines} linhas reconhecidas; {self.unmatched} ignoradas "
+                f"em {len(self.unknown)} assinaturas")
+
+    def report(self, limit: int = 10) -> str:
+        out = [self.summary()]
+        if self.unknown:
+            out.append("Não reconhecidas:")
+            for sig, count, samples in self.top_unknown(limit):
+                out.append(f"  {count:>8}  {sig}")
+                out.extend(f"            | {x}" for x in samples)
+            if len(self.unknown) > limit:
+                out.append(f"  ... mais {len(self.unknown) - limit} assinaturas")
+        out.append("Regras (linhas, tempo estimado):")
+        for name, count in sorted(self.hits.items(), key=lambda kv: -kv[1]):
+            out.append(f"  {count:>8}  {self.rule_ms(name):>8.1f} ms  {name}")
+        if self.unmatched:
+            out.append(f"  {self.unmatched:>8}  {self.rule_ms(NO_RULE):>8.1f} ms  {NO_RULE}")
+        return "\n".join(out)
+
+    def add_unknown(self, k1: str, k2: str, line: str) -> None:
+        sig = (k1.translate(_NO_DIGITS) or "#", k2.translate(_NO_DIGITS) or ("#" if k2 else ""))
+        count = self.unknown.get(sig)
+        if count is None:
+            if len(self.unknown) >= MAX_SIGNATURES:
+                sig = OTHER_SIGNATURE
+                count = self.unknown.get(sig, 0)
+            else:
+                count = 0
+        self.unknown[sig] = count + 1
+        samples = self.samples.setdefault(sig, [])
+        if len(samples) < SAMPLES_PER_SIGNATURE:
+            samples.append(line[:SAMPLE_LEN])
+
+
+class ParseResult:
+    """Buckets filled by a grammar run; adapters assemble the NormalizedConfig from them."""
+
+    def __init__(self):
+        self.buckets: Dict[str, List[Any]] = defaultdict(list)
+        self.lines = 0
+        self.matched = 0
+        self.coverage = Coverage()
+
+    def get(self, target: str) -> List[Any]:
+        return self.buckets.get(target, [])
+
+    def first(self, target: str, default: Any = None) -> Any:
+        items = self.buckets.get(target)
+        return items[0] if items else default
+
+
+class Grammar:
+    """Compiled keyword-dispatch table over a vendor's rules.
+
+    Rules are indexed per context by their first two keywords (or the first
+    one, for single-keyword prefixes), so each line costs one split, at most two
+    dict lookups and the few rules sharing its keywords. Everything runs in a
+    single streaming pass.
+    """
+
+    def __init__(self, rules: List[Rule], block_end: Tuple[str, ...] = ("!", "$", "#", "exit", "quit")):
+        self.rules = rules
+        self.block_end = frozenset(x.lower() for x in block_end)
+        self.table: Dict[str, Dict[Tuple[str, ...], List[Rule]]] = {}
+        for r in rules:
+            if not r.keywords:
+                raise ValueError(f"regra sem prefixo: {r.name}")
+            self.table.setdefault(r.context, {}).setdefault(r.keywords[:2], []).append(r)
+        for by_kw in self.table.values():
+            for lst in by_kw.values():
+                lst.sort(key=lambda r: -len(r.keywords))
+
+    @staticmethod
+    def _match(rules: List[Rule], line: str, done: set) -> Optional[Tuple[Rule, Fields]]:
+        for r in rules:
+            if r.rx is not None:
+                # a regex ancorada já cobre o prefixo
+                m = r.rx.match(line)
+                if not m:
+                    continue
+                fields: Fields = m.groups()
+            elif r.extract is not None:
+                fields = r.extract(line)
+                if fields is None:
+                    continue
+            else:
+                toks = line.split()
+                k = len(r.keywords)
+                if tuple(t.lower() for t in toks[:k]) != r.keywords:
+                    continue
+                fields = tuple(toks[k:])
+            if r.once and r.name in done:
+                # já consumida: a linha casa com a regra e é reconhecida, mas ignorada
+                return r, ()
+            return r, fields
+        return None
+
+    def _lookup(self, by_kw: Dict[Tuple[str, ...], List[Rule]], k1: str, k2: str, line: str, done: set) -> Optional[Tuple[Rule, Fields]]:
+        rules = by_kw.get((k1, k2)) if k2 else None
+        if rules:
+            hit = self._match(rules, line, done)
+            if hit is not None:
+                return hit
+        rules = by_kw.get((k1,))
+        if rules:
+            return self._match(rules, line, done)
+        return None
+
+    def run(self, lines: Iterable[str]) -> ParseResult:
+        res = ParseResult()
+        buckets = res.buckets
+        done: set = set()
+        context = ""
+        ctx: Any = None
+        top = self.table.get("", {})
+        block_end = self.block_end
+        match = self._match
+        cov = res.coverage
+        hits = cov.hits
+        clock = time.perf_counter_ns
+        n_lines = matched = filled = structural = closed = 0
+        for raw in lines:
+            n_lines += 1
+            line = raw.strip()
+            if not line:
+                continue
+            filled += 1
+            t0 = clock() if not filled % TIMING_EVERY else 0
+            toks = line.split(None, 2)
+            k1 = toks[0].lower()
+            k2 = toks[1].lower() if len(toks) > 1 else ""
+            hit = None
+            if context:
+                if k1 in block_end:
+                    context, ctx = "", None
+                    matched += 1
+                    closed += 1
+                    continue
+                hit = self._lookup(self.table.get(context, {}), k1, k2, line, done)
+                if hit is None and raw[:1] not in (" ", "\t"):
+                    # linha sem indentação que o bloco não conhece: bloco terminou
+                    context, ctx = "", None
+            if hit is None and not context:
+                rules = top.get((k1, k2))
+                if rules:
+                    hit = match(rules, line, done)
+                if hit is None:
+                    rules = top.get((k1,))
+                    if rules:
+                        hit = match(rules, line, done)
+            if hit is None:
+                if k1 in block_end or line[0] in "!#":
+                    structural += 1
+                else:
+                    cov.add_unknown(k1, k2, line)
+                    if t0:
+                        cov.timed_ns[NO_RULE] = cov.timed_ns.get(NO_RULE, 0) + clock() - t0
+                        cov.timed_lines[NO_RULE] = cov.timed_lines.get(NO_RULE, 0) + 1
+                continue
+            r, fields = hit
+            matched += 1
+            hits[r.name] = hits.get(r.name, 0) + 1
+            if r.once:
+                if r.name in done:
+                    continue
+                done.add(r.name)
+            item = r.convert(fields, ctx) if r.convert else fields
+            if r.opens:
+                context, ctx = r.opens, item
+            if r.target:
+                buckets[r.target].append(item)
+            if t0:
+                cov.timed_ns[r.name] = cov.timed_ns.get(r.name, 0) + clock() - t0
+                cov.timed_lines[r.name] = cov.timed_lines.get(r.name, 0) + 1
+        res.lines = n_lines
+        res.matched = matched
+        cov.lines = filled
+        cov.matched = matched - closed
+        cov.structural = structural + closed
+        return res
+
+
+# ---------------------------------------------------------------------------
+# Conversores/montagem compartilhados pelos adapters "L2/L3" (VLAN, trunk, IP, rota)
+
+def to_vlans(fields: Fields, ctx: Any) -> List[int]:
+    return parse_vlan_spec(" ".join(f for f in fields if f))
+
+
+def to_ifname(fields: Fields, ctx: Any) -> Dict[str, Any]:
+    return {"ifname": " ".join(f for f in fields if f).strip()}
+
+
+def to_trunk_vlans(fields: Fields, ctx: Any) -> Tuple[str, List[int]]:
+    return (ctx or {}).get("ifname", ""), to_vlans(fields, ctx)
+
+
+def to_ip(fields: Fields, ctx: Any) -> InterfaceIP:
+    ip, pfx = maybe_prefix_or_mask("ip address " + " ".join(f for f in fields if f))
+    return InterfaceIP(ifname=(ctx or {}).get("ifname", ""), ip=ip, prefix_or_mask=pfx)
+
+
+def to_route(fields: Fields, ctx: Any) -> Route:
+    """'<prefix> <nh>' or '<dest> <mask> <nh>'."""
+    parts = [f for f in fields if f]
+    if len(parts) >= 3:
+        return Route(prefix=f"{parts[0]}/{mask_to_prefix(parts[1])}", next_hop=parts[2])
+    return Route(prefix=parts[0] if parts else "", next_hop=parts[1] if len(parts) > 1 else "")
+
+
+def assemble_l2l3(res: ParseResult) -> NormalizedConfig:
+    """Build a NormalizedConfig from the 'vlans', 'trunk_vlans', 'interfaces' and 'routes' buckets."""
+    n = NormalizedConfig()
+    vids = set()
+    for vl in res.get("vlans"):
+        vids.update(vl)
+    trunks: Dict[str, List[int]] = {}
+    for ifname, vl in res.get("trunk_vlans"):
+        if ifname:
+            trunks.setdefault(ifname, []).extend(vl)
+            vids.update(vl)
+    n.vlans = [Vlan(vid=v) for v in sorted(vids)]
+    n.trunks = [Trunk(ifname=k, tagged_vlans=sorted(set(v))) for k, v in trunks.items()]
+    n.interfaces = [i for i in res.get("interfaces") if i.ifname and i.ip]
+    n.routes = [r for r in res.get("routes") if r.prefix and r.next_hop]
+    return n
@@ -1,20 +1,53 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Tuple
 
 from .base import VendorAdapter
+from .grammar import Grammar, ParseResult, Rule, assemble_l2l3, to_ifname, to_ip, to_route, to_trunk_vlans, to_vlans
 from ..models import NormalizedConfig, SectionSchema, SectionColumn
-from ..utils import format_vlan_ranges
+from ..packing import PackRule, pack_vlans
+from ..remap import ONU_COLLISION, RemapIssue
+from ..utils import parse_vlan_spec
+
+
+# Gramática (origem Huawei): VLANs, uplinks, IPs e rotas
+GRAMMAR = Grammar([
+    Rule("vlan batch", target="vlans", convert=to_vlans),
+    Rule("vlan", pattern=r"^vlan\s+(\d+)\s*$", target="vlans", convert=to_vlans),
+    Rule("interface", opens="interface", convert=to_ifname),
+    Rule("ip address", context="interface", target="interfaces", convert=to_ip),
+    Rule("switchport mode", context="interface"),
+    Rule("no shutdown", context="interface"),
+    Rule("shutdown", context="interface"),
+    Rule("description", context="interface"),
+    Rule("port link-type", context="interface"),
+    Rule("port trunk allow-pass vlan", context="interface", target="trunk_vlans", convert=to_trunk_vlans),
+    Rule("ip route-static", target="routes", convert=to_route),
+], block_end=("#", "quit", "return"))
 
 
 class HuaweiAdapter(VendorAdapter):
     vendor_id = "huawei"
     label = "Huawei"
     default_extension = "txt"
+    signatures = (
+        (r"# ===== huawei ", 10), (r"vlan batch ", 5), (r"ont add \d+ \d+ ", 5), (r"interface gpon \d+/\d+\s*$", 3),
+        (r"port trunk allow-pass vlan ", 4), (r"ip route-static ", 4), (r"dba-profile add ", 4),
+        (r"service-port vlan \d+ gpon ", 4), (r"sysname ", 2), (r"return$", 1),
+    )
+    grammar = GRAMMAR
+    # VRP aceita linhas longas, mas 'vlan batch'/'allow-pass' só 10 itens por comando
+    max_line_len = 510
+    max_vlan_items = 10
 
     def parse_to_normalized(self, text: str) -> NormalizedConfig:
-        # TODO: Implementar parser Huawei como origem.
-        return NormalizedConfig()
+        return self.parse_lines(text.splitlines())
+
+    def parse_lines(self, lines: Iterable[str]) -> NormalizedConfig:
+        return self._assemble(GRAMMAR.run(lines))
+
+    def _assemble(self, res: ParseResult) -> NormalizedConfig:
+        return assemble_l2l3(res)
 
     def schema(self) -> List[SectionSchema]:
         return [
@@ -55,6 +88,46 @@ class HuaweiAdapter(VendorAdapter):
                     SectionColumn("next_hop", "Next-hop", editable=True, placeholder="Ex.: 192.168.1.1"),
                 ],
             ),
+            SectionSchema(
+                key="tcont_profiles",
+                title="DBA profiles",
+                description="Viram 'dba-profile add' (referencie-os nos ont-lineprofiles).",
+                columns=[
+                    SectionColumn("name", "Nome", editable=True),
+                    SectionColumn("dba_type", "Type", editable=True, col_type="int"),
+                    SectionColumn("assured_kbps", "Assured(kbps)", editable=True, col_type="int"),
+                    SectionColumn("max_kbps", "Max(kbps)", editable=True, col_type="int"),
+                ],
+            ),
+            SectionSchema(
+                key="onus",
+                title="ONTs",
+                description="'ont add' por ONT. PON/ONT da origem (base 1) viram port/ont-id base 0.",
+                columns=[
+                    SectionColumn("slot", "Slot", editable=True, col_type="int"),
+                    SectionColumn("pon", "PON", editable=True, col_type="int"),
+                    SectionColumn("onu_id", "ONU ID", editable=True, col_type="int"),
+                    SectionColumn("sn", "SN", editable=True),
+                    SectionColumn("onu_type", "Type", editable=True),
+                    SectionColumn("name", "Desc", editable=True),
+                ],
+            ),
+            SectionSchema(
+                key="services",
+                title="Service-ports",
+                description="ONTs consecutivas com a mesma VLAN/gemport saem num único 'service-port ... ont A-B'.",
+                columns=[
+                    SectionColumn("slot", "Slot", editable=True, col_type="int"),
+                    SectionColumn("pon", "PON", editable=True, col_type="int"),
+                    SectionColumn("onu_id", "ONU", editable=True, col_type="int"),
+                    SectionColumn("svc_local_id", "Gemport", editable=True, col_type="int"),
+                    SectionColumn("uni_port", "ETH", editable=True, col_type="int"),
+                    SectionColumn("vlan", "VLAN", editable=True, col_type="int"),
+                    SectionColumn("mode", "Mode(tag/untag)", editable=True),
+                    SectionColumn("pppoe_user", "PPPoE user", editable=True),
+                    SectionColumn("pppoe_pass", "PPPoE pass", editable=True),
+                ],
+            ),
         ]
 
     def from_normalized(self, normalized: NormalizedConfig) -> Dict[str, List[Dict[str, Any]]]:
@@ -63,43 +136,49 @@ class HuaweiAdapter(VendorAdapter):
             "trunks": [],
             "interface_ips": [{"ifname": i.ifname, "ip": i.ip, "prefix_or_mask": i.prefix_or_mask} for i in normalized.interfaces],
             "routes": [{"prefix": r.prefix, "next_hop": r.next_hop} for r in normalized.routes],
+            "tcont_profiles": [{"name": p.name, "dba_type": p.dba_type, "assured_kbps": p.assured_kbps, "max_kbps": p.max_kbps}
+                               for p in normalized.tcont_profiles],
+            "onus": [{"slot": o.slot, "pon": o.pon, "onu_id": o.onu_id, "sn": o.sn, "onu_type": o.onu_type, "name": o.name}
+                     for o in normalized.onus],
+            "services": [{"slot": v.slot, "pon": v.pon, "onu_id": v.onu_id, "svc_local_id": v.svc_local_id, "uni_port": v.uni_port,
+                          "vlan": v.vlan, "mode": v.mode, "pppoe_user": v.pppoe_user, "pppoe_pass": v.pppoe_pass}
+                         for v in normalized.services],
         }
 
     def render(self, target_data: Dict[str, List[Dict[str, Any]]], fast: Dict[str, Any] | None = None) -> str:
         fast = fast or {}
-        vlans = [int(v.get("vid", 0) or 0) for v in target_data.get("vlans", []) if int(v.get("vid", 0) or 0) > 0]
+        target_data = self.records(target_data)
+        vlans = [v["vid"] for v in target_data.get("vlans", []) if v["vid"] > 0]
         trunks = target_data.get("trunks", []) or []
         ifaces = target_data.get("interface_ips", []) or []
         routes = target_data.get("routes", []) or []
 
         out: List[str] = []
         out.append("# ===== Huawei (gerado pelo OLT Config Migrator) =====")
-        out.append("# OBS: ONUs/serviços ainda não estão implementados para Huawei (somente VLANs/uplinks/IP/rotas).")
         out.append("#")
 
         if vlans:
-            # Em Huawei normalmente você cria vlan batch. Mantemos simples.
-            out.append(f"vlan batch {format_vlan_ranges(vlans, sep=' ', range_sep=' to ', space=True)}")
+            # Em Huawei normalmente você cria vlan batch (10 itens por comando).
+            out.extend(pack_vlans(vlans, PackRule("vlan batch ", sep=" ", range_sep=" to ", max_line=self.max_line_len, max_items=self.max_vlan_items)))
             out.append("#")
 
+        trunk_rule = PackRule(" port trunk allow-pass vlan ", sep=" ", range_sep=" to ", max_line=self.max_line_len, max_items=self.max_vlan_items)
         for t in trunks:
-            ifname = str(t.get("ifname","")).strip()
-            tagged = str(t.get("tagged","")).strip()
+            ifname = t["ifname"]
+            tagged = t["tagged"]
             if not ifname:
                 continue
             out.append(f"interface {ifname}")
             if tagged:
-                if tagged.upper() == "ALL":
-                    tagged = format_vlan_ranges(vlans, sep=' ', range_sep=' to ', space=True) if vlans else ""
-                if tagged:
-                    out.append(f" port trunk allow-pass vlan {tagged}")
+                vids = vlans if tagged.upper() == "ALL" else parse_vlan_spec(tagged)
+                out.extend(pack_vlans(vids, trunk_rule))
             out.append(" quit")
             out.append("#")
 
         for i in ifaces:
-            ifname = str(i.get("ifname","")).strip()
-            ip = str(i.get("ip","")).strip()
-            mask = str(i.get("prefix_or_mask","")).strip()
+            ifname = i["ifname"]
+            ip = i["ip"]
+            mask = i["prefix_or_mask"]
             if not ifname or not ip or not mask:
                 continue
             out.append(f"interface {ifname}")
@@ -109,11 +188,141 @@ class HuaweiAdapter(VendorAdapter):
             out.append("#")
 
         for r in routes:
-            pfx = str(r.get("prefix","")).strip()
-            nh = str(r.get("next_hop","")).strip()
+            pfx = r["prefix"]
+            nh = r["next_hop"]
             if pfx and nh:
                 # Se vier em CIDR, Huawei costuma aceitar ip route-static <dest> <mask> <nexthop>
                 out.append(f"ip route-static {pfx} {nh}")
+        if routes:
+            out.append("#")
+
+        self._render_gpon(out, target_data, fast)
 
         out.append("# ===== fim =====")
         return "\n".join(out) + "\n"
+
+    def check_target(self, target_data: Dict[str, List[Dict[str, Any]]], fast: Dict[str, Any] | None = None) -> List[RemapIssue]:
+        return _place_onts(target_data, fast or {})[1]
+
+    def _render_gpon(self, out: List[str], target_data: Dict[str, List[Dict[str, Any]]], fast: Dict[str, Any]) -> None:
+        """DBA profiles, 'interface gpon' blocks with 'ont add' and the service-ports."""
+        vlan_offset = int(fast.get("vlan_offset", 0) or 0)
+        line_profile = int(fast.get("line_profile_id", 10) or 10)
+        srv_profile = int(fast.get("srv_profile_id", 10) or 10)
+        batch = bool(fast.get("batch_service_ports", True))
+
+        for p in target_data.get("tcont_profiles", []) or []:
+            name = p["name"]
+            if not name:
+                continue
+            assured, maxbw = p["assured_kbps"], p["max_kbps"]
+            if p["dba_type"] == 4:
+                out.append(f"dba-profile add profile-name {name} type4 max {maxbw}")
+            else:
+                out.append(f"dba-profile add profile-name {name} type3 assure {assured} max {maxbw}")
+        if target_data.get("tcont_profiles"):
+            out.append("#")
+
+        where = _where_fn(fast)
+        placed, collisions = _place_onts(target_data, fast)
+        onts: Dict[str, Dict[int, List[Tuple[int, Dict[str, Any]]]]] = {}
+        for (board, port, ont), o in placed.items():
+            onts.setdefault(board, {}).setdefault(port, []).append((ont, o))
+        kept = {_src_key(o) for o in placed.values()}
+        for issue in collisions:
+            out.append(f"# ONT ignorada ({issue.detail})")
+        # serviços indexados pela chave da origem: com SLOT fixo, slots diferentes caem na mesma placa
+        # (só os das ONTs que entraram no script)
+        svcs: Dict[Tuple[int, int, int], List[Tuple[int, Tuple[str, int, int], Dict[str, Any]]]] = {}
+        for v in target_data.get("services", []) or []:
+            w = where(v)
+            vlan = v["vlan"] + vlan_offset
+            key = _src_key(v)
+            if w and vlan > 0 and key in kept:
+                svcs.setdefault(key, []).append((vlan, w, v))
+
+        for board in sorted(onts):
+            out.append(f"interface gpon {board}")
+            for port in sorted(onts[board]):
+                for ont, o in sorted(onts[board][port], key=lambda x: x[0]):
+                    sn, desc = o["sn"], o["name"]
+                    auth = f'sn-auth "{sn}"' if sn else "loid-auth"
+                    line = f" ont add {port} {ont} {auth} omci ont-lineprofile-id {line_profile} ont-srvprofile-id {srv_profile}"
+                    out.append(line + (f' desc "{desc}"' if desc else ""))
+                    for vlan, _, v in svcs.get(_src_key(o), []):
+                        if v["mode"].lower() == "untag":
+                            out.append(f" ont port native-vlan {port} {ont} eth {v['uni_port'] or 1} vlan {vlan}")
+                        user = v["pppoe_user"]
+                        if user:
+                            out.append(f" ont ipconfig {port} {ont} pppoe vlan {vlan} priority 0 "
+                                       f"user-account username {user} password {v['pppoe_pass']}")
+            out.append(" quit")
+            out.append("#")
+
+        # service-ports: ONTs consecutivas com o mesmo (gemport, VLAN) viram um comando 'ont A-B'
+        groups: Dict[Tuple[str, int, int, int], List[int]] = {}
+        for lst in svcs.values():
+            for vlan, (board, port, ont), v in lst:
+                groups.setdefault((board, port, vlan, v["svc_local_id"] or 1), []).append(ont)
+        for board, port, vlan, gem in sorted(groups):
+            onts_ids = sorted(set(groups[(board, port, vlan, gem)]))
+            runs = _runs(onts_ids) if batch else [(x, x) for x in onts_ids]
+            for a, b in runs:
+                ont = str(a) if a == b else f"{a}-{b}"
+                out.append(f"service-port vlan {vlan} gpon {board}/{port} ont {ont} gemport {gem} "
+                           f"multi-service user-vlan {vlan} tag-transform translate")
+        if groups:
+            out.append("#")
+
+
+def _where_fn(fast: Dict[str, Any]):
+    """Row -> ('frame/slot', port, ont) on the Huawei side, or None for invalid ids."""
+    frame = str(fast.get("frame", "")).strip() or "0"
+    fixed_slot = str(fast.get("slot", "")).strip()
+    pon_offset = int(fast.get("pon_offset", 0) or 0)
+
+    def where(row: Dict[str, Any]) -> Tuple[str, int, int] | None:
+        # Huawei numera port e ont-id a partir de 0; a origem (Fiberhome) a partir de 1
+        sl = fixed_slot or str(row["slot"])
+        port = row["pon"] + pon_offset - 1
+        ont = row["onu_id"] - 1
+        if port < 0 or ont < 0:
+            return None
+        return f"{frame}/{sl}", port, ont
+    return where
+
+
+def _src_key(row: Dict[str, Any]) -> Tuple[int, int, int]:
+    return row["slot"], row["pon"], row["onu_id"]
+
+
+def _place_onts(target_data: Dict[str, List[Dict[str, Any]]], fast: Dict[str, Any]
+                ) -> Tuple[Dict[Tuple[str, int, int], Dict[str, Any]], List[RemapIssue]]:
+    """ONUs by target (board, port, ont). With a fixed SLOT two source slots can land on the
+    same position: the first ONU keeps it and the others are reported (the OLT would reject them)."""
+    where = _where_fn(fast)
+    placed: Dict[Tuple[str, int, int], Dict[str, Any]] = {}
+    issues: List[RemapIssue] = []
+    for o in target_data.get("onus", []) or []:
+        w = where(o)
+        if not w:
+            continue
+        first = placed.get(w)
+        if first is not None:
+            issues.append(RemapIssue(ONU_COLLISION, f"ONU {o['slot']}/{o['pon']}:{o['onu_id']} ({o['sn'] or 'sem SN'}) "
+                                                    f"cai em {w[0]}/{w[1]} ont {w[2]}, já ocupada por "
+                                                    f"{first['slot']}/{first['pon']}:{first['onu_id']}"))
+            continue
+        placed[w] = o
+    return placed, issues
+
+
+def _runs(ids: List[int]) -> List[Tuple[int, int]]:
+    """Sorted ints -> consecutive (first, last) runs."""
+    runs: List[Tuple[int, int]] = []
+    for x in ids:
+        if runs and x == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], x)
+        else:
+            runs.append((x, x))
+    return runs
@@ -1,20 +1,49 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List
 
 from .base import VendorAdapter
+from .grammar import Grammar, ParseResult, Rule, assemble_l2l3, to_ifname, to_ip, to_route, to_trunk_vlans, to_vlans
 from ..models import NormalizedConfig, SectionSchema, SectionColumn
-from ..utils import compress_vlan_list
+from ..packing import PackRule, pack_vlans
+from ..utils import compress_vlan_list, parse_vlan_spec
+
+
+# Gramática (origem V-Solution): linhas do bloco 'interface' não são indentadas
+GRAMMAR = Grammar([
+    Rule("vlan", target="vlans", convert=to_vlans),
+    Rule("interface", opens="interface", convert=to_ifname),
+    Rule("ip address", context="interface", target="interfaces", convert=to_ip),
+    Rule("switchport mode", context="interface"),
+    Rule("no shutdown", context="interface"),
+    Rule("shutdown", context="interface"),
+    Rule("description", context="interface"),
+    Rule("switchport trunk pvid vlan", context="interface"),
+    Rule("switchport trunk vlan", context="interface", target="trunk_vlans", convert=to_trunk_vlans),
+    Rule("ip route", target="routes", convert=to_route),
+], block_end=("!", "exit"))
 
 
 class VSolutionAdapter(VendorAdapter):
     vendor_id = "vsol"
     label = "V-Solution"
     default_extension = "cfg"
+    signatures = (
+        (r"! ===== v-solution ", 10), (r"switchport trunk pvid vlan ", 4), (r"switchport trunk vlan ", 4),
+        (r"vlan \d+ - \d+$", 3), (r"onu add \d+ profile ", 3), (r"onu confirm", 3),
+    )
+    grammar = GRAMMAR
+    # Limite de linha da CLI V-Solution
+    max_line_len = 256
 
     def parse_to_normalized(self, text: str) -> NormalizedConfig:
-        # Ainda não implementado como origem.
-        return NormalizedConfig()
+        return self.parse_lines(text.splitlines())
+
+    def parse_lines(self, lines: Iterable[str]) -> NormalizedConfig:
+        return self._assemble(GRAMMAR.run(lines))
+
+    def _assemble(self, res: ParseResult) -> NormalizedConfig:
+        return assemble_l2l3(res)
 
     def schema(self) -> List[SectionSchema]:
         return [
@@ -67,7 +96,8 @@ class VSolutionAdapter(VendorAdapter):
         }
 
     def render(self, target_data: Dict[str, List[Dict[str, Any]]], fast: Dict[str, Any] | None = None) -> str:
-        vlans = [int(v.get("vid", 0) or 0) for v in target_data.get("vlans", []) if int(v.get("vid", 0) or 0) > 0]
+        target_data = self.records(target_data)
+        vlans = [v["vid"] for v in target_data.get("vlans", []) if v["vid"] > 0]
         trunks = target_data.get("trunks", []) or []
         ifaces = target_data.get("interface_ips", []) or []
         routes = target_data.get("routes", []) or []
@@ -87,41 +117,20 @@ class VSolutionAdapter(VendorAdapter):
             out.append("exit")
             out.append("!")
 
-        # Trunks: V-Solution costuma usar 'switchport trunk vlan <vid>' repetido
+        # Trunks: 'switchport trunk vlan' aceita lista/ranges; empacotamos por linha
+        trunk_rule = PackRule("switchport trunk vlan ", max_line=self.max_line_len)
         for t in trunks:
-            ifname = str(t.get("ifname","")).strip()
-            tagged = str(t.get("tagged","")).strip()
-            pvid = int(t.get("pvid", 1) or 1)
+            ifname = t["ifname"]
+            tagged = t["tagged"]
+            pvid = t["pvid"] or 1
             if not ifname:
                 continue
             out.append(f"interface {ifname}")
             out.append("switchport mode trunk")
             if tagged:
-                vids: List[int] = []
-                if tagged.upper() == "ALL":
-                    vids = vlans
-                else:
-                    # aceita '800-808,1554'
-                    tmp = []
-                    for part in tagged.replace(";",",").split(","):
-                        part = part.strip()
-                        if not part:
-                            continue
-                        if "-" in part:
-                            s,e = part.split("-",1)
-                            try:
-                                s=int(s); e=int(e)
-                                tmp.extend(list(range(min(s,e), max(s,e)+1)))
-                            except:
-                                pass
-                        else:
-                            try:
-                                tmp.append(int(part))
-                            except:
-                                pass
-                    vids = sorted(set(tmp))
-                for vid in vids:
-                    out.append(f"switchport trunk vlan {vid}")
+                # aceita 'ALL' ou '800-808,1554'; a lista sai compactada em ranges
+                vids = vlans if tagged.upper() == "ALL" else parse_vlan_spec(tagged)
+                out.extend(pack_vlans(vids, trunk_rule))
             out.append(f"switchport trunk pvid vlan {pvid}")
             out.append("no shutdown")
             out.append("exit")
@@ -129,9 +138,9 @@ class VSolutionAdapter(VendorAdapter):
 
         # IP interfaces
         for i in ifaces:
-            ifname = str(i.get("ifname","")).strip()
-            ip = str(i.get("ip","")).strip()
-            mask = str(i.get("prefix_or_mask","")).strip()
+            ifname = i["ifname"]
+            ip = i["ip"]
+            mask = i["prefix_or_mask"]
             if not ifname or not ip or not mask:
                 continue
             out.append(f"interface {ifname}")
@@ -141,8 +150,8 @@ class VSolutionAdapter(VendorAdapter):
             out.append("!")
 
         for r in routes:
-            pfx = str(r.get("prefix","")).strip()
-            nh = str(r.get("next_hop","")).strip()
+            pfx = r["prefix"]
+            nh = r["next_hop"]
             if pfx and nh:
                 out.append(f"ip route {pfx} {nh}")
 
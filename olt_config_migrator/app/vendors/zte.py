@@ -1,19 +1,192 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, Iterable, List, Tuple
 from .base import VendorAdapter
+from .grammar import Grammar, ParseResult, Rule, to_ifname, to_ip, to_route, to_trunk_vlans, to_vlans
+from ..diff import diff_normalized
+from ..remap import RemapIssue
 from ..models import NormalizedConfig, Vlan, Trunk, TcontProfile, Onu, OnuService, InterfaceIP, Route, SectionSchema, SectionColumn
+from ..utils import format_vlan_ranges, script_stats
 
 def _uniq_ints(vals: List[int]) -> List[int]:
     return sorted({int(v) for v in vals if int(v) > 0})
 
+_CONTEXT_PREFIXES = ("interface ", "pon-onu-mng ")
+
+def _merge_adjacent_contexts(lines: List[str]) -> List[str]:
+    """Drop '$' + reopen pairs when the same context is entered again right after closing it."""
+    out: List[str] = []
+    current = ""
+    i = 0
+    n = len(lines)
+    while i < n:
+        line = lines[i]
+        if line == "$" and current and i + 1 < n and lines[i + 1] == current:
+            i += 2
+            continue
+        if line.startswith(_CONTEXT_PREFIXES):
+            current = line
+        elif line == "$":
+            current = ""
+        out.append(line)
+        i += 1
+    return out
+
+# ---------------------------------------------------------------------------
+# Parser de 'show running-config' (C300/C600) para conferir o que a OLT tem
+# depois de aplicar o script. Aceita gpon_olt-1/2/3 (C600) e gpon-olt_1/2/3 (C300);
+# SLOT não numérico (placeholder [SLOT] do render) vira PLACEHOLDER_SLOT, um slot válido para o
+# render: um script gerado sem Frame/Slot pode ser relido e renderizado de novo sem perder serviços.
+
+_PORT = r"([^/\s]+)/([^/\s]+)/(\d+)"
+PLACEHOLDER_SLOT = 1
+
+# avisos de check_target(): linhas que o render descarta por slot/PON/ONU inválidos
+ONU_DROPPED = "onu_descartada"
+SERVICE_DROPPED = "servico_descartado"
+
+
+def _slot(x: str) -> int:
+    return int(x) if x.isdigit() else PLACEHOLDER_SLOT
+
+
+def _olt_ctx(f, ctx):
+    return {"slot": _slot(f[1]), "pon": int(f[2])}
+
+
+def _onu_ctx(f, ctx):
+    return {"slot": _slot(f[1]), "pon": int(f[2]), "onu_id": int(f[3])}
+
+
+def _vport_ctx(f, ctx):
+    return {"slot": _slot(f[1]), "pon": int(f[2]), "onu_id": int(f[3]), "vport": int(f[4])}
+
+
+def _key(ctx) -> Tuple[int, int, int]:
+    return ctx["slot"], ctx["pon"], ctx["onu_id"]
+
+
+_ONU_IF = r"gpon[_-]onu[_-]" + _PORT + r":(\d+)"
+
+GRAMMAR = Grammar([
+    # VLANs
+    Rule("vlan database", opens="vlan_database"),
+    Rule("vlan list", context="vlan_database", target="vlans", convert=to_vlans),
+    Rule("vlan", context="vlan_database", target="vlans", convert=to_vlans),
+    Rule("vlan", pattern=r"^vlan\s+(\d+)\s*$", opens="vlan", target="vlans", convert=lambda f, c: [int(f[0])]),
+    Rule("name", context="vlan", target="vlan_names", convert=lambda f, c: (c[0], " ".join(f))),
+    # PON / ONU
+    Rule("interface", pattern=r"^interface\s+gpon[_-]olt[_-]" + _PORT + r"\s*$", opens="gpon_olt", convert=_olt_ctx),
+    Rule("onu", pattern=r"^onu\s+(\d+)\s+type\s+(\S+)(?:\s+sn\s+(\S+))?", context="gpon_olt", target="onus",
+         convert=lambda f, c: ((c["slot"], c["pon"], int(f[0])), f[1], f[2] or "")),
+    Rule("discover-period", context="gpon_olt"),
+    Rule("interface", pattern=r"^interface\s+" + _ONU_IF + r"\s*$", opens="gpon_onu", convert=_onu_ctx),
+    Rule("description", context="gpon_onu", target="onu_desc", convert=lambda f, c: (_key(c), " ".join(f))),
+    Rule("name", context="gpon_onu", target="onu_desc", convert=lambda f, c: (_key(c), " ".join(f))),
+    Rule("sn-bind", context="gpon_onu"),
+    Rule("tcont", pattern=r"^tcont\s+(\d+)(?:\s+name\s+(\S+))?\s+profile\s+(\S+)", context="gpon_onu", target="onu_tcont",
+         convert=lambda f, c: (_key(c), f[2])),
+    Rule("gemport", context="gpon_onu"),
+    # C300: service-port dentro do gpon-onu
+    Rule("service-port", pattern=r"^service-port\s+(\d+)\s+vport\s+(\d+)\s+user-vlan\s+(\d+)\s+vlan\s+(\d+)", context="gpon_onu",
+         target="service_ports", convert=lambda f, c: (_key(c), int(f[1]), int(f[3]))),
+    # C600: interface vport-1/2/3.4:1
+    Rule("interface", pattern=r"^interface\s+vport-" + _PORT + r"\.(\d+):(\d+)\s*$", opens="vport", convert=_vport_ctx),
+    Rule("service-port", pattern=r"^service-port\s+(\d+)\s+user-vlan\s+(\d+)\s+vlan\s+(\d+)", context="vport",
+         target="service_ports", convert=lambda f, c: (_key(c), c["vport"], int(f[2]))),
+    Rule("pon-onu-mng", pattern=r"^pon-onu-mng\s+" + _ONU_IF + r"\s*$", opens="onu_mng", convert=_onu_ctx),
+    Rule("service", pattern=r"^service\s+(\d+)\s+gemport\s+(\d+)\s+vlan\s+(\d+)", context="onu_mng", target="mng_services",
+         convert=lambda f, c: (_key(c), int(f[0]), int(f[2]))),
+    Rule("vlan port", pattern=r"^vlan\s+port\s+eth_\d+/(\d+)\s+mode\s+(\S+)(?:\s+vlan\s+(\d+))?", context="onu_mng", target="mng_ports",
+         convert=lambda f, c: (_key(c), int(f[0]), f[1].lower(), int(f[2] or 0))),
+    Rule("wan-ip", pattern=r"^wan-ip\s+(\d+)\s+ipv4\s+mode\s+pppoe\s+username\s+(\S+)\s+password\s+(\S*)\s*vlan-profile\s+(\S+)", context="onu_mng",
+         target="mng_pppoe", convert=lambda f, c: (_key(c), int(f[0]), f[1], f[2], f[3])),
+    # Profiles (global ou dentro de 'gpon')
+    Rule("gpon", pattern=r"^gpon\s*$", opens="gpon"),
+    Rule("profile tcont", pattern=r"^profile\s+tcont\s+(\S+)\s+type\s+(\d+)(?:\s+assured\s+(\d+))?(?:\s+maximum\s+(\d+))?", target="tcont"),
+    Rule("profile tcont", pattern=r"^profile\s+tcont\s+(\S+)\s+type\s+(\d+)(?:\s+assured\s+(\d+))?(?:\s+maximum\s+(\d+))?", context="gpon", target="tcont"),
+    # Uplinks / IPs / rotas
+    Rule("interface", opens="interface", convert=to_ifname),
+    Rule("switchport vlan", context="interface", target="trunk_vlans", convert=lambda f, c: to_trunk_vlans(tuple(x for x in f if x.lower() != "tag"), c)),
+    Rule("switchport mode", context="interface"),
+    Rule("description", context="interface"),
+    Rule("no shutdown", context="interface"),
+    Rule("shutdown", context="interface"),
+    Rule("ip address", context="interface", target="interfaces", convert=to_ip),
+    Rule("ip route", target="routes", convert=to_route),
+], block_end=("$", "!", "exit", "end"))
+
+
 class ZTEAdapter(VendorAdapter):
     vendor_id = "zte"
     label = "ZTE (GPON - Wiki Adapter)"
     default_extension = ".txt"
+    signatures = (
+        (r"! generated by olt config migrator", 10), (r"interface gpon_olt-", 5), (r"interface gpon_onu-", 5),
+        (r"pon-onu-mng gpon_onu-", 5), (r"interface vport-", 4), (r"profile tcont ", 3),
+        (r"service-port \d+ user-vlan ", 3), (r"interface (?:x?gei|smartgroup)[-_]", 2),
+    )
+    grammar = GRAMMAR
 
     def parse_to_normalized(self, text: str) -> NormalizedConfig:
-        # As destino, usamos principalmente render; parse aqui é best-effort
+        # Como destino usamos principalmente render; o parse serve para ler de volta o running-config
+        return self.parse_lines(text.splitlines())
+
+    def parse_lines(self, lines: Iterable[str]) -> NormalizedConfig:
+        return self._assemble(GRAMMAR.run(lines))
+
+    def _assemble(self, res: ParseResult) -> NormalizedConfig:
         n = NormalizedConfig()
+        vids = set()
+        for vl in res.get("vlans"):
+            vids.update(vl)
+        names = dict(res.get("vlan_names"))
+
+        trunks: Dict[str, List[int]] = {}
+        for ifname, vl in res.get("trunk_vlans"):
+            trunks.setdefault(ifname, []).extend(vl)
+            vids.update(vl)
+        n.vlans = [Vlan(vid=v, name=names.get(v, "")) for v in sorted(vids)]
+        n.trunks = [Trunk(ifname=k, tagged_vlans=sorted(set(v))) for k, v in trunks.items() if k]
+        n.interfaces = [i for i in res.get("interfaces") if i.ifname and i.ip]
+        n.routes = [r for r in res.get("routes") if r.prefix and r.next_hop]
+
+        profiles: Dict[str, TcontProfile] = {}
+        for name, dba, assured, maxbw in res.get("tcont"):
+            profiles[name] = TcontProfile(name=name, dba_type=int(dba), assured_kbps=int(assured or 0), max_kbps=int(maxbw or 0))
+        n.tcont_profiles = list(profiles.values())
+
+        onus: Dict[Tuple[int, int, int], Onu] = {}
+        for key, ty, sn in res.get("onus"):
+            onus[key] = Onu(slot=key[0], pon=key[1], onu_id=key[2], sn=sn, onu_type=ty)
+        for key, desc in res.get("onu_desc"):
+            if key in onus:
+                onus[key].name = desc
+        for key, prof in res.get("onu_tcont"):
+            p = profiles.get(prof)
+            if key in onus and p:
+                onus[key].upstream_kbps = p.max_kbps
+                onus[key].upstream_assured = p.assured_kbps
+        n.onus = sorted(onus.values(), key=lambda o: (o.slot, o.pon, o.onu_id))
+
+        # Serviços: pon-onu-mng é a fonte principal; service-port cobre ONUs sem pon-onu-mng
+        services: Dict[Tuple[int, int, int, int], OnuService] = {}
+        for key, sid, vlan in res.get("mng_services"):
+            services[key + (sid,)] = OnuService(slot=key[0], pon=key[1], onu_id=key[2], svc_local_id=sid, vlan=vlan)
+        for key, vport, vlan in res.get("service_ports"):
+            services.setdefault(key + (vport,), OnuService(slot=key[0], pon=key[1], onu_id=key[2], svc_local_id=vport, vlan=vlan))
+        by_onu_vlan: Dict[Tuple[int, int, int, int], OnuService] = {}
+        for k, svc in services.items():
+            by_onu_vlan.setdefault(k[:3] + (svc.vlan,), svc)
+        for key, uni, mode, vlan in res.get("mng_ports"):
+            svc = by_onu_vlan.get(key + (vlan,))
+            if svc:
+                svc.uni_port = uni
+                svc.mode = mode
+        for key, sid, user, pw, vprof in res.get("mng_pppoe"):
+            svc = services.get(key + (sid,)) or (by_onu_vlan.get(key + (int(vprof),)) if vprof.isdigit() else None)
+            if svc:
+                svc.pppoe_user, svc.pppoe_pass = user, pw
+        n.services = sorted(services.values(), key=lambda s: (s.slot, s.pon, s.onu_id, s.svc_local_id))
         return n
 
     def schema(self) -> List[SectionSchema]:
@@ -78,26 +251,12 @@ class ZTEAdapter(VendorAdapter):
 
     def render(self, target_data: Dict[str, List[Dict[str, Any]]], fast: Dict[str, Any] | None = None) -> str:
         fast = fast or {}
-        frame = str(fast.get("frame","")).strip() or "[FRAME]"
-        slot = str(fast.get("slot","")).strip() or "[SLOT]"
-        pon_offset = int(fast.get("pon_offset", 0) or 0)
+        target_data = self.records(target_data)
         vlan_offset = int(fast.get("vlan_offset", 0) or 0)
         trunk_desc = str(fast.get("trunk_desc", "")).strip()
         trunk_no_shutdown = bool(fast.get("trunk_no_shutdown", True))
-        discover_enable = bool(fast.get("discover_enable", False))
-        discover_new = int(fast.get("discover_new_onu", 15) or 15)
-        discover_miss = int(fast.get("discover_miss_onu", 60) or 60)
-        tcont_name_bridge = str(fast.get("tcont_name_bridge", "BRIDGE")).strip() or "BRIDGE"
-        tcont_name_pppoe = str(fast.get("tcont_name_pppoe", "PPPOE")).strip() or "PPPOE"
-
-        def fmt_gpon_olt(pon: int) -> str:
-            return f"gpon_olt-{frame}/{slot}/{pon}"
-
-        def fmt_gpon_onu(pon: int, onu_id: int) -> str:
-            return f"gpon_onu-{frame}/{slot}/{pon}:{onu_id}"
-
-        def fmt_vport(pon: int, onu_id: int, svc: int) -> str:
-            return f"vport-{frame}/{slot}/{pon}.{onu_id}:{svc}"
+        # Modo otimizado: mesmo estado final, menos comandos (ranges, sem blocos redundantes)
+        optimized = bool(fast.get("optimized", False))
 
         out: List[str] = []
         out.append("! Generated by OLT Config Migrator (Turbo)")
@@ -106,28 +265,35 @@ class ZTEAdapter(VendorAdapter):
         # VLANs
         vlan_ids = []
         for v in target_data.get("vlans", []):
-            vid = int(v.get("vid",0) or 0)
+            vid = v["vid"]
             if vid:
                 vlan_ids.append(vid + vlan_offset)
         vlan_ids = _uniq_ints(vlan_ids)
 
+        def fmt_vlans(ids: List[int]) -> str:
+            if optimized:
+                return format_vlan_ranges(ids)
+            return ",".join(str(x) for x in ids)
+
         if vlan_ids:
             out.append("vlan database")
-            out.append(" vlan list " + ",".join(str(x) for x in vlan_ids))
+            out.append(" vlan list " + fmt_vlans(vlan_ids))
             out.append("$")
-            for vid in vlan_ids:
-                out.append(f"vlan {vid}")
-                out.append("$")
+            if not optimized:
+                # 'vlan list' já cria as VLANs; os blocos individuais são redundantes
+                for vid in vlan_ids:
+                    out.append(f"vlan {vid}")
+                    out.append("$")
             out.append("!")
 
         # Trunks (apply ALL or csv)
         trunks = target_data.get("trunks", [])
         apply_all = bool(fast.get("apply_all_vlans_to_trunks", True))
         for tr in trunks:
-            ifname = str(tr.get("ifname","")).strip()
+            ifname = tr["ifname"]
             if not ifname:
                 continue
-            tagged = str(tr.get("tagged","ALL")).strip().upper()
+            tagged = tr["tagged"].upper()
             out.append(f"interface {ifname}")
             if trunk_desc:
                 out.append(f" description {trunk_desc}")
@@ -136,7 +302,7 @@ class ZTEAdapter(VendorAdapter):
             out.append(" switchport mode trunk")
             if apply_all or tagged == "ALL":
                 if vlan_ids:
-                    out.append(" switchport vlan " + ",".join(str(x) for x in vlan_ids) + " tag")
+                    out.append(" switchport vlan " + fmt_vlans(vlan_ids) + " tag")
             else:
                 # parse csv into ints
                 ids=[]
@@ -146,26 +312,27 @@ class ZTEAdapter(VendorAdapter):
                         ids.append(int(p)+vlan_offset)
                 ids=_uniq_ints(ids)
                 if ids:
-                    out.append(" switchport vlan " + ",".join(str(x) for x in ids) + " tag")
+                    out.append(" switchport vlan " + fmt_vlans(ids) + " tag")
             out.append("$")
         if trunks:
             out.append("!")
 
         # TCONT profiles
         for p in target_data.get("tcont_profiles", []):
-            name = str(p.get("name","")).strip() or "U1024000K_A640"
-            dba_type = int(p.get("dba_type", 3) or 3)
-            assured = int(p.get("assured_kbps", 0) or 0)
-            maxbw = int(p.get("max_kbps", 0) or 0)
+            name = p["name"] or "U1024000K_A640"
+            dba_type = p["dba_type"] or 3
+            assured = p["assured_kbps"]
+            maxbw = p["max_kbps"]
             out.append(f"profile tcont {name} type {dba_type} assured {assured} maximum {maxbw}")
+            if not optimized:
+                out.append("$")
+        if optimized and target_data.get("tcont_profiles"):
             out.append("$")
         out.append("!")
 
         # IP interfaces
         for itf in target_data.get("interfaces", []):
-            ifname = str(itf.get("ifname","")).strip()
-            ip = str(itf.get("ip","")).strip()
-            mask = str(itf.get("prefix_or_mask","")).strip()
+            ifname, ip, mask = itf["ifname"], itf["ip"], itf["prefix_or_mask"]
             if not ifname or not ip:
                 continue
             out.append(f"interface {ifname}")
@@ -181,36 +348,79 @@ class ZTEAdapter(VendorAdapter):
             out.append("!")
 
         for r in target_data.get("routes", []):
-            prefix = str(r.get("prefix","")).strip()
-            nh = str(r.get("next_hop","")).strip()
+            prefix, nh = r["prefix"], r["next_hop"]
             if prefix and nh:
                 out.append(f"ip route {prefix} {nh}")
         if target_data.get("routes"):
             out.append("!")
 
+        self._render_onus(out, target_data, fast)
+        out.append("!")
+        if optimized:
+            # separadores '!' são só comentário: o cabeçalho fica, o resto sai
+            out = out[:2] + _merge_adjacent_contexts([x for x in out[2:] if x != "!"])
+        return "\n".join(out)
+
+    def check_target(self, target_data: Dict[str, List[Dict[str, Any]]], fast: Dict[str, Any] | None = None) -> List[RemapIssue]:
+        """ONUs/services _render_onus drops for a non-positive slot, PON (after pon_offset) or ONU id."""
+        pon_offset = int((fast or {}).get("pon_offset", 0) or 0)
+        issues: List[RemapIssue] = []
+        for o in target_data.get("onus", []) or []:
+            if o["pon"] + pon_offset <= 0 or o["onu_id"] <= 0:
+                issues.append(RemapIssue(ONU_DROPPED, f"ONU {o['slot']}/{o['pon']}:{o['onu_id']} ({o['sn'] or 'sem SN'}) "
+                                                      f"fora do script: PON/ONU inválidos"))
+        for v in target_data.get("services", []) or []:
+            if v["slot"] <= 0 or v["pon"] + pon_offset <= 0 or v["onu_id"] <= 0:
+                issues.append(RemapIssue(SERVICE_DROPPED, f"serviço {v['svc_local_id']} da ONU {v['slot']}/{v['pon']}:"
+                                                          f"{v['onu_id']} fora do script: slot/PON/ONU inválidos"))
+        return issues
+
+    def _render_onus(self, out: List[str], target_data: Dict[str, List[Dict[str, Any]]], fast: Dict[str, Any], create: bool = True) -> None:
+        """gpon_olt 'onu' lines plus per-ONU gpon_onu/vport/pon-onu-mng blocks.
+
+        create=False skips the gpon_olt 'onu' lines (ONU already exists; used by render_delta).
+        """
+        target_data = self.records(target_data)
+        frame = str(fast.get("frame","")).strip() or "[FRAME]"
+        slot = str(fast.get("slot","")).strip() or "[SLOT]"
+        pon_offset = int(fast.get("pon_offset", 0) or 0)
+        vlan_offset = int(fast.get("vlan_offset", 0) or 0)
+        discover_enable = bool(fast.get("discover_enable", False))
+        discover_new = int(fast.get("discover_new_onu", 15) or 15)
+        discover_miss = int(fast.get("discover_miss_onu", 60) or 60)
+        tcont_name_bridge = str(fast.get("tcont_name_bridge", "BRIDGE")).strip() or "BRIDGE"
+        tcont_name_pppoe = str(fast.get("tcont_name_pppoe", "PPPOE")).strip() or "PPPOE"
+
+        def fmt_gpon_olt(pon: int) -> str:
+            return f"gpon_olt-{frame}/{slot}/{pon}"
+
+        def fmt_gpon_onu(pon: int, onu_id: int) -> str:
+            return f"gpon_onu-{frame}/{slot}/{pon}:{onu_id}"
+
+        def fmt_vport(pon: int, onu_id: int, svc: int) -> str:
+            return f"vport-{frame}/{slot}/{pon}.{onu_id}:{svc}"
+
         # Build ONU map for bandwidth->tcont profile
         # choose profile by matching max/assured if possible, else first
         profiles = target_data.get("tcont_profiles", []) or [{"name":"U1024000K_A640","assured_kbps":640,"max_kbps":1024000}]
+        by_bw: Dict[Tuple[int, int], str] = {}
+        for p in reversed(profiles):
+            by_bw[(p["max_kbps"], p["assured_kbps"])] = p["name"]
+        first_profile = profiles[0]["name"]
         def pick_profile(up_kbps:int, assured:int) -> str:
-            for p in profiles:
-                if int(p.get("max_kbps",0) or 0)==up_kbps and int(p.get("assured_kbps",0) or 0)==assured:
-                    return str(p.get("name"))
-            return str(profiles[0].get("name"))
+            return by_bw.get((up_kbps, assured), first_profile)
 
         # Group services by ONU
         services_by_onu: Dict[Tuple[int,int,int], List[Dict[str, Any]]] = {}
         for s in target_data.get("services", []):
-            sl=int(s.get("slot",0) or 0)
-            pon=int(s.get("pon",0) or 0)+pon_offset
-            onu=int(s.get("onu_id",0) or 0)
+            sl=s["slot"]
+            pon=s["pon"]+pon_offset
+            onu=s["onu_id"]
             if sl<=0 or pon<=0 or onu<=0:
                 continue
-            s2=dict(s)
-            s2["pon"]=pon
-            s2["vlan"]=int(s2.get("vlan",0) or 0)+vlan_offset
-            services_by_onu.setdefault((sl,pon,onu), []).append(s2)
+            services_by_onu.setdefault((sl,pon,onu), []).append(s)
         for k in services_by_onu:
-            services_by_onu[k].sort(key=lambda x: int(x.get("svc_local_id",1) or 1))
+            services_by_onu[k].sort(key=lambda x: x["svc_local_id"] or 1)
 
         # ONUs render: create on gpon_olt + per onu blocks
         # First: gpon_olt blocks per PON
@@ -218,18 +428,18 @@ class ZTEAdapter(VendorAdapter):
         # group by pon
         onus_by_pon: Dict[int, List[Dict[str, Any]]] = {}
         for o in onus:
-            pon=int(o.get("pon",0) or 0)+pon_offset
-            onu_id=int(o.get("onu_id",0) or 0)
-            sn=str(o.get("sn","")).strip()
-            ty=str(o.get("onu_type","")).strip() or "unknown"
-            name=str(o.get("name","")).strip()
-            up=int(o.get("upstream_kbps",0) or 0)
-            assured=int(o.get("upstream_assured",0) or 0)
+            pon=o["pon"]+pon_offset
+            onu_id=o["onu_id"]
+            sn=o["sn"]
+            ty=o["onu_type"] or "unknown"
+            name=o["name"]
+            up=o["upstream_kbps"]
+            assured=o["upstream_assured"]
             if pon<=0 or onu_id<=0:
                 continue
-            o2={"pon":pon,"onu_id":onu_id,"sn":sn,"onu_type":ty,"name":name,"up":up,"assured":assured}
+            o2={"slot":o["slot"],"pon":pon,"onu_id":onu_id,"sn":sn,"onu_type":ty,"name":name,"up":up,"assured":assured}
             onus_by_pon.setdefault(pon, []).append(o2)
-        for pon in sorted(onus_by_pon):
+        for pon in sorted(onus_by_pon) if create else ():
             out.append(f"interface {fmt_gpon_olt(pon)}")
             for o in sorted(onus_by_pon[pon], key=lambda x: x["onu_id"]):
                 # In ZTE, "onu <id> type <type> sn <sn>"
@@ -240,7 +450,7 @@ class ZTEAdapter(VendorAdapter):
             if discover_enable:
                 out.append(f" discover-period new-onu {discover_new} miss-onu {discover_miss}")
             out.append("$")
-        if onus_by_pon:
+        if onus_by_pon and create:
             out.append("!")
 
         # Per ONU detailed blocks
@@ -253,10 +463,10 @@ class ZTEAdapter(VendorAdapter):
                     out.append(f" description {o['name']}")
                 if o["sn"]:
                     out.append(f" sn-bind enable sn {o['sn']}")
-                prof = pick_profile(o["up"], o["assured"]) if o["up"] else str(profiles[0].get("name"))
+                prof = pick_profile(o["up"], o["assured"]) if o["up"] else first_profile
                 # Serviços por ONU (sempre por ONU)
-                svc_list = services_by_onu.get((1, pon, onu_id), []) or services_by_onu.get((0, pon, onu_id), []) or []
-                has_pppoe = any(str(x.get("pppoe_user","")).strip() for x in svc_list)
+                svc_list = services_by_onu.get((o["slot"], pon, onu_id), [])
+                has_pppoe = any(x["pppoe_user"] for x in svc_list)
                 tcont_name = tcont_name_pppoe if has_pppoe else tcont_name_bridge
                 # TCONT 1
                 out.append(f" tcont 1 name {tcont_name} profile {prof}")
@@ -265,15 +475,14 @@ class ZTEAdapter(VendorAdapter):
                     out.append(" gemport 1 tcont 1")
                 else:
                     for s in svc_list:
-                        sid=int(s.get("svc_local_id",1) or 1)
-                        out.append(f" gemport {sid} tcont 1")
+                        out.append(f" gemport {s['svc_local_id'] or 1} tcont 1")
                 out.append("$")
 
                 # vport + service-port
                 if svc_list:
                     for s in svc_list:
-                        sid=int(s.get("svc_local_id",1) or 1)
-                        vlan=int(s.get("vlan",0) or 0)
+                        sid=s["svc_local_id"] or 1
+                        vlan=s["vlan"]+vlan_offset
                         if vlan<=0:
                             continue
                         out.append(f"interface {fmt_vport(pon, onu_id, sid)}")
@@ -284,12 +493,12 @@ class ZTEAdapter(VendorAdapter):
                 if svc_list:
                     out.append(f"pon-onu-mng {onu_if}")
                     for s in svc_list:
-                        sid=int(s.get("svc_local_id",1) or 1)
-                        vlan=int(s.get("vlan",0) or 0)
-                        uni=int(s.get("uni_port",1) or 1)
-                        mode=str(s.get("mode","tag")).strip().lower()
-                        user=str(s.get("pppoe_user","")).strip()
-                        pw=str(s.get("pppoe_pass","")).strip()
+                        sid=s["svc_local_id"] or 1
+                        vlan=s["vlan"]+vlan_offset
+                        uni=s["uni_port"] or 1
+                        mode=s["mode"].lower()
+                        user=s["pppoe_user"]
+                        pw=s["pppoe_pass"]
                         if vlan<=0:
                             continue
                         out.append(f" service {sid} gemport {sid} vlan {vlan}")
@@ -302,5 +511,130 @@ class ZTEAdapter(VendorAdapter):
                         if user:
                             out.append(f" wan-ip {sid} ipv4 mode pppoe username {user} password {pw} vlan-profile {vlan} host 1")
                     out.append("$")
+
+    def render_delta(self, old: NormalizedConfig, new: NormalizedConfig, fast: Dict[str, Any] | None = None) -> str:
+        """Incremental script from `old` to `new`: only added/removed/changed entities.
+
+        ONUs whose SN or type changed are recreated ('no onu' + full block); ONUs
+        with other changes (name, banda, serviços) get their per-ONU blocks re-sent
+        after the removed/changed services are deleted. Output size follows the
+        size of the diff, not of the OLT.
+        """
+        fast = fast or {}
+        frame = str(fast.get("frame","")).strip() or "[FRAME]"
+        slot = str(fast.get("slot","")).strip() or "[SLOT]"
+        pon_offset = int(fast.get("pon_offset", 0) or 0)
+        vlan_offset = int(fast.get("vlan_offset", 0) or 0)
+        optimized = bool(fast.get("optimized", False))
+        d = diff_normalized(old, new)
+
+        def fmt_vlans(ids: List[int]) -> str:
+            return format_vlan_ranges(ids) if optimized else ",".join(str(x) for x in ids)
+
+        def zte_vlans(n: NormalizedConfig) -> set:
+            # mesmas VLANs que from_normalized cria (declaradas + usadas em serviços)
+            return set(_uniq_ints([v.vid for v in n.vlans] + [s.vlan for s in n.services]))
+
+        old_v, new_v = zte_vlans(old), zte_vlans(new)
+        add_v = [v + vlan_offset for v in sorted(new_v - old_v)]
+        del_v = [v + vlan_offset for v in sorted(old_v - new_v)]
+        all_v = [v + vlan_offset for v in sorted(new_v)]
+
+        out: List[str] = ["! Delta generated by OLT Config Migrator (Turbo)", "!"]
+
+        # 1) criações de infraestrutura (antes das ONUs que dependem delas)
+        if add_v:
+            out += ["vlan database", " vlan list " + fmt_vlans(add_v), "$", "!"]
+        old_trunks = {t.ifname for t in old.trunks}
+        for t in new.trunks:
+            ifname = t.ifname.strip()
+            vl = add_v if ifname in old_trunks else all_v
+            if ifname and vl:
+                out += [f"interface {ifname}", " switchport mode trunk", " switchport vlan " + fmt_vlans(vl) + " tag", "$"]
+        for p in d["tcont_profiles"].added + [n for _, n in d["tcont_profiles"].changed]:
+            out.append(f"profile tcont {p.name} type {p.dba_type} assured {p.assured_kbps} maximum {p.max_kbps}")
+            out.append("$")
+        for i in d["interfaces"].added + [n for _, n in d["interfaces"].changed]:
+            if i.ifname and i.ip:
+                mask = i.prefix_or_mask.strip()
+                addr = f"{i.ip}{mask}" if mask.startswith("/") else f"{i.ip} {mask}".strip()
+                out += [f"interface {i.ifname}", f" ip address {addr}", "$"]
+        for r in d["routes"].added:
+            out.append(f"ip route {r.prefix} {r.next_hop}")
         out.append("!")
+
+        # 2) ONUs: remoções e recriações (SN/tipo mudou)
+        recreate = {(n.slot, n.pon, n.onu_id) for o, n in d["onus"].changed if (o.sn, o.onu_type) != (n.sn, n.onu_type)}
+        drop: Dict[int, List[int]] = {}
+        for o in d["onus"].removed:
+            drop.setdefault(o.pon + pon_offset, []).append(o.onu_id)
+        for sl, pon, onu_id in recreate:
+            drop.setdefault(pon + pon_offset, []).append(onu_id)
+        for pon in sorted(drop):
+            out.append(f"interface gpon_olt-{frame}/{slot}/{pon}")
+            out += [f" no onu {x}" for x in sorted(drop[pon])]
+            out.append("$")
+
+        # serviços removidos/alterados de ONUs que continuam: desfaz na ordem inversa da criação
+        gone = {(o.slot, o.pon, o.onu_id) for o in d["onus"].removed} | recreate
+        touched = {(n.slot, n.pon, n.onu_id) for o, n in d["onus"].changed} - recreate
+        undo = [s for s in d["services"].removed] + [o for o, _ in d["services"].changed]
+        for s in sorted(undo, key=lambda x: (x.pon, x.onu_id, x.svc_local_id)):
+            key = (s.slot, s.pon, s.onu_id)
+            if key in gone:
+                continue
+            touched.add(key)
+            pon, sid = s.pon + pon_offset, s.svc_local_id
+            onu_if = f"gpon_onu-{frame}/{slot}/{pon}:{s.onu_id}"
+            out += [f"interface vport-{frame}/{slot}/{pon}.{s.onu_id}:{sid}", f" no service-port {sid}", "$"]
+            out.append(f"pon-onu-mng {onu_if}")
+            if s.pppoe_user:
+                out.append(f" no wan-ip {sid}")
+            out += [f" no service {sid}", "$"]
+            out += [f"interface {onu_if}", f" no gemport {sid}", "$"]
+        touched.update((n.slot, n.pon, n.onu_id) for n in d["services"].added)
+        touched.update((n.slot, n.pon, n.onu_id) for _, n in d["services"].changed)
+        touched -= gone | {(o.slot, o.pon, o.onu_id) for o in d["onus"].added}
+        if drop or undo:
+            out.append("!")
+
+        # 3) ONUs novas/recriadas (bloco completo) e alteradas (blocos por ONU, sem recriar)
+        create = {(o.slot, o.pon, o.onu_id) for o in d["onus"].added} | recreate
+        for keys, is_new in ((create, True), (touched, False)):
+            if not keys:
+                continue
+            sub = NormalizedConfig(
+                tcont_profiles=new.tcont_profiles,
+                onus=[o for o in new.onus if (o.slot, o.pon, o.onu_id) in keys],
+                services=[s for s in new.services if (s.slot, s.pon, s.onu_id) in keys],
+            )
+            self._render_onus(out, self.from_normalized(sub), fast, create=is_new)
+
+        # 4) limpeza do que não é mais usado
+        for r in d["routes"].removed:
+            out.append(f"no ip route {r.prefix} {r.next_hop}")
+        for i in d["interfaces"].removed:
+            out += [f"interface {i.ifname}", " no ip address", "$"]
+        if del_v:
+            for t in new.trunks:
+                if t.ifname.strip() in old_trunks:
+                    out += [f"interface {t.ifname.strip()}", " no switchport vlan " + fmt_vlans(del_v) + " tag", "$"]
+            out += ["vlan database", " no vlan list " + fmt_vlans(del_v), "$"]
+        for p in d["tcont_profiles"].removed:
+            out.append(f"no profile tcont {p.name}")
+        out.append("!")
+        if optimized:
+            out = out[:2] + _merge_adjacent_contexts([x for x in out[2:] if x != "!"])
         return "\n".join(out)
+
+    def compare_render_modes(self, target_data: Dict[str, List[Dict[str, Any]]], fast: Dict[str, Any] | None = None,
+                             optimized_stats: Dict[str, int] | None = None) -> Dict[str, Dict[str, int]]:
+        """Render verbose and optimized scripts and report commands/bytes saved by the optimized one.
+
+        Pass `optimized_stats` (script_stats of an optimized render already done) to render only the verbose one.
+        """
+        fast = dict(fast or {})
+        verbose = script_stats(self.render(target_data, {**fast, "optimized": False}))
+        optimized = optimized_stats or script_stats(self.render(target_data, {**fast, "optimized": True}))
+        saved = {k: verbose[k] - optimized[k] for k in verbose}
+        return {"verbose": verbose, "optimized": optimized, "saved": saved}
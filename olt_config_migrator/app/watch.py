@@ -0,0 +1,354 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import signal
+import tempfile
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .batch import build_target_data, output_name
+from .detect import AUTO, sniff
+from .exchange import write_ndjson
+from .models import NormalizedConfig
+from .perf import span
+from .sources import iter_sources, source_names
+from .vendors.registry import get_registry
+
+# Pasta vigiada: cada backup novo ou alterado vira script de destino, sem abrir o wizard.
+# Por varredura periódica (os.scandir), sem dependência de inotify; três filtros em cascata:
+#   1. (mtime, tamanho) iguais ao último ciclo -> nem abre o arquivo
+#   2. sha256 do conteúdo e configurações (destino/fast/opções) iguais ao último processado,
+#      com todos os scripts de saída presentes -> só atualiza o estado
+#   3. hash do NormalizedConfig (+ destino/opções) igual -> parseia, mas não re-renderiza
+# Parse/render rodam num pool de processos com no máximo `workers` arquivos ao mesmo tempo e,
+# como no serviço, até `workers + queue` enviados ao pool; o resto espera a próxima varredura.
+# O estado (hashes) e o status (latência por arquivo) ficam em JSON na pasta de saída.
+
+STATE_FILE = ".watch-state.json"
+STATUS_FILE = "watch-status.json"
+# arquivo ainda sendo gravado pelo coletor: espera ficar parado esse tempo
+SETTLE_SECONDS = 2.0
+IGNORED_SUFFIXES = (".tmp", ".part", ".partial", ".swp", "~")
+HASH_CHUNK = 1 << 20
+
+# resultados de um arquivo
+RENDERED = "gerado"
+SAME_CONTENT = "arquivo_igual"
+SAME_CONFIG = "config_igual"
+FAILED = "erro"
+
+
+@dataclass
+class WatchJob:
+    path: str
+    sha256: str
+    fingerprints: Dict[str, str]  # membro -> hash do normalizado no último processamento
+    detected: float               # time.time() em que a mudança foi vista
+
+
+@dataclass
+class FileStatus:
+    path: str
+    result: str = ""
+    outputs: List[str] = field(default_factory=list)
+    members: int = 0
+    onus: int = 0
+    services: int = 0
+    parse_ms: float = 0.0
+    render_ms: float = 0.0
+    latency_ms: float = 0.0     # da detecção da mudança até o script gravado
+    finished: float = 0.0
+    error: str = ""
+    sha256: str = ""
+    settings: str = ""          # render_settings() do processamento
+    fingerprints: Dict[str, str] = field(default_factory=dict)
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class _HashWriter:
+    """Text sink that only feeds a sha256 (write_ndjson without keeping the text)."""
+
+    def __init__(self, salt: str):
+        self.h = hashlib.sha256(salt.encode("utf-8"))
+
+    def write(self, s: str) -> int:
+        self.h.update(s.encode("utf-8"))
+        return len(s)
+
+
+def normalized_fingerprint(n: NormalizedConfig, salt: str = "") -> str:
+    """sha256 of the NDJSON form of `n`; `salt` folds in the render settings."""
+    w = _HashWriter(salt)
+    write_ndjson(n, w)
+    return w.h.hexdigest()
+
+
+def render_settings(dst: str, fast: Dict[str, Any], options: Optional[Dict[str, bool]]) -> str:
+    """Canonical text of what, besides the backup, decides the scripts (salt of the fingerprints)."""
+    return json.dumps([dst, fast, options], sort_keys=True, default=str)
+
+
+def _write_atomic(path: str, text: str) -> None:
+    # temporário único na mesma pasta: dois workers nunca gravam o mesmo .tmp
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def planned_outputs(path: str, dst: str, out_dir: str) -> List[str]:
+    """Scripts process_file() writes for `path` (zip members listed without reading them)."""
+    try:
+        names = source_names(path)
+    except Exception:
+        return []  # zip corrompido etc.: o erro aparece no process_file
+    return [os.path.join(out_dir, output_name(n, dst, path)) for n in names]
+
+
+def process_file(job: WatchJob, src: str, dst: str, out_dir: str, fast: Dict[str, Any],
+                 options: Optional[Dict[str, bool]]) -> FileStatus:
+    """Parse one backup and render the members whose normalized content changed.
+
+    Module-level so the pool's worker processes can run it.
+    """
+    salt = render_settings(dst, fast, options)
+    st = FileStatus(job.path, sha256=job.sha256, settings=hashlib.sha256(salt.encode("utf-8")).hexdigest())
+    reg = get_registry()
+    rendered = False
+    try:
+        for name, lines in iter_sources(job.path):
+            t0 = time.perf_counter()
+            vendor = src
+            if vendor == AUTO:
+                ranking, lines = sniff(lines)
+                if not ranking:
+                    raise ValueError(f"{name}: fabricante de origem não identificado")
+                vendor = ranking[0][0]
+            normalized = reg[vendor].parse_lines(lines)
+            fp = normalized_fingerprint(normalized, salt)
+            t1 = time.perf_counter()
+            st.parse_ms += (t1 - t0) * 1000
+            st.members += 1
+            st.onus += len(normalized.onus)
+            st.services += len(normalized.services)
+            st.fingerprints[name] = fp
+            out = os.path.join(out_dir, output_name(name, dst, job.path))
+            st.outputs.append(out)
+            if job.fingerprints.get(name) == fp and os.path.exists(out):
+                continue
+            target_data = build_target_data(dst, normalized, fast, options)
+            _write_atomic(out, reg[dst].render(target_data, fast))
+            st.render_ms += (time.perf_counter() - t1) * 1000
+            rendered = True
+        st.result = RENDERED if rendered else SAME_CONFIG
+    except Exception as e:
+        st.result = FAILED
+        st.error = f"{type(e).__name__}: {e}"
+    st.finished = time.time()
+    st.latency_ms = (st.finished - job.detected) * 1000
+    return st
+
+
+def _worker_init() -> None:
+    # Ctrl+C é tratado só no processo principal, que espera os arquivos em andamento
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+class FolderWatcher:
+    """Polls `folders` and keeps `out_dir` in sync with the backups found there."""
+
+    def __init__(self, folders: List[str], src: str, dst: str, out_dir: str, fast: Optional[Dict[str, Any]] = None,
+                 options: Optional[Dict[str, bool]] = None, workers: int = 2, queue: int = 8,
+                 interval: float = 30.0, settle: float = SETTLE_SECONDS, log: Callable[[str], None] = print):
+        out_real = os.path.realpath(out_dir)
+        same = [f for f in folders if os.path.realpath(f) == out_real]
+        if same:
+            # a varredura leria os próprios scripts como backups (a_zte.txt -> a_zte_zte.txt ...)
+            raise ValueError(f"a pasta de saída não pode ser uma pasta vigiada: {', '.join(same)}")
+        self.folders = folders
+        self.src, self.dst, self.out_dir = src, dst, out_dir
+        self.fast, self.options = fast or {}, options
+        self.settings = hashlib.sha256(render_settings(dst, self.fast, options).encode("utf-8")).hexdigest()
+        self.workers = max(1, workers)
+        self.max_pending = self.workers + max(0, queue)
+        self.interval = interval
+        self.settle = settle
+        self.log = log
+        self.seen: Dict[str, Tuple[int, int]] = {}        # path -> (mtime_ns, tamanho) do último ciclo
+        self.owners: Dict[str, str] = {}                   # script de saída -> backup que o gera
+        self.status: Dict[str, FileStatus] = {}
+        self.running: Dict[str, Future] = {}
+        self.deferred = 0                                  # arquivos da última varredura deixados para depois
+        self.polls = 0
+        self.started = time.time()
+        os.makedirs(out_dir, exist_ok=True)
+        self._load_state()
+
+    # -- estado persistido ---------------------------------------------------
+
+    def _load_state(self) -> None:
+        try:
+            with open(os.path.join(self.out_dir, STATE_FILE), encoding="utf-8") as f:
+                raw = json.load(f)
+        except (OSError, ValueError):
+            return
+        for path, d in raw.get("files", {}).items():
+            self.status[path] = FileStatus(**d)
+            for out in self.status[path].outputs:
+                self.owners.setdefault(out, path)
+
+    def _save(self) -> None:
+        files = {p: asdict(s) for p, s in self.status.items()}
+        _write_atomic(os.path.join(self.out_dir, STATE_FILE), json.dumps({"files": files}, ensure_ascii=False))
+        public = {p: {k: v for k, v in d.items() if k not in ("sha256", "settings", "fingerprints")} for p, d in files.items()}
+        done = [s.latency_ms for s in self.status.values() if s.result in (RENDERED, SAME_CONFIG)]
+        summary = {
+            "started": self.started, "updated": time.time(), "polls": self.polls,
+            "folders": self.folders, "dst": self.dst, "workers": self.workers,
+            "running": sorted(self.running), "files": public,
+            "latency_ms_max": max(done, default=0.0),
+        }
+        _write_atomic(os.path.join(self.out_dir, STATUS_FILE), json.dumps(summary, ensure_ascii=False, indent=1))
+
+    # -- varredura -------------------------------------------------------------
+
+    def scan(self) -> List[str]:
+        """Files that look new or modified since the last poll (and stopped growing)."""
+        now = time.time()
+        changed = []
+        for folder in self.folders:
+            try:
+                entries = list(os.scandir(folder))
+            except OSError as e:
+                self.log(f"{folder}: {e}")
+                continue
+            for e in sorted(entries, key=lambda x: x.name):  # ordem fixa: o primeiro de dois nomes iguais ganha
+                if e.name.startswith(".") or e.name.endswith(IGNORED_SUFFIXES) or not e.is_file():
+                    continue
+                if e.name == STATUS_FILE or e.path in self.owners:
+                    continue  # arquivos gerados por este watcher (pasta de saída dentro da vigiada)
+                stat = e.stat()
+                if now - stat.st_mtime < self.settle:
+                    continue
+                sig = (stat.st_mtime_ns, stat.st_size)
+                if self.seen.get(e.path) != sig:
+                    self.seen[e.path] = sig
+                    changed.append(e.path)
+        return changed
+
+    def poll(self, pool: ProcessPoolExecutor) -> int:
+        """One scan: hash changed files and submit the ones with new content; returns jobs submitted."""
+        self.polls += 1
+        submitted = 0
+        self.deferred = 0
+        with span("watch.poll", folders=len(self.folders)):
+            for path in self.scan():
+                if path in self.running or len(self.running) >= self.max_pending:
+                    self.seen.pop(path, None)  # volta no próximo ciclo
+                    self.deferred += path not in self.running
+                    continue
+                detected = time.time()
+                try:
+                    digest = file_sha256(path)
+                except OSError as e:
+                    self.log(f"{path}: {e}")
+                    continue
+                prev = self.status.get(path)
+                if self._unchanged(prev, digest):
+                    prev.result = SAME_CONTENT
+                    continue
+                clash = self._claim(path)
+                if clash:
+                    self.status[path] = FileStatus(path, result=FAILED, error=clash, sha256=digest, finished=time.time())
+                    self.log(f"{os.path.basename(path)}: ERRO {clash}")
+                    continue
+                job = WatchJob(path, digest, dict(prev.fingerprints) if prev else {}, detected)
+                self.running[path] = pool.submit(process_file, job, self.src, self.dst, self.out_dir,
+                                                 self.fast, self.options)
+                submitted += 1
+        if self.deferred:
+            self.log(f"fila cheia ({self.max_pending}): {self.deferred} arquivos ficam para a próxima varredura")
+        return submitted
+
+    def _unchanged(self, prev: Optional[FileStatus], digest: str) -> bool:
+        """Same content, rendered with the same settings, and every script still on disk."""
+        if prev is None or prev.result == FAILED or prev.sha256 != digest or prev.settings != self.settings:
+            return False
+        outs = planned_outputs(prev.path, self.dst, self.out_dir)
+        return bool(outs) and all(os.path.exists(o) for o in outs)
+
+    def _claim(self, path: str) -> str:
+        """Reserve the outputs of `path`; error text if another backup still present already writes one.
+
+        Ex.: 'a.txt' e 'a.txt.gz' dariam os dois a_zte.txt; o primeiro visto fica com o nome.
+        """
+        outs = planned_outputs(path, self.dst, self.out_dir)
+        for out in outs:
+            owner = self.owners.get(out)
+            if owner is not None and owner != path and os.path.exists(owner):
+                return f"a saída {os.path.basename(out)} já é gerada a partir de {owner} (renomeie um dos arquivos)"
+        for out in [o for o, p in self.owners.items() if p == path and o not in outs]:
+            del self.owners[out]
+        for out in outs:
+            self.owners[out] = path
+        return ""
+
+    def collect(self, wait: bool = False) -> int:
+        """Record finished jobs (all of them when `wait`); returns how many finished."""
+        done = 0
+        for path, fut in list(self.running.items()):
+            if not wait and not fut.done():
+                continue
+            st = fut.result()
+            del self.running[path]
+            self.status[path] = st
+            done += 1
+            if st.result == FAILED:
+                self.log(f"{os.path.basename(path)}: ERRO {st.error}")
+            else:
+                what = "gerado" if st.result == RENDERED else "normalizado igual, script mantido"
+                self.log(f"{os.path.basename(path)}: {st.onus} ONUs, {st.services} serviços -> {what} "
+                         f"({st.latency_ms:.0f} ms)")
+        return done
+
+    def run(self, once: bool = False) -> None:
+        """Poll until interrupted (Ctrl+C); `once` does a single pass and waits for it."""
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_worker_init) as pool:
+            try:
+                while True:
+                    self.poll(pool)
+                    if once:
+                        self.collect(wait=True)
+                        if self.deferred:
+                            continue  # fila cheia: a mesma passada segue com os que ficaram
+                        self._save()
+                        return
+                    deadline = time.monotonic() + self.interval
+                    while time.monotonic() < deadline:
+                        if self.collect():
+                            if self.deferred:
+                                self.poll(pool)  # abriu vaga: não espera o intervalo inteiro
+                            self._save()
+                        time.sleep(min(1.0, self.interval))
+                    self._save()
+            except KeyboardInterrupt:
+                self.log("parando: aguardando os arquivos em andamento")
+                self.collect(wait=True)
+                self._save()
@@ -1,14 +1,19 @@
 from __future__ import annotations
 from typing import Any, Dict, List
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableView, QAbstractItemView
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QKeySequence, QShortcut
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableView, QAbstractItemView,
+                             QApplication, QFileDialog, QMessageBox)
 from .models import SectionSchema
-from .table_models import SectionTableModel
+from .table_import import FILE_FILTER as TABLE_FILTER, natural_key, plan_import_file
+from .table_models import PagedSectionTableModel, SectionTableModel
 
 class SectionEditor(QWidget):
-    def __init__(self, schema: SectionSchema, rows: List[Dict[str, Any]]):
+    def __init__(self, schema: SectionSchema, rows: List[Dict[str, Any]], store=None):
         super().__init__()
         self.schema = schema
-        self.model = SectionTableModel(schema, rows)
+        # com projeto aberto as linhas ficam no SQLite e são lidas por página
+        self.model = PagedSectionTableModel(schema, store) if store is not None else SectionTableModel(schema, rows)
 
         root = QVBoxLayout(self)
         if schema.description:
@@ -30,13 +35,58 @@ class SectionEditor(QWidget):
         self.btn_add.setObjectName("Primary")
         self.btn_del = QPushButton("Remover selecionados")
         self.btn_del.setObjectName("Danger")
+        self.btn_import = QPushButton("Importar CSV…")
+        self.btn_import.setToolTip("Atualiza/inclui linhas a partir de uma planilha CSV/TSV "
+                                   f"(chave: {', '.join(natural_key(schema))})")
+        self.btn_undo = QPushButton("Desfazer")
+        self.btn_redo = QPushButton("Refazer")
         bar.addWidget(self.btn_add)
         bar.addWidget(self.btn_del)
+        bar.addWidget(self.btn_import)
         bar.addStretch(1)
+        bar.addWidget(self.btn_undo)
+        bar.addWidget(self.btn_redo)
         root.addLayout(bar)
 
         self.btn_add.clicked.connect(self.model.add_row)
         self.btn_del.clicked.connect(self._remove_selected)
+        self.btn_import.clicked.connect(self._import_table)
+        self.btn_undo.clicked.connect(self.model.undo_last)
+        self.btn_redo.clicked.connect(self.model.redo_last)
+        for keys, slot in ((QKeySequence.StandardKey.Undo, self.model.undo_last),
+                           (QKeySequence.StandardKey.Redo, self.model.redo_last)):
+            sc = QShortcut(QKeySequence(keys), self)
+            sc.setContext(Qt.ShortcutContext.WidgetWithChildrenShortcut)
+            sc.activated.connect(slot)
+        self.model.dataChangedSignal.connect(self._update_undo)
+        self._update_undo()
+
+    def _update_undo(self):
+        u = self.model.undo
+        self.btn_undo.setEnabled(u.can_undo())
+        self.btn_redo.setEnabled(u.can_redo())
+        self.btn_undo.setToolTip(f"Desfazer: {u.undo_label()} (Ctrl+Z)" if u.can_undo() else "")
+        self.btn_redo.setToolTip(f"Refazer: {u.redo_label()} (Ctrl+Shift+Z)" if u.can_redo() else "")
+
+    def _import_table(self):
+        path, _ = QFileDialog.getOpenFileName(self, f"Importar planilha — {self.schema.title}", "", TABLE_FILTER)
+        if not path:
+            return
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            plan = plan_import_file(self.schema, self.model.existing_rows(), path)
+            self.model.apply_import(plan)
+        except (OSError, ValueError) as e:
+            QApplication.restoreOverrideCursor()
+            QMessageBox.warning(self, "Importar planilha", str(e))
+            return
+        QApplication.restoreOverrideCursor()
+        msg = plan.summary()
+        if plan.issues:
+            msg += "\n\n" + "\n".join(i.detail for i in plan.issues[:15])
+        if not plan.empty:
+            msg += "\n\nCtrl+Z desfaz a importação inteira."
+        QMessageBox.information(self, "Importar planilha", msg)
 
     def _remove_selected(self):
         sel = self.table.selectionModel().selectedRows()
@@ -1,18 +1,31 @@
 from __future__ import annotations
+import html
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from PyQt6.QtWidgets import (
     QWizard, QWizardPage, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QLineEdit,
     QPushButton, QFileDialog, QGroupBox, QFormLayout, QCheckBox, QTabWidget,
-    QPlainTextEdit, QMessageBox, QSpinBox
+    QPlainTextEdit, QMessageBox, QSpinBox, QInputDialog, QDialog, QTableWidget, QTableWidgetItem,
+    QHeaderView
 )
 from PyQt6.QtGui import QPixmap
-from PyQt6.QtCore import Qt
-
-from .utils import read_text_smart
+from PyQt6.QtCore import Qt, QTimer
+
+from .utils import script_stats
+from .batch import TargetRender, build_target_data, output_name, submit_render_all
+from .detect import detect_vendor
+from .sources import FILE_FILTER, MEMBER_SEP, iter_lines, list_members
+from .perf import recorder, span
+from .vendors.grammar import Coverage
 from .vendors.registry import get_registry
-from .models import NormalizedConfig
+from .models import NormalizedConfig, SectionSchema
+from .remap import RemapIssue, remap_from_fast
+from .tcont import ROUND_NEAREST, ROUND_UP
+from .project import PROJECT_FILTER, PROJECT_SUFFIX, ProjectStore, open_project
 from .widgets import SectionEditor
 
 
@@ -20,7 +33,6 @@ from .widgets import SectionEditor
 class AppState:
     src_vendor: str = ""
     src_path: str = ""
-    src_text: str = ""
     normalized: NormalizedConfig = field(default_factory=NormalizedConfig)
 
     dst_vendor: str = ""
@@ -43,6 +55,14 @@ class AppState:
 
     target_data: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
 
+    # projeto SQLite opcional (edições persistem a cada alteração)
+    project: Optional[ProjectStore] = None
+
+    def save_project_meta(self) -> None:
+        if self.project is not None:
+            self.project.set_meta(src_vendor=self.src_vendor, src_path=self.src_path, dst_vendor=self.dst_vendor,
+                                  options=self.options, fast=self.fast)
+
 
 class MigrationWizard(QWizard):
     def __init__(self):
@@ -65,6 +85,21 @@ class MigrationWizard(QWizard):
         self.button(QWizard.WizardButton.BackButton).setText("← Voltar")
 
 
+# resolvido pelo pacote, não pelo diretório atual (atalho/executável podem rodar de outra pasta)
+RESOURCES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources")
+LOGO_HEIGHT = 70
+_logo: Optional[QPixmap] = None
+
+
+def logo_pixmap() -> QPixmap:
+    """Header logo, loaded and scaled once and shared by every page."""
+    global _logo
+    if _logo is None:
+        px = QPixmap(os.path.join(RESOURCES_DIR, "metro_network.png"))
+        _logo = px if px.isNull() else px.scaledToHeight(LOGO_HEIGHT, Qt.TransformationMode.SmoothTransformation)
+    return _logo
+
+
 class Header(QWidget):
     def __init__(self, title: str, subtitle: str):
         super().__init__()
@@ -72,12 +107,9 @@ class Header(QWidget):
         lay.setContentsMargins(0, 0, 0, 0)
 
         logo = QLabel()
-        try:
-            px = QPixmap("resources/metro_network.png")
-            if not px.isNull():
-                logo.setPixmap(px.scaledToHeight(70, Qt.TransformationMode.SmoothTransformation))
-        except Exception:
-            pass
+        px = logo_pixmap()
+        if not px.isNull():
+            logo.setPixmap(px)
         lay.addWidget(logo)
 
         txt = QVBoxLayout()
@@ -88,6 +120,29 @@ class Header(QWidget):
         lay.addStretch(1)
 
 
+class LazyPage(QWizardPage):
+    """Page whose widgets are only created on the first initializePage().
+
+    Só a primeira página aparece na abertura; as demais são montadas quando o
+    usuário chega nelas.
+    """
+
+    def __init__(self, wiz: MigrationWizard, title: str):
+        super().__init__(wiz)
+        self.wiz = wiz
+        self.setTitle(title)
+        self._built = False
+
+    def ensure_built(self) -> None:
+        if not self._built:
+            self._built = True
+            with span("wizard.build_page", page=type(self).__name__):
+                self._build()
+
+    def _build(self) -> None:
+        raise NotImplementedError
+
+
 class SourcePage(QWizardPage):
     def __init__(self, wiz: MigrationWizard):
         super().__init__(wiz)
@@ -106,24 +161,37 @@ class SourcePage(QWizardPage):
 
         self.ed_path = QLineEdit()
         btn_browse = QPushButton("Procurar…")
+        btn_project = QPushButton("Abrir projeto…")
         row = QWidget()
         row_l = QHBoxLayout(row)
         row_l.setContentsMargins(0, 0, 0, 0)
         row_l.addWidget(self.ed_path, 1)
         row_l.addWidget(btn_browse)
+        row_l.addWidget(btn_project)
 
         self.lbl_summary = QLabel("Nenhum arquivo carregado.")
         self.lbl_summary.setStyleSheet("color: #a7a7b2;")
         self.lbl_summary.setWordWrap(True)
+        # cobertura do parser (linhas ignoradas); detalhe por assinatura/regra no tooltip
+        self.lbl_coverage = QLabel("")
+        self.lbl_coverage.setWordWrap(True)
+        self.lbl_coverage.setVisible(False)
+        summary = QWidget()
+        summary_l = QVBoxLayout(summary)
+        summary_l.setContentsMargins(0, 0, 0, 0)
+        summary_l.addWidget(self.lbl_summary)
+        summary_l.addWidget(self.lbl_coverage)
 
         form.addRow("Fabricante de origem:", self.cmb_vendor)
         form.addRow("Arquivo de backup:", row)
-        form.addRow("Resumo:", self.lbl_summary)
+        form.addRow("Resumo:", summary)
 
         root.addWidget(box)
         root.addStretch(1)
 
+        self.detected = ""
         btn_browse.clicked.connect(self._browse)
+        btn_project.clicked.connect(self._open_project)
         self.cmb_vendor.currentIndexChanged.connect(self._on_vendor_changed)
 
     def _on_vendor_changed(self):
@@ -131,42 +199,116 @@ class SourcePage(QWizardPage):
             self._load_and_parse(self.ed_path.text().strip())
 
     def _browse(self):
-        path, _ = QFileDialog.getOpenFileName(self, "Selecione o backup", "", "Config (*.txt *.cfg *.conf *.bak *.*)")
+        path, _ = QFileDialog.getOpenFileName(self, "Selecione o backup", "", FILE_FILTER)
         if path:
+            members = list_members(path)
+            if len(members) > 1:
+                # zip com vários configs: escolhe um (o CLI migra todos)
+                member, ok = QInputDialog.getItem(self, "Arquivo zip", "Config a carregar:", members, 0, False)
+                if not ok:
+                    return
+                path = f"{path}{MEMBER_SEP}{member}"
             self.ed_path.setText(path)
+            self._preselect_vendor(path)
             self._load_and_parse(path)
 
+    def _open_project(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Abrir projeto", "", PROJECT_FILTER)
+        if not path:
+            return
+        try:
+            with span("wizard.open_project"):
+                store = open_project(path)
+                st = self.wiz.state
+                if st.project is not None:
+                    st.project.close()
+                st.project = store
+                st.src_vendor = store.get_meta("src_vendor", "")
+                st.src_path = store.get_meta("src_path", "") or path
+                st.dst_vendor = store.get_meta("dst_vendor", "")
+                st.options = store.get_meta("options", st.options)
+                st.fast = store.get_meta("fast", st.fast)
+                st.normalized = store.read_normalized()
+        except Exception as e:
+            QMessageBox.critical(self, "Erro ao abrir projeto", str(e))
+            return
+        n = self.wiz.state.normalized
+        idx = self.cmb_vendor.findData(self.wiz.state.src_vendor)
+        if idx >= 0:
+            self.cmb_vendor.blockSignals(True)
+            self.cmb_vendor.setCurrentIndex(idx)
+            self.cmb_vendor.blockSignals(False)
+        self.ed_path.setText(self.wiz.state.src_path)
+        self.lbl_coverage.setVisible(False)
+        self.lbl_summary.setText(f"Projeto {path}: ONUs: {len(n.onus)} | Serviços: {len(n.services)} "
+                                 f"(edições salvas para {self.wiz.state.dst_vendor or '—'})")
+        self.completeChanged.emit()
+
+    def _preselect_vendor(self, path: str):
+        """Pick the source vendor from the first KB of the file (no full parse)."""
+        try:
+            with span("wizard.detect_vendor"):
+                ranking = detect_vendor(path)
+        except Exception:
+            return
+        if not ranking:
+            return
+        idx = self.cmb_vendor.findData(ranking[0][0])
+        if idx >= 0 and idx != self.cmb_vendor.currentIndex():
+            # sem sinal: _load_and_parse roda logo em seguida, uma vez só
+            self.cmb_vendor.blockSignals(True)
+            self.cmb_vendor.setCurrentIndex(idx)
+            self.cmb_vendor.blockSignals(False)
+        self.detected = f"{self.cmb_vendor.itemText(idx)} ({ranking[0][1]:.0%})" if idx >= 0 else ""
+
     def _load_and_parse(self, path: str):
         vid = self.cmb_vendor.currentData()
         adapter = self.wiz.registry[vid]
         try:
-            text = read_text_smart(path)
-            normalized = adapter.parse_to_normalized(text)
+            with span("wizard.load", vendor=vid):
+                # stream de linhas (descompacta .gz/.bz2/.xz/.zip sob demanda)
+                normalized, coverage = adapter.parse_lines_report(iter_lines(path))
             self.wiz.state.src_vendor = vid
             self.wiz.state.src_path = path
-            self.wiz.state.src_text = text
+            if self.wiz.state.project is not None:
+                # outro backup: o projeto aberto não corresponde mais
+                self.wiz.state.project.close()
+                self.wiz.state.project = None
             self.wiz.state.normalized = normalized
 
             self.lbl_summary.setText(
                 f"VLANs: {len(normalized.vlans)} | Trunks: {len(normalized.trunks)} | "
                 f"IPs: {len(normalized.interfaces)} | Rotas: {len(normalized.routes)} | "
                 f"TCONT: {len(normalized.tcont_profiles)} | ONUs: {len(normalized.onus)} | Serviços: {len(normalized.services)}"
+                + (f"\nOrigem detectada: {self.detected}" if self.detected else "")
             )
+            self._show_coverage(coverage)
             self.completeChanged.emit()
         except Exception as e:
             QMessageBox.critical(self, "Erro ao carregar", str(e))
             self.lbl_summary.setText("Erro ao parsear o arquivo.")
+            self.lbl_coverage.setVisible(False)
+
+    def _show_coverage(self, cov: Optional[Coverage]) -> None:
+        if cov is None:
+            self.lbl_coverage.setVisible(False)
+            return
+        color = "#e0a040" if cov.unmatched else "#6fbf73"
+        hint = " (passe o mouse para ver as linhas)" if cov.unmatched else ""
+        self.lbl_coverage.setStyleSheet(f"color: {color};")
+        self.lbl_coverage.setText("Cobertura do parser: " + cov.summary() + hint)
+        self.lbl_coverage.setToolTip(f"<pre>{html.escape(cov.report())}</pre>")
+        self.lbl_coverage.setVisible(True)
 
     def isComplete(self) -> bool:
-        return bool(self.wiz.state.src_text and self.wiz.state.src_vendor)
+        return bool(self.wiz.state.src_path and self.wiz.state.src_vendor)
 
 
-class TargetPage(QWizardPage):
+class TargetPage(LazyPage):
     def __init__(self, wiz: MigrationWizard):
-        super().__init__(wiz)
-        self.wiz = wiz
-        self.setTitle("Destino")
+        super().__init__(wiz, "Destino")
 
+    def _build(self) -> None:
         root = QVBoxLayout(self)
         root.addWidget(Header("Destino", "Escolha o fabricante de destino e marque o que deseja migrar/editar."))
 
@@ -193,6 +335,15 @@ class TargetPage(QWizardPage):
         root.addWidget(box)
         root.addStretch(1)
 
+    def initializePage(self) -> None:
+        self.ensure_built()
+        st = self.wiz.state
+        idx = self.cmb_vendor.findData(st.dst_vendor) if st.dst_vendor else -1
+        if idx >= 0:
+            self.cmb_vendor.setCurrentIndex(idx)
+        for chk, key in ((self.chk_vlans, "vlans"), (self.chk_ips, "ips_routes"), (self.chk_prof, "profiles"), (self.chk_onu, "onus")):
+            chk.setChecked(bool(st.options.get(key, True)))
+
     def validatePage(self) -> bool:
         self.wiz.state.dst_vendor = self.cmb_vendor.currentData()
         self.wiz.state.options = {
@@ -204,12 +355,11 @@ class TargetPage(QWizardPage):
         return True
 
 
-class FastModePage(QWizardPage):
+class FastModePage(LazyPage):
     def __init__(self, wiz: MigrationWizard):
-        super().__init__(wiz)
-        self.wiz = wiz
-        self.setTitle("Modo rápido")
+        super().__init__(wiz, "Modo rápido")
 
+    def _build(self) -> None:
         root = QVBoxLayout(self)
         root.addWidget(Header("Modo rápido", "Atalhos para trunks, offsets e parâmetros por fabricante de destino."))
 
@@ -234,6 +384,32 @@ class FastModePage(QWizardPage):
         form.addRow("Offset PON (+/-):", self.sp_pon)
         form.addRow("Offset VLAN (+/-):", self.sp_vlan)
 
+        # Remapeamento por tabela (app/remap.py), aplicado antes dos offsets
+        self.ed_vlan_map = QLineEdit()
+        self.ed_vlan_map.setPlaceholderText("Ex.: 100-199:2100, 150:999, 300-399:+1000")
+        self.ed_slot_map = QLineEdit()
+        self.ed_slot_map.setPlaceholderText("Ex.: 1:3, 2:4")
+        self.ed_pon_map = QLineEdit()
+        self.ed_pon_map.setPlaceholderText("Ex.: 5:1 (todas as slots) ou 2/5:1 (só slot 2)")
+        form.addRow("Mapa de VLANs:", self.ed_vlan_map)
+        form.addRow("Mapa de slots:", self.ed_slot_map)
+        form.addRow("Mapa de PONs:", self.ed_pon_map)
+
+        # Consolidação de profiles TCONT por banda (app/tcont.py)
+        self.sp_tcont_max = QSpinBox(); self.sp_tcont_max.setRange(0, 1024); self.sp_tcont_max.setValue(0)
+        self.sp_tcont_max.setSpecialValueText("não consolidar")
+        self.sp_tcont_tol = QSpinBox(); self.sp_tcont_tol.setRange(0, 100); self.sp_tcont_tol.setValue(10)
+        self.sp_tcont_tol.setSuffix(" %")
+        self.cb_tcont_round = QComboBox()
+        self.cb_tcont_round.addItem("Maior banda do grupo (ninguém perde banda)", ROUND_UP)
+        self.cb_tcont_round.addItem("Mediana do grupo", ROUND_NEAREST)
+        row_t = QWidget()
+        ht = QHBoxLayout(row_t); ht.setContentsMargins(0, 0, 0, 0)
+        ht.addWidget(self.sp_tcont_max)
+        ht.addWidget(QLabel("tolerância:")); ht.addWidget(self.sp_tcont_tol)
+        ht.addWidget(self.cb_tcont_round, 1)
+        form.addRow("Máx. profiles TCONT:", row_t)
+
         root.addWidget(box)
 
         # ZTE extras (somente quando destino = ZTE)
@@ -255,6 +431,9 @@ class FastModePage(QWizardPage):
         self.sp_discover_new = QSpinBox(); self.sp_discover_new.setRange(1, 9999); self.sp_discover_new.setValue(15)
         self.sp_discover_miss = QSpinBox(); self.sp_discover_miss.setRange(1, 9999); self.sp_discover_miss.setValue(60)
 
+        self.chk_optimized = QCheckBox("Modo otimizado (ranges de VLAN, sem blocos redundantes, menos comandos)")
+        self.chk_optimized.setChecked(False)
+
         self.ed_tcont_bridge = QLineEdit(); self.ed_tcont_bridge.setText("BRIDGE")
         self.ed_tcont_pppoe = QLineEdit(); self.ed_tcont_pppoe.setText("PPPOE")
 
@@ -273,11 +452,29 @@ class FastModePage(QWizardPage):
         fz.addRow("Valores:", row)
         fz.addRow("TCONT name (Bridge):", self.ed_tcont_bridge)
         fz.addRow("TCONT name (PPPoE):", self.ed_tcont_pppoe)
+        fz.addRow("Script:", self.chk_optimized)
 
         root.addWidget(self.grp_zte)
+
+        # Huawei extras (somente quando destino = Huawei)
+        self.grp_huawei = QGroupBox("Huawei (extras)")
+        fh = QFormLayout(self.grp_huawei)
+        self.ed_hw_frame = QLineEdit(); self.ed_hw_frame.setText("0")
+        self.ed_hw_slot = QLineEdit(); self.ed_hw_slot.setPlaceholderText("vazio = slot da origem")
+        self.sp_hw_line = QSpinBox(); self.sp_hw_line.setRange(0, 8192); self.sp_hw_line.setValue(10)
+        self.sp_hw_srv = QSpinBox(); self.sp_hw_srv.setRange(0, 8192); self.sp_hw_srv.setValue(10)
+        self.chk_hw_batch = QCheckBox("Agrupar service-ports de ONTs consecutivas (ont A-B)")
+        self.chk_hw_batch.setChecked(True)
+        fh.addRow("FRAME:", self.ed_hw_frame)
+        fh.addRow("SLOT:", self.ed_hw_slot)
+        fh.addRow("ont-lineprofile-id:", self.sp_hw_line)
+        fh.addRow("ont-srvprofile-id:", self.sp_hw_srv)
+        fh.addRow("Service-ports:", self.chk_hw_batch)
+        root.addWidget(self.grp_huawei)
         root.addStretch(1)
 
     def initializePage(self) -> None:
+        self.ensure_built()
         dst = (self.wiz.state.dst_vendor or "").lower().strip()
         adapter = self.wiz.registry.get(dst)
         vendor_label = adapter.label if adapter else dst
@@ -285,13 +482,57 @@ class FastModePage(QWizardPage):
 
         is_zte = dst == "zte"
         self.grp_zte.setVisible(is_zte)
+        self.grp_huawei.setVisible(dst == "huawei")
 
         if not is_zte:
             # evita 'cara de ZTE' quando não for ZTE
             self.ed_frame.clear()
             self.ed_slot.clear()
+        if self.wiz.state.project is not None:
+            self._load_fast(self.wiz.state.fast, dst)
+
+    def _load_fast(self, fast: Dict[str, Any], dst: str) -> None:
+        """Put the options saved in a project back into the widgets."""
+        self.ed_trunks.setText(str(fast.get("trunks_csv", "")))
+        self.chk_all.setChecked(bool(fast.get("apply_all_vlans_to_trunks", True)))
+        self.sp_pon.setValue(int(fast.get("pon_offset", 0) or 0))
+        self.sp_vlan.setValue(int(fast.get("vlan_offset", 0) or 0))
+        self.ed_vlan_map.setText(str(fast.get("vlan_map", "")))
+        self.ed_slot_map.setText(str(fast.get("slot_map", "")))
+        self.ed_pon_map.setText(str(fast.get("pon_map", "")))
+        self.sp_tcont_max.setValue(int(fast.get("tcont_max_profiles", 0) or 0))
+        self.sp_tcont_tol.setValue(int(fast.get("tcont_tolerance", 10) or 0))
+        self.cb_tcont_round.setCurrentIndex(max(0, self.cb_tcont_round.findData(fast.get("tcont_rounding", ROUND_UP))))
+        if dst == "zte":
+            self.ed_frame.setText(str(fast.get("frame", "")))
+            self.ed_slot.setText(str(fast.get("slot", "")))
+            self.ed_trunk_desc.setText(str(fast.get("trunk_desc", self.ed_trunk_desc.text())))
+            self.chk_trunk_no_shutdown.setChecked(bool(fast.get("trunk_no_shutdown", True)))
+            self.chk_discover.setChecked(bool(fast.get("discover_enable", True)))
+            self.sp_discover_new.setValue(int(fast.get("discover_new_onu", 15) or 15))
+            self.sp_discover_miss.setValue(int(fast.get("discover_miss_onu", 60) or 60))
+            self.ed_tcont_bridge.setText(str(fast.get("tcont_name_bridge", "BRIDGE")))
+            self.ed_tcont_pppoe.setText(str(fast.get("tcont_name_pppoe", "PPPOE")))
+            self.chk_optimized.setChecked(bool(fast.get("optimized", False)))
+        elif dst == "huawei":
+            self.ed_hw_frame.setText(str(fast.get("frame", "0")))
+            self.ed_hw_slot.setText(str(fast.get("slot", "")))
+            self.sp_hw_line.setValue(int(fast.get("line_profile_id", 10) or 10))
+            self.sp_hw_srv.setValue(int(fast.get("srv_profile_id", 10) or 10))
+            self.chk_hw_batch.setChecked(bool(fast.get("batch_service_ports", True)))
 
     def validatePage(self) -> bool:
+        maps = {"vlan_map": self.ed_vlan_map.text().strip(), "slot_map": self.ed_slot_map.text().strip(),
+                "pon_map": self.ed_pon_map.text().strip()}
+        try:
+            remap_from_fast(maps)
+        except ValueError as e:
+            QMessageBox.warning(self, "Mapa inválido", str(e))
+            return False
+        self.wiz.state.fast.update(maps)
+        self.wiz.state.fast["tcont_max_profiles"] = int(self.sp_tcont_max.value())
+        self.wiz.state.fast["tcont_tolerance"] = int(self.sp_tcont_tol.value())
+        self.wiz.state.fast["tcont_rounding"] = self.cb_tcont_round.currentData()
         self.wiz.state.fast["trunks_csv"] = self.ed_trunks.text().strip()
         self.wiz.state.fast["apply_all_vlans_to_trunks"] = self.chk_all.isChecked()
         self.wiz.state.fast["pon_offset"] = int(self.sp_pon.value())
@@ -309,100 +550,181 @@ class FastModePage(QWizardPage):
             self.wiz.state.fast["discover_miss_onu"] = int(self.sp_discover_miss.value())
             self.wiz.state.fast["tcont_name_bridge"] = self.ed_tcont_bridge.text().strip() or "BRIDGE"
             self.wiz.state.fast["tcont_name_pppoe"] = self.ed_tcont_pppoe.text().strip() or "PPPOE"
+            self.wiz.state.fast["optimized"] = self.chk_optimized.isChecked()
         else:
             # limpa chaves específicas para reduzir confusão
-            for k in ("frame","slot","trunk_desc","trunk_no_shutdown","discover_enable","discover_new_onu","discover_miss_onu","tcont_name_bridge","tcont_name_pppoe"):
+            for k in ("frame","slot","trunk_desc","trunk_no_shutdown","discover_enable","discover_new_onu","discover_miss_onu","tcont_name_bridge","tcont_name_pppoe","optimized"):
+                self.wiz.state.fast.pop(k, None)
+        if dst == "huawei":
+            self.wiz.state.fast["frame"] = self.ed_hw_frame.text().strip()
+            self.wiz.state.fast["slot"] = self.ed_hw_slot.text().strip()
+            self.wiz.state.fast["line_profile_id"] = int(self.sp_hw_line.value())
+            self.wiz.state.fast["srv_profile_id"] = int(self.sp_hw_srv.value())
+            self.wiz.state.fast["batch_service_ports"] = self.chk_hw_batch.isChecked()
+        else:
+            for k in ("line_profile_id","srv_profile_id","batch_service_ports"):
                 self.wiz.state.fast.pop(k, None)
         return True
 
 
 
-class EditPage(QWizardPage):
+class EditPage(LazyPage):
     def __init__(self, wiz: MigrationWizard):
-        super().__init__(wiz)
-        self.wiz = wiz
-        self.setTitle("Adicionar / Modificar")
+        super().__init__(wiz, "Adicionar / Modificar")
 
+    def _build(self) -> None:
         self.root = QVBoxLayout(self)
         self.root.addWidget(Header("Editor", "Edite IDs/Nomes/Valores e use ADD para criar linhas."))
 
         self.tabs = QTabWidget()
         self.root.addWidget(self.tabs, 1)
 
+        self.lbl_issues = QLabel("")
+        self.lbl_issues.setStyleSheet("color: #d81b60;")
+        self.lbl_issues.setVisible(False)
+        self.root.addWidget(self.lbl_issues)
+
         bar = QHBoxLayout()
         self.btn_rebuild = QPushButton("Recarregar do arquivo de origem")
         self.btn_rebuild.setObjectName("Primary")
+        self.btn_project = QPushButton("Salvar projeto…")
+        self.lbl_project = QLabel("")
+        self.lbl_project.setStyleSheet("color: #a7a7b2;")
         bar.addWidget(self.btn_rebuild)
-        bar.addStretch(1)
+        bar.addWidget(self.btn_project)
+        bar.addWidget(self.lbl_project, 1)
         self.root.addLayout(bar)
 
+        self.sections: List[SectionSchema] = []
         self.btn_rebuild.clicked.connect(self._rebuild_tabs)
+        self.tabs.currentChanged.connect(self._ensure_editor)
+        self.btn_project.clicked.connect(self._save_project)
 
     def initializePage(self):
+        self.ensure_built()
+        st = self.wiz.state
+        if st.project is not None and st.project.get_meta("dst_vendor") == st.dst_vendor and st.project.section_keys():
+            # projeto aberto para este destino: usa as edições gravadas
+            with span("wizard.rebuild_tabs", source="project"):
+                self._build_editors()
+            return
         self._rebuild_tabs()
 
-    def _apply_fast_defaults(self, target_data: Dict[str, List[Dict[str, Any]]]):
-        # Apply trunks from CSV into target_data if section exists
-        trunks_csv = str(self.wiz.state.fast.get("trunks_csv","")).strip()
-        if trunks_csv and "trunks" in target_data:
-            ifnames = [x.strip() for x in trunks_csv.split(",") if x.strip()]
-            target_data["trunks"] = [{"ifname":n, "tagged":"ALL"} for n in ifnames]
-
     def _rebuild_tabs(self):
+        with span("wizard.rebuild_tabs"):
+            self._do_rebuild_tabs()
+
+    def _do_rebuild_tabs(self):
         dst = self.wiz.state.dst_vendor
         adapter = self.wiz.registry[dst]
-        schema = adapter.schema()
-
-        target_data = adapter.from_normalized(self.wiz.state.normalized)
-        self._apply_fast_defaults(target_data)
-
-        # Apply options (clear sections)
-        opts = self.wiz.state.options
-        if not opts.get("vlans", True) and "vlans" in target_data:
-            target_data["vlans"] = []
-        if not opts.get("ips_routes", True):
-            for k in ("interfaces","routes"):
-                if k in target_data:
-                    target_data[k] = []
-        if not opts.get("profiles", True):
-            for k in ("tcont_profiles",):
-                if k in target_data:
-                    target_data[k] = []
-        if not opts.get("onus", True):
-            for k in ("onus","services"):
-                if k in target_data:
-                    target_data[k] = []
 
+        # remapeamento, defaults do modo rápido, opções e linhas tipadas (uma vez aqui;
+        # editores e render usam as mesmas linhas)
+        issues: List[RemapIssue] = []
+        target_data = build_target_data(dst, self.wiz.state.normalized, self.wiz.state.fast,
+                                        self.wiz.state.options, issues)
+        self._show_issues(issues)
         self.wiz.state.target_data = target_data
-
+        if self.wiz.state.project is not None:
+            self.wiz.state.project.write_sections(adapter.schema(), target_data)
+            self.wiz.state.save_project_meta()
+        self._build_editors()
+
+    def _show_issues(self, issues: List[RemapIssue]) -> None:
+        if not issues:
+            self.lbl_issues.setVisible(False)
+            return
+        kinds: Dict[str, int] = {}
+        for i in issues:
+            kinds[i.kind] = kinds.get(i.kind, 0) + 1
+        self.lbl_issues.setText("Avisos (remapeamento/TCONT/destino): " + ", ".join(f"{n} {k}" for k, n in kinds.items())
+                                + " (passe o mouse para ver)")
+        self.lbl_issues.setToolTip("\n".join(i.detail for i in issues[:40]))
+        self.lbl_issues.setVisible(True)
+
+    def _build_editors(self):
+        st = self.wiz.state
+        schema = self.wiz.registry[st.dst_vendor].schema()
+        # uma aba vazia por seção; o SectionEditor (modelo + tabela) só é criado
+        # quando a aba é aberta pela primeira vez
+        self.tabs.blockSignals(True)
         self.tabs.clear()
+        self.tabs.blockSignals(False)
+        self.sections = list(schema)
         self.editors: Dict[str, SectionEditor] = {}
         for sec in schema:
-            rows = target_data.get(sec.key, [])
-            ed = SectionEditor(sec, rows)
-            self.editors[sec.key] = ed
-            self.tabs.addTab(ed, sec.title)
-            ed.model.dataChangedSignal.connect(self._sync_state)
-
+            self.tabs.addTab(QWidget(), sec.title)
+        self._ensure_editor(self.tabs.currentIndex())
+        self.lbl_project.setText(f"Projeto: {st.project.path} (salvo a cada edição)" if st.project else "")
         self._sync_state()
 
+    def _ensure_editor(self, index: int) -> None:
+        if not 0 <= index < len(self.sections) or self.sections[index].key in self.editors:
+            return
+        st = self.wiz.state
+        sec = self.sections[index]
+        with span("wizard.build_editor", section=sec.key):
+            ed = SectionEditor(sec, st.target_data.get(sec.key, []), store=st.project)
+        self.editors[sec.key] = ed
+        if st.project is None:
+            ed.model.dataChangedSignal.connect(self._sync_state)
+        placeholder = self.tabs.widget(index)
+        self.tabs.blockSignals(True)
+        self.tabs.removeTab(index)
+        self.tabs.insertTab(index, ed, sec.title)
+        self.tabs.setCurrentIndex(index)
+        self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+
+    def _save_project(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Salvar projeto", "migracao.oltproj", PROJECT_FILTER)
+        if not path:
+            return
+        if not path.endswith(PROJECT_SUFFIX):
+            path += PROJECT_SUFFIX
+        st = self.wiz.state
+        try:
+            with span("wizard.save_project"):
+                self._sync_state()
+                if st.project is not None:
+                    # com projeto aberto as edições só estão no SQLite (st.target_data pode estar
+                    # vazio ou antigo): lê antes de fechar, seja o mesmo arquivo ou outro
+                    st.target_data = self.wiz.registry[st.dst_vendor].records(st.project.read_sections())
+                    st.project.close()
+                    st.project = None
+                if os.path.exists(path):
+                    os.remove(path)
+                st.project = open_project(path)
+                st.project.write_normalized(st.normalized)
+                st.project.write_sections(self.wiz.registry[st.dst_vendor].schema(), st.target_data)
+                st.save_project_meta()
+                self._build_editors()
+        except Exception as e:
+            QMessageBox.critical(self, "Erro ao salvar projeto", str(e))
+
     def _sync_state(self):
         if not getattr(self, "editors", None):
             return
+        if self.wiz.state.project is not None:
+            # as edições já estão no SQLite; o texto só é montado ao sair da página
+            return
         for k, ed in self.editors.items():
             self.wiz.state.target_data[k] = ed.rows()
 
     def validatePage(self) -> bool:
+        st = self.wiz.state
+        if st.project is not None:
+            st.target_data = self.wiz.registry[st.dst_vendor].records(st.project.read_sections())
+            st.save_project_meta()
         self._sync_state()
         return True
 
 
-class PreviewPage(QWizardPage):
+class PreviewPage(LazyPage):
     def __init__(self, wiz: MigrationWizard):
-        super().__init__(wiz)
-        self.wiz = wiz
-        self.setTitle("Conferência e geração")
+        super().__init__(wiz, "Conferência e geração")
 
+    def _build(self) -> None:
         root = QVBoxLayout(self)
         root.addWidget(Header("Prévia", "Confira o script final e gere o arquivo no formato do destino."))
 
@@ -412,23 +734,75 @@ class PreviewPage(QWizardPage):
         self.txt.setStyleSheet("font-family: Consolas, 'Courier New', monospace; font-size: 10pt;")
         root.addWidget(self.txt, 1)
 
+        self.lbl_stats = QLabel("")
+        self.lbl_stats.setStyleSheet("color: #a7a7b2;")
+        root.addWidget(self.lbl_stats)
+
+        # Performance: tempos por etapa (spans de app/perf.py)
+        self.grp_perf = QGroupBox("Performance")
+        self.grp_perf.setCheckable(True)
+        self.grp_perf.setChecked(False)
+        perf_l = QVBoxLayout(self.grp_perf)
+        self.txt_perf = QPlainTextEdit()
+        self.txt_perf.setReadOnly(True)
+        self.txt_perf.setMaximumHeight(150)
+        self.txt_perf.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.txt_perf.setStyleSheet("font-family: Consolas, 'Courier New', monospace; font-size: 9pt;")
+        self.txt_perf.setVisible(False)
+        self.btn_perf_json = QPushButton("Exportar relatório JSON…")
+        self.btn_perf_json.setVisible(False)
+        perf_l.addWidget(self.txt_perf)
+        perf_l.addWidget(self.btn_perf_json)
+        root.addWidget(self.grp_perf)
+        self.grp_perf.toggled.connect(self.txt_perf.setVisible)
+        self.grp_perf.toggled.connect(self.btn_perf_json.setVisible)
+        self.btn_perf_json.clicked.connect(self._export_perf)
+
         bar = QHBoxLayout()
         self.btn_save = QPushButton("Gerar Script (Salvar)")
         self.btn_save.setObjectName("Primary")
+        self.btn_all = QPushButton("Renderizar todos os destinos…")
         bar.addWidget(self.btn_save)
+        bar.addWidget(self.btn_all)
         bar.addStretch(1)
         root.addLayout(bar)
 
         self.btn_save.clicked.connect(self._save)
+        self.btn_all.clicked.connect(self._render_all)
 
     def initializePage(self):
+        self.ensure_built()
         self._refresh()
 
     def _refresh(self):
         dst = self.wiz.state.dst_vendor
         adapter = self.wiz.registry[dst]
-        script = adapter.render(self.wiz.state.target_data, self.wiz.state.fast)
-        self.txt.setPlainText(script)
+        with span("wizard.preview", vendor=dst):
+            script = adapter.render(self.wiz.state.target_data, self.wiz.state.fast)
+            with span("setPlainText"):
+                self.txt.setPlainText(script)
+
+        st = script_stats(script)
+        msg = f"Linhas: {st['lines']} | Comandos: {st['commands']} | Bytes: {st['bytes']}"
+        if dst == "zte" and self.wiz.state.fast.get("optimized"):
+            # o script otimizado já está renderizado: só o modo normal é gerado para comparar
+            saved = adapter.compare_render_modes(self.wiz.state.target_data, self.wiz.state.fast, optimized_stats=st)["saved"]
+            msg += f" | Economia vs. modo normal: {saved['commands']} comandos, {saved['bytes']} bytes"
+        self.lbl_stats.setText(msg)
+        self.txt_perf.setPlainText("\n".join(recorder.summary_lines()))
+
+    def _render_all(self):
+        st = self.wiz.state
+        RenderAllDialog(self, st.normalized, st.fast, st.options).exec()
+
+    def _export_perf(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Salvar relatório de performance", "perf.json", "*.json;;All (*.*)")
+        if not path:
+            return
+        try:
+            recorder.write_json(path)
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", str(e))
 
     def _save(self):
         self._refresh()
@@ -444,3 +818,105 @@ class PreviewPage(QWizardPage):
             QMessageBox.information(self, "OK", "Script gerado com sucesso.")
         except Exception as e:
             QMessageBox.critical(self, "Erro", str(e))
+
+
+class RenderAllDialog(QDialog):
+    """Renders the loaded source for every registered vendor in worker processes, side by side."""
+
+    COLUMNS = ("Destino", "Linhas", "Comandos", "Bytes", "Tempo (ms)")
+
+    def __init__(self, parent: QWidget, normalized: NormalizedConfig, fast: Dict[str, Any], options: Dict[str, bool]):
+        super().__init__(parent)
+        self.setWindowTitle("Todos os destinos")
+        self.resize(980, 640)
+        self.results: Dict[str, TargetRender] = {}
+
+        root = QVBoxLayout(self)
+        note = QLabel("Mesma origem renderizada para cada fabricante (edições feitas no Editor não entram aqui).")
+        note.setStyleSheet("color: #a7a7b2;")
+        root.addWidget(note)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(list(self.COLUMNS))
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setMaximumHeight(200)
+        root.addWidget(self.table)
+
+        self.tabs = QTabWidget()
+        root.addWidget(self.tabs, 1)
+
+        bar = QHBoxLayout()
+        self.lbl_status = QLabel("Renderizando…")
+        self.btn_save = QPushButton("Salvar todos…")
+        self.btn_save.setEnabled(False)
+        btn_close = QPushButton("Fechar")
+        bar.addWidget(self.lbl_status, 1)
+        bar.addWidget(self.btn_save)
+        bar.addWidget(btn_close)
+        root.addLayout(bar)
+        self.btn_save.clicked.connect(self._save_all)
+        btn_close.clicked.connect(self.reject)
+
+        # um processo por destino: renders grandes (ZTE/Huawei) não esperam uns pelos outros
+        registry = get_registry()
+        self.rows = {vid: i for i, vid in enumerate(registry)}
+        self.table.setRowCount(len(registry))
+        for vid, i in self.rows.items():
+            self.table.setItem(i, 0, QTableWidgetItem(registry[vid].label))
+        self.t0 = time.perf_counter()
+        self.executor = ProcessPoolExecutor(max_workers=min(len(registry), os.cpu_count() or 1))
+        self.pending: Dict[str, Future] = submit_render_all(self.executor, normalized, fast, options)
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._poll)
+        self.timer.start(100)
+
+    def _poll(self):
+        for vid, fut in list(self.pending.items()):
+            if not fut.done():
+                continue
+            del self.pending[vid]
+            try:
+                res = fut.result()
+            except Exception as e:
+                res = TargetRender(vid, vid, error=str(e))
+            self.results[vid] = res
+            row = self.rows[vid]
+            if res.error:
+                self.table.setItem(row, 1, QTableWidgetItem(f"ERRO: {res.error}"))
+                continue
+            for col, val in enumerate((res.stats["lines"], res.stats["commands"], res.stats["bytes"], round(res.seconds * 1000, 1)), start=1):
+                item = QTableWidgetItem(str(val))
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, col, item)
+            txt = QPlainTextEdit()
+            txt.setReadOnly(True)
+            txt.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+            txt.setStyleSheet("font-family: Consolas, 'Courier New', monospace; font-size: 9pt;")
+            txt.setPlainText(res.script)
+            self.tabs.addTab(txt, res.label)
+        if not self.pending:
+            self.timer.stop()
+            self.executor.shutdown(wait=False)
+            self.lbl_status.setText(f"Concluído em {time.perf_counter() - self.t0:.1f} s")
+            self.btn_save.setEnabled(True)
+
+    def _save_all(self):
+        folder = QFileDialog.getExistingDirectory(self, "Pasta para os scripts")
+        if not folder:
+            return
+        try:
+            for vid, res in self.results.items():
+                if not res.error:
+                    with open(os.path.join(folder, output_name("script", vid)), "w", encoding="utf-8") as f:
+                        f.write(res.script)
+            QMessageBox.information(self, "OK", f"{len(self.results)} scripts gravados em {folder}.")
+        except Exception as e:
+            QMessageBox.critical(self, "Erro", str(e))
+
+    def done(self, r: int) -> None:
+        self.timer.stop()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        super().done(r)
+
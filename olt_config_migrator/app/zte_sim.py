@@ -0,0 +1,610 @@
+from __future__ import annotations
+import gc
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .perf import span
+from .remap import RemapIssue
+from .utils import parse_vlan_spec
+from .vendors.zte import ZTEAdapter
+
+# Simulador em memória do subconjunto da CLI ZTE que o ZTEAdapter emite (render e render_delta):
+# 'vlan database'/'vlan N', 'interface' (uplink/IP, gpon_olt, gpon_onu, vport), 'onu', 'tcont',
+# 'gemport', 'service-port', 'pon-onu-mng', 'profile tcont', 'ip route', as formas 'no ...' e '$'.
+#
+# O script é aplicado numa OLT modelo (SimOlt) e os comandos que a OLT recusaria viram erros
+# com o número da linha: VLAN inexistente, ONU/SN duplicado, profile/tcont/gemport que não existe,
+# vport sem ONU, serviço já criado com outros valores, ... Um comando recusado não muda o estado;
+# se a recusa for a entrada num contexto (ex.: 'interface gpon_onu' de ONU não cadastrada), as
+# linhas do bloco até o '$' são puladas, como aconteceria colando o script na OLT.
+#
+# compare() confronta o estado final com o target_data que gerou o script (mesmos frame/slot/
+# offsets do modo rápido) e aponta o que faltou, sobrou ou ficou diferente.
+#
+# Cada linha é despachada por split() + comparação de palavras, sem regex: ~3 µs por linha,
+# 1 milhão de linhas em ~3 s.
+
+MAX_ONU_ID = 128
+MAX_ISSUES = 10_000  # erros guardados com detalhe; acima disso só contam
+
+# comandos recusados
+UNKNOWN_COMMAND = "comando_desconhecido"
+BAD_ARGS = "argumento_invalido"
+VLAN_MISSING = "vlan_inexistente"
+PORT_NOT_TRUNK = "porta_nao_trunk"
+ONU_DUPLICATE = "onu_duplicada"
+SN_DUPLICATE = "sn_duplicado"
+ONU_MISSING = "onu_inexistente"
+ONU_ID_INVALID = "onu_id_invalido"
+PROFILE_MISSING = "profile_inexistente"
+PROFILE_IN_USE = "profile_em_uso"
+TCONT_MISSING = "tcont_inexistente"
+GEMPORT_MISSING = "gemport_inexistente"
+GEMPORT_IN_USE = "gemport_em_uso"
+VPORT_NO_ONU = "vport_sem_onu"
+SERVICE_EXISTS = "servico_existente"
+SERVICE_MISSING = "servico_inexistente"
+NOT_FOUND = "nao_encontrado"
+
+# estado final x target_data
+VLAN_MISSING_STATE = "vlan_faltando"
+VLAN_EXTRA = "vlan_sobrando"
+TRUNK_DIFF = "trunk_diferente"
+IP_DIFF = "ip_diferente"
+ROUTE_MISSING = "rota_faltando"
+ROUTE_EXTRA = "rota_sobrando"
+PROFILE_DIFF = "profile_diferente"
+ONU_MISSING_STATE = "onu_faltando"
+ONU_EXTRA = "onu_sobrando"
+ONU_COLLISION = "onu_colisao"
+ONU_DIFF = "onu_diferente"
+BAND_DIFF = "banda_diferente"
+SERVICE_MISSING_STATE = "servico_faltando"
+SERVICE_EXTRA = "servico_sobrando"
+SERVICE_DIFF = "servico_diferente"
+
+OnuKey = Tuple[str, int]  # ("F/S/P", onu_id)
+
+
+@dataclass
+class SimIssue(RemapIssue):
+    line: int = 0  # 0 = diferença de estado (compare)
+
+
+@dataclass
+class SimOnu:
+    onu_type: str
+    sn: str = ""
+    desc: str = ""
+    tconts: Dict[int, str] = field(default_factory=dict)                  # tcont -> profile
+    gemports: Dict[int, int] = field(default_factory=dict)                # gemport -> tcont
+    vports: Dict[int, Tuple[int, int]] = field(default_factory=dict)      # vport -> (user-vlan, vlan)
+    services: Dict[int, Tuple[int, int]] = field(default_factory=dict)    # service -> (gemport, vlan)
+    vlan_ports: Dict[Tuple[int, int], str] = field(default_factory=dict)  # (uni, vlan) -> tag/untag
+    wan: Dict[int, Tuple[str, str, str]] = field(default_factory=dict)    # wan-ip -> (user, senha, vlan-profile)
+
+
+@dataclass
+class SimOlt:
+    vlans: Set[int] = field(default_factory=set)
+    trunk_ports: Set[str] = field(default_factory=set)         # 'switchport mode trunk'
+    trunks: Dict[str, Set[int]] = field(default_factory=dict)  # ifname -> VLANs tagged
+    ips: Dict[str, str] = field(default_factory=dict)          # ifname -> texto do 'ip address'
+    routes: Set[Tuple[str, str]] = field(default_factory=set)
+    profiles: Dict[str, Tuple[int, int, int]] = field(default_factory=dict)  # nome -> (type, assured, max)
+    onus: Dict[OnuKey, SimOnu] = field(default_factory=dict)
+    sns: Dict[str, OnuKey] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        svcs = sum(len(o.services) for o in self.onus.values())
+        return (f"{len(self.vlans)} VLANs, {len(self.trunks)} trunks, {len(self.profiles)} profiles, "
+                f"{len(self.onus)} ONUs, {svcs} serviços")
+
+
+def _onu_key(name: str, prefix: int) -> OnuKey:
+    """'gpon_onu-1/1/3:5' -> ('1/1/3', 5); `prefix` = len('gpon_onu-')."""
+    port, _, oid = name[prefix:].rpartition(":")
+    return port, int(oid)
+
+
+class ZteSimulator:
+    """Applies ZTE CLI lines to a SimOlt, collecting the commands the OLT would refuse."""
+
+    def __init__(self, olt: Optional[SimOlt] = None):
+        self.olt = olt or SimOlt()
+        self.errors: List[SimIssue] = []
+        self.error_counts: Dict[str, int] = {}
+        self.lines = 0
+        self.commands = 0
+        self.skipped = 0  # linhas de blocos cuja entrada foi recusada
+        self.ifname = ""
+        self.port = ""
+        self.key: OnuKey = ("", 0)
+        self.onu: Optional[SimOnu] = None
+        self.vport = 0
+
+    def error(self, line: int, kind: str, detail: str) -> None:
+        self.error_counts[kind] = self.error_counts.get(kind, 0) + 1
+        if len(self.errors) < MAX_ISSUES:
+            self.errors.append(SimIssue(kind, f"linha {line}: {detail}", line))
+
+    @property
+    def error_total(self) -> int:
+        return sum(self.error_counts.values())
+
+    def apply(self, lines: Iterable[str]) -> "ZteSimulator":
+        handler: Callable[[List[str], str, int], Any] = self._top
+        no = self.lines
+        # só cria objetos que ficam vivos até o fim: o coletor cíclico não acharia nada
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for no, raw in enumerate(lines, self.lines + 1):
+                s = raw.strip()
+                if not s or s[0] == "!":
+                    continue
+                self.commands += 1
+                if s == "$":
+                    handler = self._top
+                    continue
+                try:
+                    nxt = handler(s.split(), s, no)
+                except (IndexError, ValueError):
+                    self.error(no, BAD_ARGS, s)
+                    continue
+                if nxt is not None:
+                    handler = nxt
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        self.lines = no
+        return self
+
+    # -- nível global ------------------------------------------------------------
+
+    def _top(self, w: List[str], s: str, no: int):
+        olt = self.olt
+        c = w[0]
+        if c == "interface" and len(w) == 2:
+            name = w[1]
+            if name.startswith("gpon_onu-"):
+                key = _onu_key(name, 9)
+                onu = olt.onus.get(key)
+                if onu is None:
+                    self.error(no, ONU_MISSING, s)
+                    return self._skip
+                self.key, self.onu = key, onu
+                return self._in_onu
+            if name.startswith("vport-"):
+                head, _, vp = name[6:].rpartition(":")
+                port, _, oid = head.rpartition(".")
+                key = (port, int(oid))
+                onu = olt.onus.get(key)
+                if onu is None:
+                    self.error(no, VPORT_NO_ONU, s)
+                    return self._skip
+                if int(vp) not in onu.gemports:
+                    self.error(no, GEMPORT_MISSING, f"{s} (vport {vp} sem gemport {vp})")
+                    return self._skip
+                self.key, self.onu, self.vport = key, onu, int(vp)
+                return self._in_vport
+            if name.startswith("gpon_olt-"):
+                self.port = name[9:]
+                return self._in_pon
+            self.ifname = name
+            return self._in_iface
+        if c == "pon-onu-mng" and len(w) == 2 and w[1].startswith("gpon_onu-"):
+            key = _onu_key(w[1], 9)
+            onu = olt.onus.get(key)
+            if onu is None:
+                self.error(no, ONU_MISSING, s)
+                return self._skip
+            self.key, self.onu = key, onu
+            return self._in_mng
+        if c == "vlan":
+            if w[1] == "database":
+                return self._in_vlan_db
+            vid = int(w[1])
+            if not 0 < vid <= 4094:
+                raise ValueError(vid)
+            olt.vlans.add(vid)
+            return self._in_vlan
+        if c == "profile" and w[1] == "tcont":
+            # profile tcont NOME type T assured A maximum M
+            name, dba = w[2], int(w[w.index("type") + 1])
+            assured = int(w[w.index("assured") + 1]) if "assured" in w else 0
+            maxbw = int(w[w.index("maximum") + 1]) if "maximum" in w else 0
+            olt.profiles[name] = (dba, assured, maxbw)
+            return None
+        if c == "ip" and w[1] == "route":
+            olt.routes.add((w[2], w[3]))
+            return None
+        if c == "no":
+            if w[1] == "profile" and w[2] == "tcont":
+                name = w[3]
+                if name not in olt.profiles:
+                    self.error(no, PROFILE_MISSING, s)
+                elif any(name in o.tconts.values() for o in olt.onus.values()):
+                    self.error(no, PROFILE_IN_USE, s)
+                else:
+                    del olt.profiles[name]
+                return None
+            if w[1] == "ip" and w[2] == "route":
+                if (w[3], w[4]) in olt.routes:
+                    olt.routes.discard((w[3], w[4]))
+                else:
+                    self.error(no, NOT_FOUND, s)
+                return None
+        self.error(no, UNKNOWN_COMMAND, s)
+        return None
+
+    def _other(self, w: List[str], s: str, no: int):
+        # troca de contexto sem '$' (a OLT aceita 'interface ...' dentro de outra interface)
+        if w[0] in ("interface", "pon-onu-mng"):
+            return self._top(w, s, no)
+        self.error(no, UNKNOWN_COMMAND, s)
+        return None
+
+    def _skip(self, w: List[str], s: str, no: int):
+        self.skipped += 1
+        return None
+
+    # -- VLANs e interfaces de uplink/IP ----------------------------------------
+
+    def _in_vlan_db(self, w: List[str], s: str, no: int):
+        if w[0] == "vlan" and w[1] == "list":
+            self.olt.vlans.update(parse_vlan_spec(" ".join(w[2:])))
+        elif w[0] == "no" and w[1] == "vlan" and w[2] == "list":
+            self.olt.vlans.difference_update(parse_vlan_spec(" ".join(w[3:])))
+        else:
+            return self._other(w, s, no)
+        return None
+
+    def _in_vlan(self, w: List[str], s: str, no: int):
+        if w[0] in ("name", "description"):
+            return None
+        return self._other(w, s, no)
+
+    def _vlan_list(self, w: List[str], no: int, s: str) -> List[int]:
+        vids = parse_vlan_spec(" ".join(x for x in w if x != "tag"))
+        missing = [v for v in vids if v not in self.olt.vlans]
+        if missing:
+            self.error(no, VLAN_MISSING, f"{s} ({len(missing)} VLANs, ex.: {missing[0]})")
+        return vids
+
+    def _in_iface(self, w: List[str], s: str, no: int):
+        olt, ifname = self.olt, self.ifname
+        c = w[0]
+        if c in ("description", "shutdown"):
+            return None
+        if c == "switchport":
+            if w[1] == "mode":
+                if w[2] == "trunk":
+                    olt.trunk_ports.add(ifname)
+                return None
+            if w[1] == "vlan":
+                if ifname not in olt.trunk_ports:
+                    self.error(no, PORT_NOT_TRUNK, s)
+                    return None
+                vids = self._vlan_list(w[2:], no, s)
+                olt.trunks.setdefault(ifname, set()).update(v for v in vids if v in olt.vlans)
+                return None
+        if c == "ip" and w[1] == "address":
+            olt.ips[ifname] = " ".join(w[2:])
+            return None
+        if c == "no":
+            if w[1] == "shutdown":
+                return None
+            if w[1] == "switchport" and w[2] == "vlan":
+                olt.trunks.get(ifname, set()).difference_update(parse_vlan_spec(" ".join(x for x in w[3:] if x != "tag")))
+                return None
+            if w[1] == "ip" and w[2] == "address":
+                if olt.ips.pop(ifname, None) is None:
+                    self.error(no, NOT_FOUND, f"{s} ({ifname} sem IP)")
+                return None
+        return self._other(w, s, no)
+
+    # -- PON / ONU ---------------------------------------------------------------
+
+    def _in_pon(self, w: List[str], s: str, no: int):
+        olt, port = self.olt, self.port
+        c = w[0]
+        if c == "onu":
+            # onu ID type T [sn SN]
+            oid = int(w[1])
+            ty = w[w.index("type") + 1]
+            sn = w[w.index("sn") + 1] if "sn" in w else ""
+            key = (port, oid)
+            if not 0 < oid <= MAX_ONU_ID:
+                self.error(no, ONU_ID_INVALID, f"{s} (1..{MAX_ONU_ID})")
+            elif key in olt.onus:
+                self.error(no, ONU_DUPLICATE, f"{s} (gpon_onu-{port}:{oid} já existe)")
+            elif sn and sn in olt.sns:
+                other = olt.sns[sn]
+                self.error(no, SN_DUPLICATE, f"{s} (já em gpon_onu-{other[0]}:{other[1]})")
+            else:
+                olt.onus[key] = SimOnu(ty, sn)
+                if sn:
+                    olt.sns[sn] = key
+            return None
+        if c == "no" and w[1] == "onu":
+            key = (port, int(w[2]))
+            onu = olt.onus.pop(key, None)
+            if onu is None:
+                self.error(no, ONU_MISSING, s)
+            elif onu.sn:
+                olt.sns.pop(onu.sn, None)
+            return None
+        if c == "discover-period":
+            return None
+        return self._other(w, s, no)
+
+    def _in_onu(self, w: List[str], s: str, no: int):
+        onu = self.onu
+        c = w[0]
+        if c in ("description", "name"):
+            onu.desc = s[len(c):].strip()
+            return None
+        if c == "sn-bind":
+            return None
+        if c == "tcont":
+            # tcont N [name X] profile P
+            prof = w[w.index("profile") + 1]
+            if prof not in self.olt.profiles:
+                self.error(no, PROFILE_MISSING, s)
+            else:
+                onu.tconts[int(w[1])] = prof
+            return None
+        if c == "gemport":
+            # gemport N tcont T
+            tc = int(w[w.index("tcont") + 1])
+            if tc not in onu.tconts:
+                self.error(no, TCONT_MISSING, s)
+            else:
+                onu.gemports[int(w[1])] = tc
+            return None
+        if c == "no":
+            if w[1] == "gemport":
+                gp = int(w[2])
+                if gp not in onu.gemports:
+                    self.error(no, GEMPORT_MISSING, s)
+                elif gp in onu.vports or any(g == gp for g, _ in onu.services.values()):
+                    self.error(no, GEMPORT_IN_USE, s)
+                else:
+                    del onu.gemports[gp]
+                return None
+            if w[1] == "tcont":
+                tc = int(w[2])
+                if tc in onu.gemports.values():
+                    self.error(no, TCONT_MISSING, f"{s} (tcont em uso por gemport)")
+                elif onu.tconts.pop(tc, None) is None:
+                    self.error(no, TCONT_MISSING, s)
+                return None
+        return self._other(w, s, no)
+
+    def _in_vport(self, w: List[str], s: str, no: int):
+        onu, vp = self.onu, self.vport
+        if w[0] == "service-port":
+            # service-port SID user-vlan V vlan V
+            uv, vlan = int(w[w.index("user-vlan") + 1]), int(w[w.index("vlan") + 1])
+            if vlan not in self.olt.vlans:
+                self.error(no, VLAN_MISSING, s)
+            elif onu.vports.get(vp, (uv, vlan)) != (uv, vlan):
+                self.error(no, SERVICE_EXISTS, f"{s} (vport {vp} já tem service-port)")
+            else:
+                onu.vports[vp] = (uv, vlan)
+            return None
+        if w[0] == "no" and w[1] == "service-port":
+            if onu.vports.pop(vp, None) is None:
+                self.error(no, SERVICE_MISSING, s)
+            return None
+        return self._other(w, s, no)
+
+    def _in_mng(self, w: List[str], s: str, no: int):
+        onu, vlans = self.onu, self.olt.vlans
+        c = w[0]
+        if c == "service":
+            # service SID gemport G vlan V
+            sid, gp, vlan = int(w[1]), int(w[w.index("gemport") + 1]), int(w[w.index("vlan") + 1])
+            if gp not in onu.gemports:
+                self.error(no, GEMPORT_MISSING, s)
+            elif vlan not in vlans:
+                self.error(no, VLAN_MISSING, s)
+            elif onu.services.get(sid, (gp, vlan)) != (gp, vlan):
+                self.error(no, SERVICE_EXISTS, f"{s} (service {sid} já existe)")
+            else:
+                onu.services[sid] = (gp, vlan)
+            return None
+        if c == "vlan" and w[1] == "port":
+            # vlan port eth_0/U mode tag|untag [vlan V]
+            uni = int(w[2].rpartition("/")[2])
+            vlan = int(w[w.index("vlan", 3) + 1]) if "vlan" in w[3:] else 0
+            if vlan and vlan not in vlans:
+                self.error(no, VLAN_MISSING, s)
+            else:
+                onu.vlan_ports[(uni, vlan)] = w[w.index("mode") + 1].lower()
+            return None
+        if c == "wan-ip":
+            # wan-ip SID ipv4 mode pppoe username U password P vlan-profile V host 1
+            user = w[w.index("username") + 1]
+            i = w.index("password")
+            pw = w[i + 1] if w[i + 1] != "vlan-profile" else ""
+            onu.wan[int(w[1])] = (user, pw, w[w.index("vlan-profile") + 1])
+            return None
+        if c == "no":
+            if w[1] == "service":
+                if onu.services.pop(int(w[2]), None) is None:
+                    self.error(no, SERVICE_MISSING, s)
+                return None
+            if w[1] == "wan-ip":
+                if onu.wan.pop(int(w[2]), None) is None:
+                    self.error(no, SERVICE_MISSING, s)
+                return None
+        return self._other(w, s, no)
+
+
+# ---------------------------------------------------------------------------
+# Estado final x target_data
+
+def _vlan_ids(target_data: Dict[str, List[Dict[str, Any]]], vlan_offset: int) -> List[int]:
+    return sorted({int(v["vid"] or 0) + vlan_offset for v in target_data.get("vlans", []) if int(v["vid"] or 0) > 0})
+
+
+def compare(olt: SimOlt, target_data: Dict[str, List[Dict[str, Any]]], fast: Optional[Dict[str, Any]] = None,
+            limit: int = MAX_ISSUES) -> List[SimIssue]:
+    """Differences between the simulated OLT and what `target_data` asks for (ZTE target rows).
+
+    Expected state follows the render's intent: every ONU under fast frame/slot with the pon/vlan
+    offsets, its own services (by source slot/pon/onu), TCONT band = ONU upstream/assured.
+    """
+    fast = fast or {}
+    target_data = ZTEAdapter().records(target_data)
+    frame = str(fast.get("frame", "")).strip() or "[FRAME]"
+    slot = str(fast.get("slot", "")).strip() or "[SLOT]"
+    pon_offset = int(fast.get("pon_offset", 0) or 0)
+    vlan_offset = int(fast.get("vlan_offset", 0) or 0)
+    apply_all = bool(fast.get("apply_all_vlans_to_trunks", True))
+    out: List[SimIssue] = []
+
+    def diff(kind: str, detail: str) -> None:
+        if len(out) < limit:
+            out.append(SimIssue(kind, detail))
+
+    # VLANs / trunks
+    vlan_ids = _vlan_ids(target_data, vlan_offset)
+    want_vlans = set(vlan_ids)
+    for v in sorted(want_vlans - olt.vlans):
+        diff(VLAN_MISSING_STATE, f"VLAN {v}")
+    for v in sorted(olt.vlans - want_vlans):
+        diff(VLAN_EXTRA, f"VLAN {v}")
+    for tr in target_data.get("trunks", []):
+        ifname = str(tr["ifname"] or "").strip()
+        if not ifname:
+            continue
+        tagged = str(tr["tagged"] or "").upper()
+        if apply_all or tagged == "ALL":
+            want = want_vlans
+        else:
+            want = {int(p) + vlan_offset for p in tagged.replace(";", ",").split(",") if p.strip().isdigit()}
+        have = olt.trunks.get(ifname, set())
+        if want != have:
+            diff(TRUNK_DIFF, f"{ifname}: faltam {len(want - have)} VLANs, sobram {len(have - want)}")
+
+    # IPs / rotas / profiles
+    for itf in target_data.get("interfaces", []):
+        ifname, ip, mask = itf["ifname"], itf["ip"], itf["prefix_or_mask"]
+        if not ifname or not ip:
+            continue
+        want_ip = f"{ip}{mask}" if mask.startswith("/") else f"{ip} {mask}".strip()
+        if olt.ips.get(ifname) != want_ip:
+            diff(IP_DIFF, f"{ifname}: esperado {want_ip}, OLT {olt.ips.get(ifname) or '(sem IP)'}")
+    want_routes = {(r["prefix"], r["next_hop"]) for r in target_data.get("routes", []) if r["prefix"] and r["next_hop"]}
+    for r in sorted(want_routes - olt.routes):
+        diff(ROUTE_MISSING, f"{r[0]} via {r[1]}")
+    for r in sorted(olt.routes - want_routes):
+        diff(ROUTE_EXTRA, f"{r[0]} via {r[1]}")
+    for p in target_data.get("tcont_profiles", []):
+        name = p["name"] or "U1024000K_A640"
+        want_p = (int(p["dba_type"] or 3), int(p["assured_kbps"] or 0), int(p["max_kbps"] or 0))
+        if olt.profiles.get(name) != want_p:
+            diff(PROFILE_DIFF, f"{name}: esperado type/assured/max {want_p}, OLT {olt.profiles.get(name)}")
+
+    # ONUs e serviços
+    services: Dict[Tuple[int, int, int], List[Dict[str, Any]]] = {}
+    for s in target_data.get("services", []):
+        services.setdefault((s["slot"], s["pon"], s["onu_id"]), []).append(s)
+    expected: Dict[OnuKey, Dict[str, Any]] = {}
+    for o in target_data.get("onus", []):
+        pon, oid = o["pon"] + pon_offset, o["onu_id"]
+        if pon <= 0 or oid <= 0:
+            continue
+        key = (f"{frame}/{slot}/{pon}", oid)
+        src = (o["slot"], o["pon"], oid)
+        if key in expected:
+            diff(ONU_COLLISION, f"origens {expected[key]['src']} e {src} caem em gpon_onu-{key[0]}:{oid}")
+            continue
+        expected[key] = {"src": src, "onu": o}
+
+    for key, exp in expected.items():
+        o = exp["onu"]
+        name = f"gpon_onu-{key[0]}:{key[1]}"
+        got = olt.onus.get(key)
+        if got is None:
+            diff(ONU_MISSING_STATE, f"{name} (origem {exp['src']})")
+            continue
+        want_ty = o["onu_type"] or "unknown"
+        if (got.sn, got.onu_type, got.desc) != (o["sn"], want_ty, o["name"]):
+            diff(ONU_DIFF, f"{name}: esperado sn={o['sn']} type={want_ty} desc='{o['name']}', "
+                           f"OLT sn={got.sn} type={got.onu_type} desc='{got.desc}'")
+        if o["upstream_kbps"]:
+            prof = olt.profiles.get(got.tconts.get(1, ""))
+            band = (prof[2], prof[1]) if prof else None
+            if band != (o["upstream_kbps"], o["upstream_assured"]):
+                diff(BAND_DIFF, f"{name}: esperado {o['upstream_kbps']}/{o['upstream_assured']} kbps, "
+                                f"tcont 1 = {got.tconts.get(1, '(nenhum)')} {band or ''}")
+        want_sids = set()
+        for s in services.get(exp["src"], ()):
+            vlan = s["vlan"] + vlan_offset
+            if vlan <= 0:
+                continue
+            sid = s["svc_local_id"] or 1
+            want_sids.add(sid)
+            have = got.services.get(sid)
+            if have is None:
+                diff(SERVICE_MISSING_STATE, f"{name} service {sid} (VLAN {vlan})")
+                continue
+            problems = []
+            if have[1] != vlan:
+                problems.append(f"VLAN {have[1]} em vez de {vlan}")
+            if got.vports.get(sid, (0, 0))[1] != vlan:
+                problems.append("sem service-port na vport")
+            mode = "untag" if s["mode"].lower() == "untag" else "tag"
+            if got.vlan_ports.get((s["uni_port"] or 1, vlan)) != mode:
+                problems.append(f"eth_0/{s['uni_port'] or 1} não está {mode} na VLAN {vlan}")
+            if s["pppoe_user"] and got.wan.get(sid, ("", ""))[:2] != (s["pppoe_user"], s["pppoe_pass"]):
+                problems.append("PPPoE diferente")
+            if problems:
+                diff(SERVICE_DIFF, f"{name} service {sid}: " + "; ".join(problems))
+        for sid in sorted(set(got.services) - want_sids):
+            diff(SERVICE_EXTRA, f"{name} service {sid} (VLAN {got.services[sid][1]})")
+    for key in olt.onus.keys() - expected.keys():
+        diff(ONU_EXTRA, f"gpon_onu-{key[0]}:{key[1]}")
+    return out
+
+
+@dataclass
+class SimReport:
+    olt: SimOlt
+    lines: int = 0
+    commands: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+    errors: List[SimIssue] = field(default_factory=list)      # até MAX_ISSUES
+    error_counts: Dict[str, int] = field(default_factory=dict)
+    diffs: List[SimIssue] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.error_counts and not self.diffs
+
+    def summary(self) -> str:
+        errs = sum(self.error_counts.values())
+        rate = self.lines / self.seconds if self.seconds else 0.0
+        return (f"{self.lines} linhas, {self.commands} comandos em {self.seconds:.2f}s ({rate:,.0f} linhas/s): "
+                f"{errs} recusados, {self.skipped} pulados, {len(self.diffs)} diferenças; OLT final: {self.olt.summary()}")
+
+
+def verify_script(script: str | Iterable[str], target_data: Optional[Dict[str, List[Dict[str, Any]]]] = None,
+                  fast: Optional[Dict[str, Any]] = None, olt: Optional[SimOlt] = None) -> SimReport:
+    """Apply `script` (text or lines) to `olt` (default: empty OLT) and compare with `target_data`.
+
+    Para conferir um render_delta, passe em `olt` o estado já simulado do script anterior.
+    """
+    lines = script.splitlines() if isinstance(script, str) else script
+    with span("zte_sim.verify"):
+        t0 = time.perf_counter()
+        sim = ZteSimulator(olt).apply(lines)
+        seconds = time.perf_counter() - t0
+        diffs = compare(sim.olt, target_data, fast) if target_data is not None else []
+    return SimReport(sim.olt, sim.lines, sim.commands, sim.skipped, seconds, sim.errors, sim.error_counts, diffs)
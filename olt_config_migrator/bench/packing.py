@@ -0,0 +1,67 @@
+"""Benchmark dos renders Parks/Datacom/Huawei/V-Solution com trunks de range cheio.
+
+Uso (a partir de olt_config_migrator/):
+    python -m bench.packing [--json saida.json]
+"""
+from __future__ import annotations
+import argparse
+import json
+import time
+from typing import Any, Dict, List
+
+from app.models import NormalizedConfig, Vlan
+from app.utils import script_stats
+from app.vendors.registry import get_registry
+
+VENDORS = ("parks", "datacom", "huawei", "vsol")
+
+# layouts de VLAN: range cheio, só ímpares (pior caso: nenhum range) e blocos de 10
+LAYOUTS = {
+    "full_1_4094": list(range(1, 4095)),
+    "odd_only": list(range(1, 4095, 2)),
+    "blocks_of_10": [v for v in range(1, 4095) if (v // 10) % 2 == 0],
+}
+
+
+def run(repeat: int = 5) -> List[Dict[str, Any]]:
+    reg = get_registry()
+    results: List[Dict[str, Any]] = []
+    for layout, vids in LAYOUTS.items():
+        n = NormalizedConfig(vlans=[Vlan(vid=v) for v in vids])
+        for vid in VENDORS:
+            ad = reg[vid]
+            data = ad.from_normalized(n)
+            data["trunks"] = [{"ifname": "uplink1", "tagged": "ALL", "pvid": 1}, {"ifname": "uplink2", "tagged": "ALL", "pvid": 1}]
+            best = float("inf")
+            script = ""
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                script = ad.render(data, {})
+                best = min(best, time.perf_counter() - t0)
+            st = script_stats(script)
+            results.append({
+                "layout": layout, "vendor": vid, "vlans": len(vids),
+                "lines": st["lines"], "commands": st["commands"], "bytes": st["bytes"],
+                "max_line": max(len(x) for x in script.splitlines()),
+                "render_ms": round(best * 1000, 3),
+            })
+    return results
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--json", help="grava os resultados em JSON")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    res = run(args.repeat)
+    print(f"{'layout':<14} {'vendor':<8} {'lines':>6} {'cmds':>6} {'bytes':>7} {'maxlen':>6} {'ms':>8}")
+    for r in res:
+        print(f"{r['layout']:<14} {r['vendor']:<8} {r['lines']:>6} {r['commands']:>6} {r['bytes']:>7} {r['max_line']:>6} {r['render_ms']:>8}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Pior caso das linhas 'set wancfg' / 'set white phy addr' do parser Fiberhome.
+
+Compara as regexes antigas (com '.+?' encadeados) com o tokenizador linear
+atual em linhas longas/truncadas que nunca fecham o padrão, e confere que os
+dois dão o mesmo resultado em linhas válidas.
+
+Uso (a partir de olt_config_migrator/):
+    python -m bench.pathological [--max-tokens 1000] [--budget-ms 50]
+Sai com código 1 se o tokenizador passar do orçamento por linha.
+"""
+from __future__ import annotations
+import argparse
+import re
+import sys
+import time
+from typing import Callable, List
+
+from app.vendors.fiberhome import _match_onu_auth, _match_wancfg
+
+from .synth import SynthParams, iter_backup_lines
+
+# Regexes removidas do parser, mantidas aqui só como referência
+OLD_WAN_PPPOE = re.compile(r"^set\s+wancfg\s+sl\s+(\d+)\s+(\d+)\s+(\d+)\s+ind\s+(\d+).+?\bty\s+r\s+(\d+)\b.+?\bdsp\s+pppoe\b.*?\bacz\/([^\s]+)\s+key:([^\s]+)", re.I)
+OLD_ONU_AUTH = re.compile(r"^set\s+white\s+phy\s+addr\s+(\S+)\s+.*?\badd\s+sl\s+(\d+)\s+p\s+(\d+)\s+o\s+(\d+)\s+ty\s+(\S+)", re.I)
+
+
+def _wan_lines(tokens: int) -> List[str]:
+    reps = max(1, tokens // 4)
+    return [
+        # muitos 'ty r N' e 'dsp pppoe', mas nenhum acz/key (export truncado)
+        "set wancfg sl 1 1 1 ind 1 " + "ty r 100 dsp pppoe " * reps,
+        # nunca chega ao 'dsp pppoe'
+        "set wancfg sl 1 1 1 ind 1 " + "ty r 100 mode inter " * reps,
+        # lixo sem espaços no meio
+        "set wancfg sl 1 1 1 ind 1 ty r 100 " + "x" * (tokens * 4),
+    ]
+
+
+def _auth_lines(tokens: int) -> List[str]:
+    reps = max(1, tokens // 4)
+    return [
+        "set white phy addr FHTT00000001 " + "add sl 1 p " * reps,
+        "set white phy addr FHTT00000001 " + "pas null ac " * reps,
+    ]
+
+
+def _worst(fn: Callable[[str], object], lines: List[str], repeat: int = 3) -> float:
+    worst = 0.0
+    for line in lines:
+        best = float("inf")
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn(line)
+            best = min(best, time.perf_counter() - t0)
+        worst = max(worst, best)
+    return worst
+
+
+def check_equivalence() -> int:
+    """Old regex vs tokenizer on a synthetic backup; returns number of mismatches."""
+    bad = 0
+    for line in iter_backup_lines(SynthParams(slots=1, pons=4, onus_per_pon=32, services_per_onu=2, pppoe_ratio=1.0)):
+        m = OLD_WAN_PPPOE.match(line)
+        old = (int(m.group(1)), int(m.group(2)), int(m.group(3)), int(m.group(4)), int(m.group(5)), m.group(6), m.group(7)) if m else None
+        if old != _match_wancfg(line):
+            bad += 1
+        m = OLD_ONU_AUTH.match(line)
+        old2 = (m.group(1), int(m.group(2)), int(m.group(3)), int(m.group(4)), m.group(5)) if m else None
+        if old2 != _match_onu_auth(line):
+            bad += 1
+    return bad
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--max-tokens", type=int, default=1000)
+    ap.add_argument("--budget-ms", type=float, default=50.0, help="tempo máximo aceitável por linha (tokenizador)")
+    ap.add_argument("--skip-old", action="store_true", help="não mede as regexes antigas (podem levar minutos)")
+    args = ap.parse_args()
+
+    mismatches = check_equivalence()
+    print(f"equivalência regex antiga x tokenizador: {mismatches} divergências")
+
+    print(f"{'tokens':>7} {'wan regex ms':>13} {'wan tok ms':>11} {'auth regex ms':>14} {'auth tok ms':>12}")
+    size = 250
+    worst_tok = 0.0
+    while size <= args.max_tokens:
+        wl, al = _wan_lines(size), _auth_lines(size)
+        wt = _worst(_match_wancfg, wl)
+        at = _worst(_match_onu_auth, al)
+        worst_tok = max(worst_tok, wt, at)
+        if args.skip_old:
+            wo = ao = float("nan")
+        else:
+            wo = _worst(OLD_WAN_PPPOE.match, wl, repeat=1)
+            ao = _worst(OLD_ONU_AUTH.match, al, repeat=1)
+        print(f"{size:>7} {wo * 1000:>13.2f} {wt * 1000:>11.3f} {ao * 1000:>14.2f} {at * 1000:>12.3f}")
+        size *= 2
+
+    ok = mismatches == 0 and worst_tok * 1000 <= args.budget_ms
+    print(f"pior caso do tokenizador: {worst_tok * 1000:.3f} ms/linha (orçamento {args.budget_ms} ms) -> {'OK' if ok else 'FALHOU'}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Suite de escala do pipeline Fiberhome -> ZTE (tempo e pico de memória por etapa).
+
+Gera backups sintéticos (bench.synth) de 1k a 1M ONUs e mede cada etapa:
+read_text_smart, parse_to_normalized, from_normalized, render, render otimizado e
+a leitura de volta do script pelo parser de running-config ZTE.
+Os resultados vão para JSON (por padrão bench/results/<commit>.json) para comparar commits.
+
+Uso (a partir de olt_config_migrator/):
+    python -m bench.pipeline                                # 1k,10k,100k,1M
+    python -m bench.pipeline --scales 1000,10000 --no-memory
+    python -m bench.pipeline --compare bench/results/abc1234.json
+
+1M ONUs gera um backup de ~400 MB e precisa de vários GB de RAM.
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.utils import read_text_smart
+from app.vendors.fiberhome import FiberhomeAdapter
+from app.vendors.zte import ZTEAdapter
+
+from .synth import SynthParams, VLAN_LAYOUTS, write_backup
+
+DEFAULT_SCALES = (1_000, 10_000, 100_000, 1_000_000)
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(__file__), timeout=10)
+        return out.stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def _measure(fn: Callable[[], Any], memory: bool) -> Tuple[Any, float, float]:
+    """Run fn; returns (result, seconds, peak MiB or -1).
+
+    tracemalloc deixa o Python várias vezes mais lento, então o tempo vem de
+    uma execução sem rastreio e o pico de memória de uma segunda execução.
+    """
+    gc.collect()
+    t0 = time.perf_counter()
+    res = fn()
+    dt = time.perf_counter() - t0
+    peak = -1.0
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+    return res, dt, peak
+
+
+def run_scale(onus: int, params: Dict[str, Any], workdir: str, memory: bool) -> List[Dict[str, Any]]:
+    p = SynthParams.for_onus(onus, **params)
+    path = os.path.join(workdir, f"fh_{onus}.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        lines = write_backup(p, f)
+    size = os.path.getsize(path)
+
+    fh = FiberhomeAdapter()
+    zte = ZTEAdapter()
+    fast = {"frame": "1", "slot": "1"}
+    rows: List[Dict[str, Any]] = []
+
+    def rec(stage: str, fn: Callable[[], Any], items: Callable[[Any], int]) -> Any:
+        res, dt, peak = _measure(fn, memory)
+        rows.append({"onus": p.total_onus, "stage": stage, "seconds": round(dt, 4),
+                     "peak_mib": round(peak, 2), "items": items(res),
+                     "backup_lines": lines, "backup_bytes": size})
+        print(f"  {stage:<18} {dt:9.3f}s  peak {peak:9.1f} MiB  items {rows[-1]['items']}")
+        return res
+
+    print(f"{p.total_onus} ONUs ({lines} linhas, {size / 1e6:.1f} MB)")
+    text = rec("read_text_smart", lambda: read_text_smart(path), len)
+    normalized = rec("parse_to_normalized", lambda: fh.parse_to_normalized(text), lambda n: len(n.onus) + len(n.services))
+    del text
+    target = rec("from_normalized", lambda: zte.from_normalized(normalized), lambda d: sum(len(v) for v in d.values()))
+    script = rec("render", lambda: zte.render(target, fast), lambda s: s.count("\n") + 1)
+    rec("render_optimized", lambda: zte.render(target, {**fast, "optimized": True}), lambda s: s.count("\n") + 1)
+    # leitura de volta do script como se fosse o running-config da OLT
+    rec("zte_parse_running", lambda: zte.parse_to_normalized(script), lambda n: len(n.onus) + len(n.services))
+    os.remove(path)
+    return rows
+
+
+def compare(cur: Dict[str, Any], base: Dict[str, Any]) -> None:
+    idx = {(r["onus"], r["stage"]): r for r in base.get("results", [])}
+    print(f"\ncomparação com {base.get('meta', {}).get('commit', '?')}:")
+    print(f"{'onus':>8} {'stage':<18} {'base s':>9} {'atual s':>9} {'x':>6} {'base MiB':>9} {'atual MiB':>9}")
+    for r in cur["results"]:
+        b = idx.get((r["onus"], r["stage"]))
+        if not b:
+            continue
+        ratio = r["seconds"] / b["seconds"] if b["seconds"] else float("nan")
+        print(f"{r['onus']:>8} {r['stage']:<18} {b['seconds']:>9.3f} {r['seconds']:>9.3f} {ratio:>6.2f} {b['peak_mib']:>9.1f} {r['peak_mib']:>9.1f}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scales", default=",".join(str(s) for s in DEFAULT_SCALES), help="ONUs por rodada, CSV")
+    ap.add_argument("--pons", type=int, default=16)
+    ap.add_argument("--onus-per-pon", type=int, default=128)
+    ap.add_argument("--services", type=int, default=2)
+    ap.add_argument("--pppoe-ratio", type=float, default=0.7)
+    ap.add_argument("--vlan-layout", choices=VLAN_LAYOUTS, default="ranges")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--no-memory", action="store_true", help="pula a medição de pico com tracemalloc (bem mais rápido)")
+    ap.add_argument("--out", help="arquivo JSON de saída (padrão bench/results/<commit>.json)")
+    ap.add_argument("--compare", help="JSON de uma rodada anterior para comparar")
+    ap.add_argument("--workdir", help="onde gravar os backups temporários")
+    args = ap.parse_args()
+
+    params = dict(pons=args.pons, onus_per_pon=args.onus_per_pon, services_per_onu=args.services,
+                  pppoe_ratio=args.pppoe_ratio, vlan_layout=args.vlan_layout, seed=args.seed)
+    commit = _git_commit()
+    report: Dict[str, Any] = {
+        "meta": {"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+                 "date": time.strftime("%Y-%m-%dT%H:%M:%S"), "memory": not args.no_memory, "params": params},
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory(dir=args.workdir) as wd:
+        for s in (int(x) for x in args.scales.split(",") if x.strip()):
+            report["results"].extend(run_scale(s, params, wd, not args.no_memory))
+
+    out = args.out or os.path.join(RESULTS_DIR, f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nresultados em {out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
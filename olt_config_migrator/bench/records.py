@@ -0,0 +1,74 @@
+"""Render com linhas já tipadas (Records) x linhas cruas do editor.
+
+Linhas cruas (strings, como vinham do editor antes) são convertidas a cada render;
+Records são convertidos uma vez ao montar/editar a tabela e o render só lê os campos.
+A diferença é o custo por render que sai do caminho da prévia/geração.
+
+Uso (a partir de olt_config_migrator/):
+    python -m bench.records                           # 10k e 50k ONUs, 2 serviços por ONU
+    python -m bench.records --onus 100000 --vendors zte --repeat 3
+"""
+from __future__ import annotations
+import argparse
+import time
+from typing import Any, Dict, List
+
+from app.batch import build_target_data
+from app.vendors.registry import get_registry
+
+from .synth import SynthParams, iter_backup_lines
+
+VENDORS = ("zte", "huawei")
+
+
+def _raw(target_data: Dict[str, List[Dict[str, Any]]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Same rows with every value as text (what the table editor used to store)."""
+    return {k: [{c: str(v) for c, v in r.items()} for r in rows] for k, rows in target_data.items()}
+
+
+def _best(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def run(onus: int, vendors: List[str], repeat: int) -> List[Dict[str, Any]]:
+    reg = get_registry()
+    p = SynthParams.for_onus(onus, services_per_onu=2, pppoe_ratio=0.7)
+    normalized = reg["fiberhome"].parse_lines(iter_backup_lines(p))
+    fast = {"frame": "1", "slot": "1"}
+    rows = []
+    for vid in vendors:
+        ad = reg[vid]
+        typed = build_target_data(vid, normalized, fast)
+        raw = _raw(typed)
+        assert ad.render(raw, fast) == ad.render(typed, fast)
+        t_raw = _best(lambda: ad.render(raw, fast), repeat)
+        t_typed = _best(lambda: ad.render(typed, fast), repeat)
+        t_coerce = _best(lambda: ad.records(raw), repeat)
+        rows.append({"vendor": vid, "onus": p.total_onus, "services": len(normalized.services),
+                     "raw_s": t_raw, "typed_s": t_typed, "coerce_once_s": t_coerce})
+    return rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--onus", default="10000,50000", help="escalas (CSV)")
+    ap.add_argument("--vendors", default=",".join(VENDORS))
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+    vendors = [v.strip() for v in args.vendors.split(",") if v.strip()]
+    print(f"{'destino':<8}{'ONUs':>8}{'serviços':>10}{'cru ms':>10}{'tipado ms':>11}{'ganho':>8}{'conversão ms':>14}")
+    for scale in (int(x) for x in args.onus.split(",") if x.strip()):
+        for r in run(scale, vendors, max(1, args.repeat)):
+            gain = 1 - r["typed_s"] / r["raw_s"] if r["raw_s"] else 0.0
+            print(f"{r['vendor']:<8}{r['onus']:>8}{r['services']:>10}{r['raw_s'] * 1000:>10.1f}"
+                  f"{r['typed_s'] * 1000:>11.1f}{gain:>8.0%}{r['coerce_once_s'] * 1000:>14.1f}")
+    print("conversão = custo único de records() (montagem/edição da tabela)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Teste de carga do serviço HTTP (app/service.py): vazão e latência.
+
+Sobe o serviço no próprio processo numa porta livre (ou usa --url de um já rodando) e
+dispara pedidos POST /migrate de vários clientes ao mesmo tempo, com backups sintéticos
+distintos (sem cache) ou repetidos (--repeat-backups, mede o cache). Mostra pedidos/s,
+latência p50/p95/p99 e quantos voltaram 503 (fila cheia) / 504 (timeout).
+
+Uso (a partir de olt_config_migrator/):
+    python -m bench.service                                  # ~200 ONUs/backup, 8 clientes, 64 pedidos
+    python -m bench.service --onus 2000 --clients 16 --requests 128 --workers 4 --queue 8
+    python -m bench.service --url http://127.0.0.1:8765 --repeat-backups 4
+"""
+from __future__ import annotations
+import argparse
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from app.service import MigrationService, make_server
+
+from .synth import SynthParams, iter_backup_lines
+
+
+def _backups(onus: int, count: int) -> Tuple[List[bytes], int]:
+    """`count` distinct synthetic Fiberhome backups (different seeds) and their ONU count."""
+    out = []
+    p = SynthParams.for_onus(onus, services_per_onu=2, pppoe_ratio=0.7)
+    for seed in range(count):
+        p.seed = seed + 1
+        out.append("\n".join(iter_backup_lines(p)).encode("utf-8"))
+    return out, p.total_onus
+
+
+def _post(url: str, body: bytes, timeout: float) -> Tuple[int, float]:
+    req = urllib.request.Request(f"{url}/migrate?to=zte&from=fiberhome&name=bench.txt", data=body,
+                                 headers={"Content-Type": "text/plain"}, method="POST")
+    t0 = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            r.read()
+            status = r.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except OSError:
+        status = 0  # conexão recusada/derrubada
+    return status, time.perf_counter() - t0
+
+
+def _pct(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def run(url: str, backups: List[bytes], clients: int, requests: int, timeout: float) -> Dict[str, object]:
+    lat: List[float] = []
+    codes: Dict[int, int] = {}
+    lock = threading.Lock()
+
+    def one(i: int) -> None:
+        status, dt = _post(url, backups[i % len(backups)], timeout)
+        with lock:
+            codes[status] = codes.get(status, 0) + 1
+            if status == 200:
+                lat.append(dt)
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as ex:
+        list(ex.map(one, range(requests)))
+    wall = time.perf_counter() - t0
+    return {"wall_s": wall, "ok": len(lat), "codes": codes, "rps": len(lat) / wall if wall else 0.0,
+            "p50": _pct(lat, 0.50), "p95": _pct(lat, 0.95), "p99": _pct(lat, 0.99),
+            "mean": statistics.mean(lat) if lat else 0.0}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", default="", help="serviço já rodando (padrão: sobe um aqui)")
+    ap.add_argument("--onus", type=int, default=200, help="ONUs por backup")
+    ap.add_argument("--clients", type=int, default=8)
+    ap.add_argument("--requests", type=int, default=64)
+    ap.add_argument("--repeat-backups", type=int, default=0,
+                    help="usa só N backups diferentes (os repetidos saem do cache)")
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--queue", type=int, default=8)
+    ap.add_argument("--timeout", type=float, default=120.0)
+    args = ap.parse_args()
+
+    backups, total_onus = _backups(args.onus, args.repeat_backups or args.requests)
+    server = service = None
+    url = args.url.rstrip("/")
+    if not url:
+        service = MigrationService(args.workers, args.queue, args.timeout)
+        server = make_server(service, port=0, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        _post(url, backups[0], args.timeout)  # aquece os processos do pool
+        with service.lock:
+            service.cache.clear()
+    try:
+        r = run(url, backups, args.clients, args.requests, args.timeout + 5)
+    finally:
+        if server is not None:
+            server.shutdown()
+            service.close()
+    print(f"{args.requests} pedidos, {args.clients} clientes, {len(backups)} backups distintos de "
+          f"{len(backups[0]) / 1024:.0f} KB ({total_onus} ONUs)")
+    print(f"vazão      {r['rps']:.1f} pedidos/s  ({r['ok']} ok em {r['wall_s']:.1f}s)")
+    print(f"latência   p50 {r['p50'] * 1000:.0f} ms | p95 {r['p95'] * 1000:.0f} ms | "
+          f"p99 {r['p99'] * 1000:.0f} ms | média {r['mean'] * 1000:.0f} ms")
+    print("status     " + ", ".join(f"{k or 'conexão'}: {v}" for k, v in sorted(r["codes"].items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Tempo de abertura do wizard (import + tema + MigrationWizard + primeira pintura).
+
+Cada execução roda num processo novo (partida a frio, como o usuário abrindo o
+programa) e o resultado é a mediana. Sai com código 1 se a mediana passar do alvo,
+então serve de verificação antes de um release; tests/test_startup.py aplica o mesmo
+alvo no pytest (pulado sem PyQt6).
+
+Uso (a partir de olt_config_migrator/):
+    python -m bench.startup                    # 5 execuções, alvo padrão
+    python -m bench.startup --runs 9 --target-ms 600
+    QT_QPA_PLATFORM=offscreen python -m bench.startup   # sem display (CI)
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+# Alvo para a janela pronta, medido do começo dos imports ao fim da primeira pintura
+# (sem contar a subida do interpretador). Referência: notebook de escritório, SSD.
+STARTUP_TARGET_MS = 800.0
+STAGES = ("import", "theme", "wizard", "show")
+
+
+def _child() -> None:
+    """Runs in the measured process: prints one JSON line with ms per stage."""
+    t0 = time.perf_counter()
+    from PyQt6.QtWidgets import QApplication
+    from app.styles import apply_metro_theme
+    from app.wizard import MigrationWizard
+    t1 = time.perf_counter()
+    app = QApplication([sys.argv[0]])
+    apply_metro_theme(app)
+    t2 = time.perf_counter()
+    w = MigrationWizard()
+    t3 = time.perf_counter()
+    w.show()
+    app.processEvents()
+    t4 = time.perf_counter()
+    marks = (t0, t1, t2, t3, t4)
+    print(json.dumps({s: (marks[i + 1] - marks[i]) * 1000 for i, s in enumerate(STAGES)}))
+    w.close()
+
+
+def measure(runs: int) -> List[Dict[str, float]]:
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    out = []
+    for _ in range(runs):
+        p = subprocess.run([sys.executable, "-m", "bench.startup", "--child"], cwd=root,
+                           capture_output=True, text=True, timeout=120)
+        if p.returncode != 0:
+            raise RuntimeError(p.stderr.strip() or f"processo terminou com código {p.returncode}")
+        out.append(json.loads(p.stdout.strip().splitlines()[-1]))
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--target-ms", type=float, default=STARTUP_TARGET_MS)
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        _child()
+        return
+
+    results = measure(max(1, args.runs))
+    med = {s: statistics.median(r[s] for r in results) for s in STAGES}
+    total = statistics.median(sum(r.values()) for r in results)
+    print(f"{'etapa':<10}{'mediana ms':>12}")
+    for s in STAGES:
+        print(f"{s:<10}{med[s]:>12.1f}")
+    print(f"{'total':<10}{total:>12.1f}   (alvo {args.target_ms:.0f} ms, {len(results)} execuções)")
+    if total > args.target_ms:
+        print("ACIMA DO ALVO", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Gerador determinístico (seed) de backups Fiberhome AN5516 sintéticos.
+
+Uso (a partir de olt_config_migrator/):
+    python -m bench.synth saida.txt --slots 2 --pons 16 --onus-per-pon 64 --services 2 --pppoe-ratio 0.7
+    python -m bench.synth saida.txt --onus 100000      # calcula slots automaticamente
+"""
+from __future__ import annotations
+import argparse
+import math
+import random
+from dataclasses import dataclass
+from typing import Iterator, List, TextIO
+
+ONU_TYPES = ("5506-04-F1", "5506-04-FA", "5506-01-A1", "HG260", "AN5506-02-B")
+
+# Como as VLANs de serviço são distribuídas:
+#   ranges  -> um bloco de VLANs por PON (ex.: PON 3 usa 300..3xx), backup tem 'add vlan' em ranges
+#   sparse  -> VLANs espalhadas (muitos ranges de 1 VLAN), pior caso para compressão
+#   single  -> todas as ONUs na mesma VLAN de serviço
+VLAN_LAYOUTS = ("ranges", "sparse", "single")
+
+
+@dataclass
+class SynthParams:
+    slots: int = 1
+    pons: int = 16
+    onus_per_pon: int = 64
+    services_per_onu: int = 1
+    pppoe_ratio: float = 0.5
+    vlan_layout: str = "ranges"
+    seed: int = 42
+
+    @property
+    def total_onus(self) -> int:
+        return self.slots * self.pons * self.onus_per_pon
+
+    @classmethod
+    def for_onus(cls, onus: int, **kw) -> "SynthParams":
+        """Params with ~`onus` ONUs, growing the slot count (no chassis limit: it's a benchmark)."""
+        p = cls(**kw)
+        p.pons = max(1, min(p.pons, math.ceil(onus / p.onus_per_pon)))
+        p.slots = max(1, math.ceil(onus / (p.pons * p.onus_per_pon)))
+        return p
+
+
+def _service_vlan(p: SynthParams, rnd: random.Random, slot: int, pon: int, svc: int) -> int:
+    if p.vlan_layout == "single":
+        return 100 + svc - 1
+    if p.vlan_layout == "sparse":
+        return rnd.randrange(2, 4000, 2)
+    base = 100 + ((slot - 1) * p.pons + (pon - 1)) * 8
+    return (base % 3900) + svc
+
+
+def _vlan_header(p: SynthParams) -> Iterator[str]:
+    yield "set manage_vlan 4000 gerencia"
+    if p.vlan_layout == "single":
+        yield "add vlan vlan_begin 100 vlan_end 110 tag uplink 19:1"
+    elif p.vlan_layout == "sparse":
+        for v in range(2, 4000, 2):
+            yield f"add vlan vlan_begin {v} vlan_end {v} tag uplink 19:1"
+    else:
+        for a in range(100, 4000, 250):
+            yield f"add vlan vlan_begin {a} vlan_end {min(a + 249, 3999)} tag uplink 19:1"
+    yield "set manage vlan name gerencia ip 10.10.0.2/24"
+    yield "set debugip 192.168.1.100 mask 255.255.255.0"
+    yield "add static route destination 0.0.0.0 gateway 10.10.0.1 mask 0.0.0.0"
+
+
+def iter_backup_lines(p: SynthParams) -> Iterator[str]:
+    """Yield the backup line by line (no full copy in memory), sections in AN5516 order."""
+    rnd = random.Random(p.seed)
+    yield "!ver AN5516-06 RP1000"
+    yield from _vlan_header(p)
+
+    # sorteios por ONU feitos uma vez para que todas as seções concordem
+    bands = [(1024000, 640), (512000, 512), (204800, 256), (102400, 128), (1024000, 1024)]
+    keys = [(sl, pon, o) for sl in range(1, p.slots + 1) for pon in range(1, p.pons + 1) for o in range(1, p.onus_per_pon + 1)]
+
+    for sl, pon, o in keys:
+        sn = f"FHTT{rnd.getrandbits(32):08x}"
+        yield f"set white phy addr {sn} pas null ac add sl {sl} p {pon} o {o} ty {rnd.choice(ONU_TYPES)}"
+
+    for sl, pon, o in keys:
+        up, assured = bands[rnd.randrange(len(bands))]
+        yield f"set ep sl {sl} pon {pon} onu {o} band upstream_band {up} downstream_band {up} upstream_assured {assured} upstream_fix 0"
+
+    svc_vlans: List[List[int]] = []
+    for sl, pon, o in keys:
+        vl = [_service_vlan(p, rnd, sl, pon, s) for s in range(1, p.services_per_onu + 1)]
+        svc_vlans.append(vl)
+        for s, vlan in enumerate(vl, start=1):
+            yield f"set ep sl {sl} p {pon} o {o} p {s} serv {s} vlan_m tra 255 33024 {vlan}"
+
+    for (sl, pon, o), vl in zip(keys, svc_vlans):
+        if rnd.random() >= p.pppoe_ratio:
+            continue
+        vlan = vl[0]
+        user = f"cli{sl:02d}{pon:02d}{o:03d}@isp"
+        yield (f"set wancfg sl {sl} {pon} {o} ind 1 mode inter ty r {vlan} 0 nat en qos dis "
+               f"dsp pppoe pro dis acz/{user} key:{rnd.getrandbits(24):06x} null auto entries 6 fe1 fe2 fe3 fe4 ssid1 ssid5")
+
+
+def write_backup(p: SynthParams, out: TextIO) -> int:
+    """Write the backup to `out`; returns the number of lines written."""
+    n = 0
+    for line in iter_backup_lines(p):
+        out.write(line)
+        out.write("\n")
+        n += 1
+    return n
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("path")
+    ap.add_argument("--onus", type=int, default=0, help="total aproximado de ONUs (sobrepõe --slots)")
+    ap.add_argument("--slots", type=int, default=1)
+    ap.add_argument("--pons", type=int, default=16)
+    ap.add_argument("--onus-per-pon", type=int, default=64)
+    ap.add_argument("--services", type=int, default=1, help="serviços por ONU")
+    ap.add_argument("--pppoe-ratio", type=float, default=0.5)
+    ap.add_argument("--vlan-layout", choices=VLAN_LAYOUTS, default="ranges")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    kw = dict(pons=args.pons, onus_per_pon=args.onus_per_pon, services_per_onu=args.services,
+              pppoe_ratio=args.pppoe_ratio, vlan_layout=args.vlan_layout, seed=args.seed)
+    p = SynthParams.for_onus(args.onus, **kw) if args.onus else SynthParams(slots=args.slots, **kw)
+    with open(args.path, "w", encoding="utf-8") as f:
+        n = write_backup(p, f)
+    print(f"{args.path}: {n} linhas, {p.total_onus} ONUs")
+
+
+if __name__ == "__main__":
+    main()
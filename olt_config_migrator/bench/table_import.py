@@ -0,0 +1,62 @@
+"""Importação de planilha nos editores (app/table_import.py): tempo do plano de upsert.
+
+Monta a tabela de serviços ZTE com N linhas e uma planilha CSV (';', cp1252, como o Excel
+grava) com M linhas: metade atualiza linhas existentes (login/senha/VLAN), metade é nova.
+Mede leitura + plano (em memória e lendo de um projeto .oltproj) e a aplicação das células.
+
+Uso (a partir de olt_config_migrator/):
+    python -m bench.table_import                    # 200k linhas na tabela, planilha de 100k
+    python -m bench.table_import --rows 500000 --file-rows 200000
+"""
+from __future__ import annotations
+import argparse
+import os
+import tempfile
+import time
+
+from app.project import ProjectStore
+from app.records import section_records
+from app.table_import import plan_import_file
+from app.vendors.zte import ZTEAdapter
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=200_000, help="linhas na tabela de serviços")
+    ap.add_argument("--file-rows", type=int, default=100_000, help="linhas na planilha")
+    args = ap.parse_args()
+
+    svc = next(s for s in ZTEAdapter().schema() if s.key == "services")
+    keys = [(1 + i // 4096, 1 + i // 256 % 16, 1 + i // 2 % 128, 1 + i % 2) for i in range(args.rows + args.file_rows)]
+    rows = section_records(svc, [{"slot": sl, "pon": p, "onu_id": o, "svc_local_id": s, "uni_port": 1,
+                                  "vlan": 100 + p, "mode": "tag"} for sl, p, o, s in keys[:args.rows]])
+    start = args.rows - args.file_rows // 2
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "servicos.csv")
+        with open(path, "w", encoding="cp1252") as f:
+            f.write("Slot;PON;ONU;Serviço;VLAN;Usuário;Senha\n")
+            for i, (sl, p, o, s) in enumerate(keys[start:start + args.file_rows]):
+                f.write(f"{sl};{p};{o};{s};{200 + p if i % 3 else ''};cliente{i};senha{i}\n")
+
+        t0 = time.perf_counter()
+        plan = plan_import_file(svc, rows, path)
+        t_plan = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for key, (pos, _old, new) in plan.updates.items():
+            for r, v in zip(pos, new):
+                rows[r][key] = v
+        rows.extend(plan.inserts)
+        t_apply = time.perf_counter() - t0
+        print(f"memória: plano {t_plan:.2f}s ({args.file_rows / t_plan:,.0f} linhas/s), aplicar {t_apply:.3f}s")
+        print(f"         {plan.summary()}")
+
+        store = ProjectStore(os.path.join(tmp, "p.oltproj"))
+        store.write_sections([svc], {"services": rows[:args.rows]})
+        t0 = time.perf_counter()
+        plan = plan_import_file(svc, store.iter_section("services"), path)
+        print(f"projeto: plano {time.perf_counter() - t0:.2f}s")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Velocidade do simulador de CLI ZTE (app/zte_sim.py) em scripts de 10^5 a 10^6+ linhas.
+
+Gera backups Fiberhome sintéticos num slot só (PONs de 128 ONUs, para não haver colisão de
+slot no destino), renderiza o script ZTE (normal e otimizado), aplica na OLT simulada e
+compara com o target_data. Mostra linhas/s e os primeiros comandos recusados/diferenças
+(em 10^5 ONUs o gerador chega a sortear SNs repetidos, que o simulador aponta).
+
+Uso (a partir de olt_config_migrator/):
+    python -m bench.zte_sim                      # 10k e 100k ONUs (~2M linhas)
+    python -m bench.zte_sim --scales 200000 --services 3
+"""
+from __future__ import annotations
+import argparse
+import gc
+import math
+import time
+
+from app.batch import build_target_data
+from app.vendors.fiberhome import FiberhomeAdapter
+from app.vendors.zte import ZTEAdapter
+from app.zte_sim import verify_script
+
+from .synth import SynthParams, iter_backup_lines
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--scales", default="10000,100000", help="ONUs por rodada, CSV")
+    ap.add_argument("--services", type=int, default=2)
+    ap.add_argument("--pppoe-ratio", type=float, default=0.7)
+    args = ap.parse_args()
+
+    fh, zte = FiberhomeAdapter(), ZTEAdapter()
+    print(f"{'ONUs':>8} {'modo':<10} {'linhas':>10} {'sim s':>8} {'linhas/s':>11} {'recusados':>10} {'diferenças':>10}")
+    for onus in (int(x) for x in args.scales.split(",") if x.strip()):
+        p = SynthParams(slots=1, pons=math.ceil(onus / 128), onus_per_pon=128,
+                        services_per_onu=args.services, pppoe_ratio=args.pppoe_ratio)
+        normalized = fh.parse_lines(iter_backup_lines(p))
+        for mode in ("normal", "otimizado"):
+            fast = {"frame": "1", "slot": "1", "trunks_csv": "xgei-1/1/1", "optimized": mode == "otimizado"}
+            target = build_target_data("zte", normalized, fast)
+            lines = zte.render(target, fast).splitlines()
+            gc.collect()
+            t0 = time.perf_counter()
+            r = verify_script(lines, target, fast)
+            dt = time.perf_counter() - t0
+            errs = sum(r.error_counts.values())
+            print(f"{p.total_onus:>8} {mode:<10} {r.lines:>10} {dt:>8.2f} {r.lines / dt:>11,.0f} {errs:>10} {len(r.diffs):>10}")
+            for issue in (r.errors + r.diffs)[:5]:
+                print(f"         [{issue.kind}] {issue.detail}")
+            del lines, target, r
+
+
+if __name__ == "__main__":
+    main()
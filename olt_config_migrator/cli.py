@@ -0,0 +1,530 @@
+"""Linha de comando (sem interface gráfica) do OLT Config Migrator.
+
+Uso (a partir de olt_config_migrator/):
+    python cli.py migrate backup.txt --from fiberhome --to zte -o saida/
+    python cli.py migrate coleta.zip olt2.cfg.gz --to zte -o saida/ --frame 1 --slot 1   # origem detectada
+    python cli.py migrate 'coleta.zip!olt7/backup.txt' --from fiberhome --to huawei -o saida/
+    python cli.py render-all backup.txt --targets zte,huawei,datacom,parks   # compara destinos
+    python cli.py merge olt1.txt olt2.txt --to zte -o novo.txt --slot 1 --map 2:pon=8   # 2 OLTs -> 1 chassi
+    python cli.py watch /srv/backups --from fiberhome --to zte -o /srv/scripts   # pasta vigiada
+    python cli.py serve --port 8765 --workers 4                  # POST /migrate para outras ferramentas
+    python cli.py coverage backup.txt --strict                    # linhas que o parser ignoraria
+    python cli.py verify backup.txt --slot 1                      # aplica o script ZTE numa OLT simulada
+    python cli.py delta antes.txt depois.txt --to zte -o delta.txt --slot 1 --verify   # só o que mudou
+    python cli.py export backup.txt -o inventario.ndjson          # ou --format parquet -o pasta/
+    python cli.py migrate inventario.ndjson --to zte -o saida/    # render a partir do inventário
+    python cli.py migrate backup.txt --to zte -o saida/ --tcont-max 16 --tcont-report   # <= 16 profiles TCONT
+
+Arquivos .gz/.bz2/.xz/.zip são lidos descompactando em stream; cada membro de um
+zip vira um script em --out.
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.batch import (DEFAULT_OPTIONS, build_target_data, claim_outputs, prepare_normalized, format_render_table, migrate_path, output_name,
+                       output_stem, render_all_targets, source_id)
+from app.diff import diff_normalized
+from app.exchange import NDJSON_EXTS, export_normalized, is_normalized_export, load_normalized
+from app.detect import AUTO, sniff
+from app.merge import MergeSource, merge_configs
+from app.models import NormalizedConfig
+from app.remap import remap_from_fast
+from app.tcont import ROUNDINGS, policy_from_fast, write_drift_csv
+from app.service import DEFAULT_PORT, serve
+from app.watch import FAILED, STATUS_FILE, FolderWatcher
+from app.zte_sim import verify_script
+from app.sources import iter_sources
+from app.perf import recorder, PROFILE_ENV, REPORT_ENV
+from app.utils import script_stats
+from app.vendors.registry import get_registry
+
+MAX_ISSUES_SHOWN = 10
+
+
+def _print_issues(issues: List[Any]) -> None:
+    """Merge/remap issues, at most MAX_ISSUES_SHOWN per kind."""
+    shown: Dict[str, int] = {}
+    for issue in issues:
+        shown[issue.kind] = shown.get(issue.kind, 0) + 1
+        if shown[issue.kind] <= MAX_ISSUES_SHOWN:
+            src = getattr(issue, "source", "")
+            print(f"  [{issue.kind}] {src + ': ' if src else ''}{issue.detail}")
+    for kind, total in shown.items():
+        if total > MAX_ISSUES_SHOWN:
+            print(f"  [{kind}] ... mais {total - MAX_ISSUES_SHOWN} (total {total})")
+
+
+def _fast_from_args(args: argparse.Namespace) -> Dict[str, Any]:
+    fast: Dict[str, Any] = {
+        "frame": args.frame,
+        "slot": args.slot,
+        "trunks_csv": args.trunks,
+        "apply_all_vlans_to_trunks": True,
+        "pon_offset": args.pon_offset,
+        "vlan_offset": args.vlan_offset,
+    }
+    if args.optimized:
+        fast["optimized"] = True
+    for key in ("vlan_map", "slot_map", "pon_map"):
+        if getattr(args, key):
+            fast[key] = getattr(args, key)
+    if args.tcont_max:
+        fast.update(tcont_max_profiles=args.tcont_max, tcont_tolerance=args.tcont_tolerance,
+                    tcont_rounding=args.tcont_rounding, tcont_step_kbps=args.tcont_step)
+    return fast
+
+
+def _check_fast(fast: Dict[str, Any]) -> None:
+    """Compile remap rules and the TCONT policy up front (ValueError before any file is read)."""
+    remap_from_fast(fast)
+    policy_from_fast(fast)
+
+
+def _write_tcont_report(issues: List[Any], out: str) -> None:
+    count = write_drift_csv(issues, out)
+    if count:
+        print(f"  desvio de banda por ONU: {count} linhas -> {out}")
+
+
+def _options_from_args(args: argparse.Namespace) -> Dict[str, bool]:
+    skip = {s.strip() for s in (args.skip or "").split(",") if s.strip()}
+    return {k: k not in skip for k in DEFAULT_OPTIONS}
+
+
+def cmd_migrate(args: argparse.Namespace) -> int:
+    try:
+        fast = _fast_from_args(args)
+        _check_fast(fast)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    options = _options_from_args(args)
+    failed = 0
+    claimed: Dict[str, str] = {}  # saída -> origem: dois backups não gravam o mesmo arquivo
+    for path in args.inputs:
+        try:
+            for res in migrate_path(path, args.src, args.dst, args.out, fast, options, claimed):
+                n = res.normalized
+                print(f"{res.name} [{res.src}]: {len(n.onus)} ONUs, {len(n.services)} serviços -> "
+                      f"{res.out_path} ({res.stats['commands']} comandos)")
+                _print_issues(res.issues)
+                if args.tcont_report:
+                    _write_tcont_report(res.issues, os.path.splitext(res.out_path)[0] + "_tcont.csv")
+        except Exception as e:
+            failed += 1
+            print(f"{path}: ERRO {e}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def _iter_parsed(path: str, src_arg: str) -> Iterator[Tuple[str, str, Optional[NormalizedConfig]]]:
+    """(name, src vendor, normalized) per backup in `path`; normalized is None when detection fails."""
+    reg = get_registry()
+    for name, lines in iter_sources(path):
+        src = src_arg
+        if src == AUTO:
+            ranking, lines = sniff(lines)
+            if not ranking:
+                print(f"{name}: fabricante de origem não identificado (use --from)", file=sys.stderr)
+                yield name, "", None
+                continue
+            src = ranking[0][0]
+        yield name, src, reg[src].parse_lines(lines)
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    multi = len(args.inputs) > 1
+    ext = ".ndjson" if args.format == "ndjson" else ""
+    claimed: Dict[str, str] = {}  # export -> origem, como no migrate
+    failed = 0
+    for path in args.inputs:
+        for name, src, normalized in _iter_parsed(path, args.src):
+            if normalized is None:
+                return 1
+            out = args.out
+            if multi or name != os.path.basename(path) or (ext and os.path.isdir(out)):
+                # vários backups (ou -o pasta): um export por backup dentro de --out
+                os.makedirs(args.out, exist_ok=True)
+                out = os.path.join(args.out, output_stem(name, path) + ext)
+            elif ext and not out.lower().endswith(NDJSON_EXTS):
+                out += ext  # sem a extensão o migrate não reconhece o arquivo como export
+            try:
+                claim_outputs(claimed, {out: source_id(path, name)})
+            except ValueError as e:
+                failed += 1
+                print(f"{name}: ERRO {e}", file=sys.stderr)
+                continue
+            try:
+                fmt, count = export_normalized(normalized, out, args.format)
+            except (RuntimeError, OSError) as e:  # sem pyarrow, pasta sem permissão, ...
+                print(f"{name}: {e}", file=sys.stderr)
+                return 2
+            print(f"{name} [{src}]: {count} registros -> {out} ({fmt})")
+    return 1 if failed else 0
+
+
+def _parse_maps(specs: List[str]) -> Dict[int, Dict[str, int]]:
+    """'2:slot=3,pon=8,vlan=1000' -> {2: {"slot": 3, "pon_offset": 8, "vlan_offset": 1000}}."""
+    keys = {"slot": "slot", "pon": "pon_offset", "vlan": "vlan_offset"}
+    maps: Dict[int, Dict[str, int]] = {}
+    for spec in specs:
+        idx, _, body = spec.partition(":")
+        m = maps.setdefault(int(idx), {})
+        for part in filter(None, (p.strip() for p in body.split(","))):
+            k, _, v = part.partition("=")
+            if k.strip() not in keys:
+                raise ValueError(f"--map: chave desconhecida '{k}' (use slot, pon, vlan)")
+            m[keys[k.strip()]] = int(v)
+    return maps
+
+
+def cmd_merge(args: argparse.Namespace) -> int:
+    try:
+        maps = _parse_maps(args.map)
+        fast = _fast_from_args(args)
+        _check_fast(fast)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    sources: List[MergeSource] = []
+    for path in args.inputs:
+        for name, src, normalized in _iter_parsed(path, args.src):
+            if normalized is None:
+                return 1
+            sources.append(MergeSource(name, normalized, **maps.get(len(sources) + 1, {})))
+            m = sources[-1]
+            print(f"{len(sources)}. {name} [{src}]: {len(normalized.onus)} ONUs, {len(normalized.services)} serviços"
+                  f" -> slot {m.slot if m.slot is not None else '(origem)'}, PON +{m.pon_offset}, VLAN +{m.vlan_offset}")
+    res = merge_configs(sources, fixed_slot=bool(str(fast.get("slot", "")).strip()))
+    _print_issues(res.issues)
+    blocking = res.blocking
+    if blocking and not args.force:
+        print(f"{len(blocking)} ONUs em conflito; corrija o --map ou use --force para gerar sem elas", file=sys.stderr)
+        return 1
+    remap_issues: List[Any] = []
+    target_data = build_target_data(args.dst, res.normalized, fast, _options_from_args(args), remap_issues)
+    _print_issues(remap_issues)
+    script = get_registry()[args.dst].render(target_data, fast)
+    out = args.out
+    if os.path.isdir(out) or out.endswith(os.sep):
+        os.makedirs(out, exist_ok=True)
+        out = os.path.join(out, output_name("merged", args.dst))
+    with open(out, "w", encoding="utf-8") as f:
+        f.write(script)
+    if args.tcont_report:
+        _write_tcont_report(remap_issues, os.path.splitext(out)[0] + "_tcont.csv")
+    n = res.normalized
+    print(f"consolidado: {len(n.onus)} ONUs, {len(n.services)} serviços, {len(n.vlans)} VLANs, "
+          f"{len(n.tcont_profiles)} profiles TCONT -> {out}")
+    return 1 if blocking else 0
+
+
+def cmd_detect(args: argparse.Namespace) -> int:
+    for path in args.inputs:
+        for name, lines in iter_sources(path):
+            ranking, _ = sniff(lines)
+            guess = ", ".join(f"{vid} {score:.0%}" for vid, score in ranking[:3]) or "desconhecido"
+            print(f"{name}: {guess}")
+    return 0
+
+
+def cmd_coverage(args: argparse.Namespace) -> int:
+    reg = get_registry()
+    missed = 0
+    for path in args.inputs:
+        for name, lines in iter_sources(path):
+            src = args.src
+            if src == AUTO:
+                ranking, lines = sniff(lines)
+                if not ranking:
+                    print(f"{name}: fabricante de origem não identificado (use --from)", file=sys.stderr)
+                    missed += 1
+                    continue
+                src = ranking[0][0]
+            _, cov = reg[src].parse_lines_report(lines)
+            if cov is None:
+                print(f"{name} [{src}]: parser sem relatório de cobertura")
+                continue
+            print(f"{name} [{src}]: {cov.report(args.top)}")
+            missed += bool(cov.unmatched)
+    return 1 if missed and args.strict else 0
+
+
+def cmd_verify(args: argparse.Namespace) -> int:
+    try:
+        fast = _fast_from_args(args)
+        _check_fast(fast)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if args.script and len(args.inputs) != 1:
+        print("--script vale para um backup só", file=sys.stderr)
+        return 2
+    zte = get_registry()["zte"]
+    options = _options_from_args(args)
+    bad = 0
+    for path in args.inputs:
+        for name, src, normalized in _iter_parsed(path, args.src):
+            if normalized is None:
+                bad += 1
+                continue
+            issues: List[Any] = []
+            target_data = build_target_data("zte", normalized, fast, options, issues)
+            if args.script:
+                with open(args.script, encoding="utf-8", errors="replace") as f:
+                    rep = verify_script(f, target_data, fast)
+            else:
+                rep = verify_script(zte.render(target_data, fast), target_data, fast)
+            print(f"{name} [{src}]: {rep.summary()}")
+            _print_issues(issues + rep.errors + rep.diffs)
+            bad += not rep.ok
+    return 1 if bad else 0
+
+
+def _load_config(path: str, src: str) -> Tuple[str, NormalizedConfig]:
+    """(src vendor, normalized) of a single backup or export; ValueError for zips with several configs."""
+    if is_normalized_export(path):
+        return "normalized", load_normalized(path)
+    parsed = list(_iter_parsed(path, src))
+    if len(parsed) != 1:
+        raise ValueError(f"{path}: {len(parsed)} configs no zip, indique o membro ('a.zip!membro')")
+    _, vendor, normalized = parsed[0]
+    if normalized is None:
+        raise ValueError(f"{path}: fabricante de origem não identificado (use --from)")
+    return vendor, normalized
+
+
+# seções do NormalizedConfig que --skip deixa de fora do delta (nem criadas nem removidas)
+_DELTA_SKIP = {"vlans": ("vlans",), "ips_routes": ("interfaces", "routes"),
+               "profiles": ("tcont_profiles",), "onus": ("onus", "services")}
+
+
+def cmd_delta(args: argparse.Namespace) -> int:
+    try:
+        fast = _fast_from_args(args)
+        _check_fast(fast)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    if len(args.inputs) != 2:
+        print("informe dois backups: o que foi aplicado na OLT e o novo", file=sys.stderr)
+        return 2
+    try:
+        (src_old, old), (src_new, new) = (_load_config(p, args.src) for p in args.inputs)
+    except (OSError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 2
+    issues: List[Any] = []
+    old_p, new_p = prepare_normalized(old, fast, issues), prepare_normalized(new, fast, issues)
+    options = _options_from_args(args)
+    for opt, fields in _DELTA_SKIP.items():
+        if not options[opt]:
+            for f in fields:
+                setattr(old_p, f, [])
+                setattr(new_p, f, [])
+    adapter = get_registry()[args.dst]
+    try:
+        script = adapter.render_delta(old_p, new_p, fast)
+    except NotImplementedError as e:
+        print(e, file=sys.stderr)
+        return 2
+    changes = ", ".join(f"{k} +{c['added']} -{c['removed']} ~{c['changed']}"
+                        for k, c in diff_normalized(old_p, new_p).summary().items() if any(c.values()))
+    with open(args.out, "w", encoding="utf-8") as f:
+        f.write(script)
+    print(f"{args.inputs[0]} [{src_old}] -> {args.inputs[1]} [{src_new}]: {changes or 'sem mudanças'} -> "
+          f"{args.out} ({script_stats(script)['commands']} comandos)")
+    _print_issues(issues)
+    if not args.verify:
+        return 0
+    if args.dst != "zte":
+        print("--verify só existe para destino zte", file=sys.stderr)
+        return 2
+    # OLT simulada com o script completo do backup antigo; o delta tem de levá-la ao novo
+    base = verify_script(adapter.render(build_target_data("zte", old, fast, options), fast))
+    rep = verify_script(script, build_target_data("zte", new, fast, options), fast, olt=base.olt)
+    print(f"conferência: {rep.summary()}")
+    _print_issues(rep.errors + rep.diffs)
+    return 0 if rep.ok else 1
+
+
+def cmd_watch(args: argparse.Namespace) -> int:
+    try:
+        fast = _fast_from_args(args)
+        _check_fast(fast)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    missing = [d for d in args.inputs if not os.path.isdir(d)]
+    if missing:
+        print(f"pasta não encontrada: {', '.join(missing)}", file=sys.stderr)
+        return 2
+    try:
+        w = FolderWatcher(args.inputs, args.src, args.dst, args.out, fast, _options_from_args(args),
+                          workers=args.workers, queue=args.queue, interval=args.interval)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    print(f"vigiando {', '.join(args.inputs)} a cada {args.interval:g}s -> {args.out} "
+          f"({args.workers} em paralelo; status em {os.path.join(args.out, STATUS_FILE)})")
+    w.run(once=args.once)
+    return 1 if any(s.result == FAILED for s in w.status.values()) else 0
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    serve(args.host, args.port, workers=args.workers, queue=args.queue, timeout=args.timeout)
+    return 0
+
+
+def cmd_render_all(args: argparse.Namespace) -> int:
+    reg = get_registry()
+    vendors = [v.strip() for v in args.targets.split(",") if v.strip()] or list(reg)
+    unknown = [v for v in vendors if v not in reg]
+    if unknown:
+        print(f"destinos desconhecidos: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+    try:
+        fast = _fast_from_args(args)
+        _check_fast(fast)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    options = _options_from_args(args)
+    failed = 0
+    for path in args.inputs:
+        for name, src, normalized in _iter_parsed(path, args.src):
+            if normalized is None:
+                failed += 1
+                continue
+            results = render_all_targets(normalized, fast, options, vendors, workers=args.workers or None)
+            print(f"{name} [{src}]: {len(normalized.onus)} ONUs, {len(normalized.services)} serviços")
+            print("\n".join(format_render_table(results)))
+            if args.out:
+                os.makedirs(args.out, exist_ok=True)
+                for r in results:
+                    if not r.error:
+                        with open(os.path.join(args.out, output_name(name, r.vendor, path)), "w", encoding="utf-8") as f:
+                            f.write(r.script)
+            failed += sum(1 for r in results if r.error)
+    return 1 if failed else 0
+
+
+def _add_common(p: argparse.ArgumentParser) -> None:
+    vendors = sorted(get_registry())
+    p.add_argument("inputs", nargs="+", help="arquivos de backup; 'a.zip!membro' escolhe um membro")
+    p.add_argument("--from", dest="src", default=AUTO, choices=[AUTO] + vendors,
+                   help="fabricante de origem (padrão: detecta pelo começo de cada arquivo)")
+    p.add_argument("--frame", default="")
+    p.add_argument("--slot", default="")
+    p.add_argument("--trunks", default="", help="uplinks (CSV) que recebem todas as VLANs")
+    p.add_argument("--pon-offset", type=int, default=0)
+    p.add_argument("--vlan-offset", type=int, default=0)
+    p.add_argument("--vlan-map", default="", help="remapeia VLANs: '100-199:2100,150:999,300-399:+1000'")
+    p.add_argument("--slot-map", default="", help="remapeia slots: '1:3,2:4'")
+    p.add_argument("--pon-map", default="", help="remapeia PONs: '5:1' ou por slot '2/5:1'")
+    p.add_argument("--tcont-max", type=int, default=0, help="consolida os profiles TCONT em no máximo N (0 = não)")
+    p.add_argument("--tcont-tolerance", type=float, default=10.0, help="%% de banda que cabe no mesmo profile (padrão 10)")
+    p.add_argument("--tcont-rounding", default=ROUNDINGS[0], choices=ROUNDINGS,
+                   help="banda do profile: up = maior do grupo (ninguém perde banda), nearest = mediana")
+    p.add_argument("--tcont-step", type=int, default=0, help="arredonda a banda dos profiles a múltiplos de N kbps")
+    p.add_argument("--tcont-report", action="store_true", help="grava <saída>_tcont.csv com o desvio de banda por ONU")
+    p.add_argument("--optimized", action="store_true", help="ZTE: modo otimizado")
+    p.add_argument("--skip", default="", help=f"seções a não migrar (CSV de {', '.join(DEFAULT_OPTIONS)})")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    vendors = sorted(get_registry())
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--profile", choices=("cprofile", "tracemalloc", "all"),
+                    help=f"captura extra por etapa (equivale a {PROFILE_ENV})")
+    ap.add_argument("--perf-report", help=f"grava o relatório JSON de performance ao sair (equivale a {REPORT_ENV})")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    m = sub.add_parser("migrate", help="migra um ou mais backups (texto, compactados ou zip)")
+    _add_common(m)
+    m.add_argument("--to", dest="dst", required=True, choices=vendors)
+    m.add_argument("-o", "--out", required=True, help="pasta de saída dos scripts")
+    m.set_defaults(func=cmd_migrate)
+
+    r = sub.add_parser("render-all", help="renderiza a mesma origem para todos os destinos (em paralelo)")
+    _add_common(r)
+    r.add_argument("--targets", default="", help=f"destinos (CSV; padrão: todos = {','.join(vendors)})")
+    r.add_argument("-o", "--out", default="", help="pasta para gravar os scripts (opcional)")
+    r.add_argument("--workers", type=int, default=0, help="processos (padrão: um por destino; 1 = sem paralelismo)")
+    r.set_defaults(func=cmd_render_all)
+
+    e = sub.add_parser("export", help="exporta o inventário normalizado (NDJSON, Parquet ou Arrow)")
+    e.add_argument("inputs", nargs="+")
+    e.add_argument("--from", dest="src", default=AUTO, choices=[AUTO] + vendors)
+    e.add_argument("--format", choices=("ndjson", "parquet", "arrow"), default="ndjson")
+    e.add_argument("-o", "--out", required=True, help="arquivo .ndjson (a extensão é acrescentada) ou pasta")
+    e.set_defaults(func=cmd_export)
+
+    g = sub.add_parser("merge", help="consolida vários backups num único chassi de destino")
+    _add_common(g)
+    g.add_argument("--to", dest="dst", required=True, choices=vendors)
+    g.add_argument("-o", "--out", required=True, help="arquivo do script (ou pasta)")
+    g.add_argument("--map", action="append", default=[],
+                   help="mapeamento por origem (1 = primeiro backup): '2:slot=3,pon=8,vlan=1000'")
+    g.add_argument("--force", action="store_true", help="gera o script mesmo com ONUs em conflito (elas ficam de fora)")
+    g.set_defaults(func=cmd_merge)
+
+    w = sub.add_parser("watch", help="vigia pastas e gera o script de cada backup novo ou alterado")
+    _add_common(w)
+    w.add_argument("--to", dest="dst", required=True, choices=vendors)
+    w.add_argument("-o", "--out", required=True, help="pasta dos scripts, do estado e do status")
+    w.add_argument("--interval", type=float, default=30.0, help="segundos entre varreduras (padrão 30)")
+    w.add_argument("--workers", type=int, default=2, help="arquivos processados ao mesmo tempo")
+    w.add_argument("--queue", type=int, default=8, help="arquivos enviados além dos em execução (o resto espera)")
+    w.add_argument("--once", action="store_true", help="uma varredura só e sai (cron)")
+    w.set_defaults(func=cmd_watch)
+
+    s = sub.add_parser("serve", help="serviço HTTP/JSON local de migração (POST /migrate)")
+    s.add_argument("--host", default="127.0.0.1")
+    s.add_argument("--port", type=int, default=DEFAULT_PORT)
+    s.add_argument("--workers", type=int, default=2, help="processos de parse/render")
+    s.add_argument("--queue", type=int, default=8, help="pedidos aguardando além dos em execução (cheia = 503)")
+    s.add_argument("--timeout", type=float, default=120.0, help="segundos por pedido (passou = 504)")
+    s.set_defaults(func=cmd_serve)
+
+    d = sub.add_parser("detect", help="mostra o fabricante provável de cada backup (lê só o começo)")
+    d.add_argument("inputs", nargs="+")
+    d.set_defaults(func=cmd_detect)
+
+    v = sub.add_parser("verify", help="aplica o script ZTE numa OLT simulada e compara com a origem")
+    _add_common(v)
+    v.add_argument("--script", default="", help="script ZTE já gerado/editado (padrão: renderiza agora)")
+    v.set_defaults(func=cmd_verify)
+
+    d = sub.add_parser("delta", help="script só com o que mudou entre dois backups (re-migração depois do cut-over)")
+    _add_common(d)
+    d.add_argument("--to", dest="dst", default="zte", choices=vendors, help="destino (render_delta; hoje só zte)")
+    d.add_argument("-o", "--out", required=True, help="arquivo do script incremental")
+    d.add_argument("--verify", action="store_true", help="ZTE: confere o delta na OLT simulada a partir do backup antigo")
+    d.set_defaults(func=cmd_delta)
+
+    c = sub.add_parser("coverage", help="linhas que o parser reconhece/ignora, por assinatura e por regra")
+    c.add_argument("inputs", nargs="+")
+    c.add_argument("--from", dest="src", default=AUTO, choices=[AUTO] + vendors)
+    c.add_argument("--top", type=int, default=10, help="assinaturas não reconhecidas a listar")
+    c.add_argument("--strict", action="store_true", help="sai com código 1 se sobrar linha não reconhecida")
+    c.set_defaults(func=cmd_coverage)
+    return ap
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.profile:
+        recorder.configure(args.profile)
+    report = args.perf_report or os.environ.get(REPORT_ENV, "")
+    try:
+        return args.func(args)
+    finally:
+        if report:
+            recorder.write_json(report)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
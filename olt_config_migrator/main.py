@@ -1,14 +1,34 @@
+import argparse
+import multiprocessing
+import os
 import sys
 from PyQt6.QtWidgets import QApplication
 from app.wizard import MigrationWizard
 from app.styles import apply_metro_theme
+from app.perf import recorder, span, PROFILE_ENV, REPORT_ENV
 
 def main():
-    app = QApplication(sys.argv)
-    apply_metro_theme(app)
-    w = MigrationWizard()
-    w.show()
-    sys.exit(app.exec())
+    ap = argparse.ArgumentParser(description="OLT Config Migrator (Turbo)")
+    ap.add_argument("--profile", choices=("cprofile", "tracemalloc", "all"),
+                    help=f"captura extra por etapa (equivale a {PROFILE_ENV})")
+    ap.add_argument("--perf-report", help=f"grava o relatório JSON de performance ao sair (equivale a {REPORT_ENV})")
+    args, qt_args = ap.parse_known_args()
+    if args.profile:
+        recorder.configure(args.profile)
+    report = args.perf_report or os.environ.get(REPORT_ENV, "")
+
+    app = QApplication([sys.argv[0]] + qt_args)
+    with span("startup.theme"):
+        apply_metro_theme(app)
+    with span("startup.wizard"):
+        w = MigrationWizard()
+        w.show()
+    rc = app.exec()
+    if report:
+        recorder.write_json(report)
+    sys.exit(rc)
 
 if __name__ == "__main__":
+    # "Renderizar todos os destinos" usa processos; necessário no executável congelado (Windows)
+    multiprocessing.freeze_support()
     main()
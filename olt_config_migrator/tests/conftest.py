@@ -0,0 +1,5 @@
+import os
+import sys
+
+# os testes importam 'app' e 'cli' como o main.py/cli.py: a partir desta pasta
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,36 @@
+import cli
+from app.utils import script_stats
+from bench.synth import SynthParams, iter_backup_lines
+
+
+def _backup(path, onus):
+    p = SynthParams(slots=1, pons=1, onus_per_pon=onus, services_per_onu=2, pppoe_ratio=0.5)
+    path.write_text("\n".join(iter_backup_lines(p)) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_delta_renders_only_the_change_and_verifies(tmp_path):
+    old, new = _backup(tmp_path / "antes.txt", 8), _backup(tmp_path / "depois.txt", 12)
+    out = tmp_path / "delta.txt"
+    rc = cli.main(["delta", old, new, "--to", "zte", "-o", str(out), "--frame", "1", "--slot", "1", "--verify"])
+    assert rc == 0
+    script = out.read_text(encoding="utf-8")
+    assert "interface gpon_onu-1/1/" in script
+
+    full = tmp_path / "full"
+    assert cli.main(["migrate", new, "--to", "zte", "-o", str(full), "--frame", "1", "--slot", "1"]) == 0
+    full_script = next(full.iterdir()).read_text(encoding="utf-8")
+    assert script_stats(script)["commands"] < script_stats(full_script)["commands"]
+
+
+def test_delta_of_identical_backups_is_empty(tmp_path):
+    old = _backup(tmp_path / "antes.txt", 8)
+    out = tmp_path / "delta.txt"
+    assert cli.main(["delta", old, old, "-o", str(out), "--slot", "1", "--verify"]) == 0
+    assert script_stats(out.read_text(encoding="utf-8"))["commands"] == 0
+
+
+def test_delta_rejects_targets_without_render_delta(tmp_path):
+    old = _backup(tmp_path / "antes.txt", 4)
+    assert cli.main(["delta", old, old, "--to", "huawei", "-o", str(tmp_path / "d.txt")]) == 2
+    assert cli.main(["delta", old, "-o", str(tmp_path / "d.txt")]) == 2
@@ -0,0 +1,23 @@
+from app.vendors.grammar import Grammar, Rule
+
+
+def _grammar():
+    return Grammar([
+        Rule("set vlan", pattern=r"^set vlan (\d+)$", target="vlan", once=True),
+        Rule("set vlan name", target="names"),
+    ])
+
+
+def test_once_rule_keeps_first_match_only():
+    res = _grammar().run(["set vlan 10", "set vlan 20"])
+    assert res.get("vlan") == [("10",)]
+    assert res.coverage.matched == 2
+
+
+def test_consumed_once_rule_does_not_swallow_lines_it_does_not_match():
+    res = _grammar().run(["set vlan 10", "set vlan abc", "set vlan name uplink"])
+    assert res.get("vlan") == [("10",)]
+    # 'set vlan abc' não casa com a regex: continua não reconhecida depois da regra consumida
+    assert res.coverage.matched == 2
+    assert res.coverage.unmatched == 1
+    assert res.get("names") == [("uplink",)]
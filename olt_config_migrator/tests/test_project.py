@@ -0,0 +1,52 @@
+import sqlite3
+
+from app.models import SectionColumn, SectionSchema
+from app.project import ProjectStore
+
+SCHEMA = SectionSchema("vlans", "VLANs", [SectionColumn("vid", "VLAN", col_type="int"), SectionColumn("name", "Nome")])
+
+
+def _pages(store, ids, page):
+    # mesma leitura do PagedSectionTableModel: cada página começa depois do id anterior
+    out = []
+    for lo in range(0, len(ids), page):
+        out += [r["vid"] for _, r in store.fetch("vlans", ids[lo - 1] if lo else -1, page)]
+    return out
+
+
+def test_paging_survives_gaps_and_vacuum(tmp_path):
+    path = str(tmp_path / "p.oltproj")
+    store = ProjectStore(path)
+    store.write_sections([SCHEMA], {"vlans": [{"vid": v, "name": f"v{v}"} for v in range(1, 101)]})
+    gone = [i for i in store.row_ids("vlans") if i % 3 == 0]
+    store.delete_rows("vlans", gone)
+    store.conn.execute("VACUUM")
+    store.close()
+
+    store = ProjectStore(path)
+    ids = store.row_ids("vlans")
+    # ids esparsos preservados pelo VACUUM (INTEGER PRIMARY KEY explícita)
+    assert ids == [i for i in range(1, 101) if i % 3]
+    assert _pages(store, ids, 7) == [v for v in range(1, 101) if v % 3]
+    store.restore_rows("vlans", [(gone[0], {"vid": 3, "name": "v3"})])
+    assert [r["vid"] for r in store.iter_section("vlans")][:4] == [1, 2, 3, 4]
+    store.close()
+
+
+def test_legacy_project_gets_row_ids(tmp_path):
+    path = str(tmp_path / "velho.oltproj")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+    conn.executemany("INSERT INTO meta VALUES (?, ?)", [("sections", '["vlans"]'),
+                                                        ("schema:vlans", '[["vid", "int"], ["name", "str"]]')])
+    conn.execute('CREATE TABLE t_vlans (vid INTEGER, name TEXT, _extra TEXT)')
+    conn.execute('CREATE INDEX ix_t_vlans_vid ON t_vlans (vid)')
+    conn.executemany("INSERT INTO t_vlans VALUES (?, ?, NULL)", [(10, "a"), (20, "b"), (30, "c")])
+    conn.execute("DELETE FROM t_vlans WHERE vid = 20")
+    conn.commit()
+    conn.close()
+
+    store = ProjectStore(path)
+    assert store.row_ids("vlans") == [1, 3]
+    assert [r for _, r in store.query("vlans", vid=30)] == [{"vid": 30, "name": "c"}]
+    store.close()
@@ -0,0 +1,74 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from app.watch import RENDERED, SAME_CONTENT, FolderWatcher
+from bench.synth import SynthParams, iter_backup_lines
+
+
+def _watch(folder, out, dst, slot):
+    w = FolderWatcher([folder], "auto", dst, out, {"frame": 1, "slot": slot}, settle=0, workers=1, log=lambda s: None)
+    w.run(once=True)
+    return w
+
+
+def _backup(tmp_path):
+    folder = tmp_path / "in"
+    folder.mkdir()
+    p = SynthParams(slots=1, pons=1, onus_per_pon=2, services_per_onu=1)
+    (folder / "olt.txt").write_text("\n".join(iter_backup_lines(p)) + "\n", encoding="utf-8")
+    return str(folder), str(tmp_path / "out")
+
+
+def test_restart_with_other_settings_rewrites_the_scripts(tmp_path):
+    folder, out = _backup(tmp_path)
+    script = os.path.join(out, "olt_zte.txt")
+    _watch(folder, out, "zte", 1)
+    assert "gpon_onu-1/1/1:1" in open(script, encoding="utf-8").read()
+
+    # mesmo arquivo, mesmas configurações: nada a fazer
+    w = _watch(folder, out, "zte", 1)
+    assert w.status[os.path.join(folder, "olt.txt")].result == SAME_CONTENT
+
+    # mesmo arquivo, outro --slot: reescreve
+    _watch(folder, out, "zte", 2)
+    text = open(script, encoding="utf-8").read()
+    assert "gpon_onu-1/2/1:1" in text and "gpon_onu-1/1/1:1" not in text
+
+    # outro --to: gera o script do novo destino
+    _watch(folder, out, "huawei", 2)
+    assert os.path.exists(os.path.join(out, "olt_huawei.txt"))
+
+
+def test_missing_script_is_rendered_again(tmp_path):
+    folder, out = _backup(tmp_path)
+    script = os.path.join(out, "olt_zte.txt")
+    _watch(folder, out, "zte", 1)
+    os.remove(script)
+    _watch(folder, out, "zte", 1)
+    assert os.path.exists(script)
+
+
+def test_poll_stops_submitting_at_the_pending_limit(tmp_path):
+    folder, out = _backup(tmp_path)
+    text = (tmp_path / "in" / "olt.txt").read_text(encoding="utf-8")
+    for name in ("b.txt", "c.txt"):
+        (tmp_path / "in" / name).write_text(text, encoding="utf-8")
+    w = FolderWatcher([folder], "auto", "zte", out, {"frame": 1, "slot": 1}, workers=1, queue=1, settle=0,
+                      log=lambda s: None)
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        assert w.poll(pool) == 2 and w.deferred == 1
+        w.collect(wait=True)
+        assert w.poll(pool) == 1 and w.deferred == 0
+        w.collect(wait=True)
+    assert sorted(os.listdir(out)) == ["b_zte.txt", "c_zte.txt", "olt_zte.txt"]
+
+
+def test_once_processes_files_left_over_by_a_full_queue(tmp_path):
+    folder, out = _backup(tmp_path)
+    text = (tmp_path / "in" / "olt.txt").read_text(encoding="utf-8")
+    for name in ("b.txt", "c.txt", "d.txt"):
+        (tmp_path / "in" / name).write_text(text, encoding="utf-8")
+    w = FolderWatcher([folder], "auto", "zte", out, {"frame": 1, "slot": 1}, workers=1, queue=0, settle=0,
+                      log=lambda s: None)
+    w.run(once=True)
+    assert len(w.status) == 4 and all(s.result == RENDERED for s in w.status.values())
@@ -0,0 +1,34 @@
+from app.batch import build_target_data
+from app.vendors.fiberhome import FiberhomeAdapter
+from app.vendors.zte import PLACEHOLDER_SLOT, SERVICE_DROPPED, ZTEAdapter
+from bench.synth import SynthParams, iter_backup_lines
+
+
+def _source():
+    p = SynthParams(slots=1, pons=2, onus_per_pon=8, services_per_onu=2, pppoe_ratio=0.5)
+    return FiberhomeAdapter().parse_lines(iter_backup_lines(p))
+
+
+def _service_lines(script):
+    return sorted(line for line in script.splitlines() if line.lstrip().startswith(("service-port", "service ", "wan-ip")))
+
+
+def test_placeholder_script_rerenders_with_all_services():
+    zte = ZTEAdapter()
+    first = zte.render(build_target_data("zte", _source(), {}), {})
+    assert "gpon_onu-[FRAME]/[SLOT]/" in first
+
+    reparsed = zte.parse_lines(first.splitlines())
+    assert reparsed.services and {s.slot for s in reparsed.services} == {PLACEHOLDER_SLOT}
+    issues = []
+    again = zte.render(build_target_data("zte", reparsed, {}, None, issues), {})
+    assert not [i for i in issues if i.kind == SERVICE_DROPPED]
+    assert _service_lines(first) and _service_lines(again) == _service_lines(first)
+
+
+def test_services_dropped_by_the_render_are_reported():
+    zte = ZTEAdapter()
+    target = build_target_data("zte", _source(), {})
+    target["services"][0]["slot"] = 0
+    issues = zte.check_target(target, {})
+    assert [i.kind for i in issues] == [SERVICE_DROPPED]